@@ -1,11 +1,9 @@
+import os
 import gradio as gr
-from stock import *
-from indices_html import *
-from index_live_html import *
-from preopen_html import *
-from eq_html import *
-import pandas as pd
-from bhavcopy_html import *
+from common import make_table, html_error
+import assets
+from worker_pool import pools, run_in, run_in_async, total_admission, Busy, PoolTimeout
+import dispatch
 
 # ======================================================
 # Scrollable HTML wrapper
@@ -56,64 +54,121 @@ def update_on_mode(mode):
 
 # ======================================================
 # Data Fetcher (no defaults, use exactly frontend input)
+# Routes live in dispatch.py; handler modules load on first use.
 # ======================================================
-def fetch_data(mode, req_type, name, date_str):
-    req_type = req_type.lower()
-    name = name.strip()
-    date_str = date_str.strip()
-
-    if mode == "index":
-        if req_type == "indices":
-            return build_indices_html()
-
-        elif req_type == "nse_open":
-            return build_index_live_html()
-        elif req_type == "nse_preopen":
-            return build_preopen_html()
-        elif req_type == "nse_fno":
-            return wrap(nse_fno(name))
-        elif req_type == "nse_future":
-            return wrap(nse_future(name))
-        elif req_type == "nse_bhav":
-            return build_bhavcopy_html(date_str) # no default
-        elif req_type == "nse_highlow":
-            return wrap(nse_highlow())
-        else:
-            return wrap(f"<h3>No handler for {req_type}</h3>")
-
-    elif mode == "stock":
-        if req_type == "daily":
-            return wrap(fetch_daily(name))
-        elif req_type == "nse_eq":
-            return build_eq_html(name)
-        elif req_type == "intraday":
-            return wrap(fetch_intraday(name))
-        elif req_type == "info":
-            return wrap(fetch_info(name))
-        elif req_type == "qresult":
-            return wrap(fetch_qresult(name))
-        elif req_type == "result":
-            return wrap(fetch_result(name))
-        elif req_type == "balance":
-            return wrap(fetch_balance(name))
-        elif req_type == "cashflow":
-            return wrap(fetch_cashflow(name))
-        elif req_type == "dividend":
-            return wrap(fetch_dividend(name))
-        elif req_type == "split":
-            return wrap(fetch_split(name))
-        elif req_type == "other":
-            return wrap(fetch_other(name))
-        else:
-            return wrap(f"<h3>No handler for {req_type}</h3>")
-
-    return wrap(f"<h3>No valid mode: {mode}</h3>")
+def fetch_data(mode, req_type, name, date_str, end_date_str=""):
+    handler = dispatch.lookup(mode, req_type)
+    if handler is None:
+        if mode not in ("stock", "index"):
+            return wrap(f"<h3>No valid mode: {mode}</h3>")
+        return wrap(f"<h3>No handler for {req_type}</h3>")
+
+    request = dispatch.Request(name.strip(), date_str.strip(), (end_date_str or "").strip())
+    html = dispatch.call(handler, request)
+    return wrap(html) if handler.wrap else html
+
+
+def request_class(mode, req_type):
+    handler = dispatch.lookup(mode, req_type)
+    return handler.cls if handler else "live"
+
+
+async def handle_request(mode, req_type, name, date_str, end_date_str=""):
+    """
+    fetch_data on its class's worker pool; sheds with a busy message when the
+    class is full. Async so a request waiting in its pool's queue holds no
+    Gradio worker thread.
+    """
+    cls = request_class(mode, req_type)
+    try:
+        return await run_in_async(cls, fetch_data, mode, req_type, name, date_str, end_date_str)
+    except Busy:
+        return wrap(html_error(f"Server busy: too many {cls} requests in progress. Please retry shortly."))
+    except PoolTimeout as e:
+        return wrap(html_error(f"Timed out: {e}"))
+
+
+# ======================================================
+# Screener (streams ranked matches as shards complete)
+# ======================================================
+def run_screener(expr, budget):
+    if not expr or not expr.strip():
+        yield wrap("<h3>Enter a filter, e.g. RSI14 < 30 and close > SMA200</h3>")
+        return
+    try:
+        screen_iter = dispatch.load("screener").screen_iter
+        with pools["compute"].slot():
+            budget = min(float(budget or 60), pools["compute"].timeout)
+            for step in screen_iter(expr, time_budget=budget):
+                if not step["total"]:
+                    yield wrap("<h3>No stored bhavcopy days to screen. Backfill with "
+                               "<code>python bhavcopy_store.py DD-MM-YYYY DD-MM-YYYY</code>.</h3>")
+                    return
+                status = (
+                    f"<p><b>{step['matches']}</b> matches &middot; "
+                    f"{step['done']}/{step['total']} symbols screened &middot; "
+                    f"{step['elapsed']:.1f}s"
+                    + (" &middot; <b>time budget reached</b>" if step["timed_out"] else "")
+                    + "</p>"
+                )
+                yield wrap(status + make_table(step["results"].head(200).round(2)))
+    except Busy:
+        yield wrap(html_error("Server busy: too many compute requests in progress. Please retry shortly."))
+    except Exception as e:
+        yield wrap(html_error(f"Screener error: {e}"))
+
+
+# ======================================================
+# Live mode (one shared poller per feed, see live_stream.py)
+# ======================================================
+LIVE_FEEDS = {"nse_open": ("index", "NIFTY 50"), "nse_preopen": ("preopen", "NIFTY")}
+
+async def run_live(mode, req_type, name):
+    """Async so an idle viewer waits on the feed without holding a Gradio worker thread."""
+    feed = LIVE_FEEDS.get((req_type or "").lower()) if mode == "index" else None
+    if feed is None:
+        yield wrap("<h3>Live mode is available for index / nse_open and nse_preopen</h3>"), ""
+        return
+    kind, default = feed
+    live = dispatch.load("live_stream")
+    async for page, delta in live.astream(kind, (name or "").strip() or default):
+        yield (wrap(page) if page is not None else gr.update(),
+               delta if delta is not None else gr.update())
+
+
+# ======================================================
+# Chart zoom: full-resolution window for static/js/charts.js
+# ======================================================
+def chart_slice(key, start, end, width):
+    kind, _, symbol = (key or "").partition(":")
+    if kind != "intraday" or not symbol:
+        return ""
+    stock = dispatch.load("stock")
+    try:
+        return run_in("compute", stock.intraday_slice, symbol, start or None, end or None, int(width or 0) or None)
+    except (Busy, PoolTimeout):
+        return ""
+
+
+def chart_tail(key, since):
+    """Newest bars of a live intraday chart (from its last candle on) for static/js/charts.js."""
+    kind, _, symbol = (key or "").partition(":")
+    if kind != "intraday" or not symbol or not since:
+        return ""
+    stock = dispatch.load("stock")
+    try:
+        return run_in("compute", stock.intraday_tail, symbol, since)
+    except (Busy, PoolTimeout):
+        return ""
 
 
 # ======================================================
 # UI
 # ======================================================
-with gr.Blocks(title="Stock / Index App") as iface:
+# CSS / Plotly / client scripts are served once as static files (assets.py)
+gr.set_static_paths(paths=assets.static_paths())
+
+with gr.Blocks(title="Stock / Index App", head=assets.head_html()) as iface:
 
     gr.Markdown("### **Stock / Index Data Fetcher**")
 
@@ -147,10 +202,50 @@ with gr.Blocks(title="Stock / Index App") as iface:
             scale=1
         )
 
+        end_date_input = gr.Textbox(
+            label="To Date (range)",
+            value="",
+            placeholder="DD-MM-YYYY",
+            scale=1
+        )
+
         fetch_btn = gr.Button("Fetch", scale=1)
 
+        live_btn = gr.Button("Live", scale=1)
+
+        stop_btn = gr.Button("Stop", scale=1)
+
+    with gr.Row():
+        screen_input = gr.Textbox(
+            label="Screener Filter",
+            value="",
+            placeholder="RSI14 < 30 and close > SMA200",
+            scale=4
+        )
+
+        budget_input = gr.Number(
+            label="Time Budget (s)",
+            value=60,
+            scale=1
+        )
+
+        screen_btn = gr.Button("Screen", scale=1)
+
     output = gr.HTML(label="Output")
 
+    # changed cells pushed by live mode (applied in place by static/js/live.js)
+    live_delta = gr.HTML()
+
+    # API-only endpoints (/call/chart_slice, /call/chart_tail) used by static/js/charts.js
+    with gr.Row(visible=False):
+        slice_key = gr.Textbox()
+        slice_start = gr.Textbox()
+        slice_end = gr.Textbox()
+        slice_width = gr.Number()
+        slice_out = gr.Textbox()
+        slice_btn = gr.Button()
+        tail_btn = gr.Button()
+
     # Update dropdown choices when mode changes
     mode_input.change(
         update_on_mode,
@@ -158,16 +253,51 @@ with gr.Blocks(title="Stock / Index App") as iface:
         outputs=req_type_input
     )
 
-    # Fetch button
+    # Fetch button (per-class limits are enforced by the worker pools; the
+    # UI limit admits every pool's workers + queue so Busy can actually fire)
     fetch_btn.click(
-        fetch_data,
-        inputs=[mode_input, req_type_input, name_input, date_input],
-        outputs=output
+        handle_request,
+        inputs=[mode_input, req_type_input, name_input, date_input, end_date_input],
+        outputs=output,
+        concurrency_limit=total_admission()
     )
 
+    # Screener button (generator: streams partial results)
+    screen_btn.click(
+        run_screener,
+        inputs=[screen_input, budget_input],
+        outputs=output,
+        concurrency_limit=pools["compute"].workers + pools["compute"].queue
+    )
+
+    # Live button (generator: page once, then only changed cells)
+    live_event = live_btn.click(
+        run_live,
+        inputs=[mode_input, req_type_input, name_input],
+        outputs=[output, live_delta],
+        concurrency_limit=int(os.environ.get("LIVE_VIEWERS", 64))
+    )
+    stop_btn.click(None, cancels=[live_event])
+
+    slice_btn.click(
+        chart_slice,
+        inputs=[slice_key, slice_start, slice_end, slice_width],
+        outputs=slice_out,
+        api_name="chart_slice"
+    )
+    tail_btn.click(
+        chart_tail,
+        inputs=[slice_key, slice_start],
+        outputs=slice_out,
+        api_name="chart_tail"
+    )
+
+iface.queue(max_size=int(os.environ.get("QUEUE_MAX_SIZE", 256)))
+
 
 # ======================================================
 # Launch
 # ======================================================
 if __name__ == "__main__":
+    dispatch.warmup()
     iface.launch(server_name="0.0.0.0", server_port=7860)
\ No newline at end of file
@@ -0,0 +1,66 @@
+# assets.py — shared CSS / JS served as static files instead of per response
+#
+# Page builders call stylesheet("bhavcopy") and get a <link> to
+# static/css/bhavcopy.css, which the browser fetches once and caches. The app
+# loads Plotly and the client scripts (static/js) once, through
+# Blocks(head=head_html()), so chart fragments are built with
+# include_plotlyjs=False and a repeat chart view transfers kilobytes, not the
+# ~3.5 MB Plotly bundle.
+#
+# ASSET_MODE=inline embeds everything instead (standalone HTML files, or
+# hosting without static file serving).
+
+import os
+import functools
+
+ASSET_MODE = os.environ.get("ASSET_MODE", "link")          # "link" | "inline"
+# Gradio 4 serves static paths under /file=, Gradio 5 under /gradio_api/file=
+ASSET_URL_PREFIX = os.environ.get("ASSET_URL_PREFIX", "/gradio_api/file=")
+# base of the Gradio HTTP API the client scripts call (Gradio 4: "")
+API_PREFIX = os.environ.get("API_PREFIX", "/gradio_api")
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+SCRIPTS = ["vtable.js", "charts.js", "live.js"]
+
+
+@functools.lru_cache(maxsize=None)
+def plotly_js_path():
+    """The bundled plotly.min.js, located without importing plotly (keeps app startup light)."""
+    import importlib.util
+    spec = importlib.util.find_spec("plotly")
+    return os.path.join(os.path.dirname(spec.origin), "package_data", "plotly.min.js")
+
+
+def static_paths():
+    """Directories to hand to gr.set_static_paths()."""
+    return [STATIC_DIR, os.path.dirname(plotly_js_path())]
+
+
+def asset_url(path):
+    return ASSET_URL_PREFIX + path
+
+
+@functools.lru_cache(maxsize=None)
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def inline():
+    return ASSET_MODE == "inline"
+
+
+def stylesheet(name):
+    """<link> to static/css/<name>.css, or the stylesheet inlined in ASSET_MODE=inline."""
+    path = os.path.join(STATIC_DIR, "css", name + ".css")
+    if inline():
+        return f"<style>\n{_read(path)}</style>"
+    return f'<link rel="stylesheet" href="{asset_url(path)}">'
+
+
+def head_html():
+    """Plotly + client scripts, loaded once per page."""
+    paths = [plotly_js_path()] + [os.path.join(STATIC_DIR, "js", s) for s in SCRIPTS]
+    if inline():
+        return "".join(f"<script>{_read(p)}</script>" for p in paths)
+    return "".join(f'<script src="{asset_url(p)}"></script>' for p in paths)
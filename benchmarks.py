@@ -0,0 +1,235 @@
+# benchmarks.py — micro-benchmarks for the hot data paths
+#
+#   python benchmarks.py            # run everything
+#   python benchmarks.py bhavcopy   # run one benchmark by name
+#
+# Inputs are synthetic but shaped like the real NSE payloads, so no network is needed.
+
+import io
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# ================================================================
+#                         HELPERS
+# ================================================================
+
+def timeit(fn, repeat=20):
+    """Best-of-`repeat` wall time of fn() in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+def report(title, rows):
+    print(f"\n{title}")
+    for label, ms in rows:
+        print(f"  {label:<40s} {ms:10.2f} ms")
+    if len(rows) == 2 and rows[1][1] > 0:
+        print(f"  {'speed-up':<40s} {rows[0][1] / rows[1][1]:10.1f} x")
+
+# ================================================================
+#                         BHAVCOPY
+# ================================================================
+
+def synthetic_bhavcopy_csv(n=2500, seed=0, date="17-Nov-2025"):
+    """sec_bhavdata_full_*.csv lookalike: padded fields, '-' for missing delivery data."""
+    rng = np.random.default_rng(seed)
+    lines = ["SYMBOL, SERIES, DATE1, PREV_CLOSE, OPEN_PRICE, HIGH_PRICE, LOW_PRICE, LAST_PRICE, "
+             "CLOSE_PRICE, AVG_PRICE, TTL_TRD_QNTY, TURNOVER_LACS, NO_OF_TRADES, DELIV_QTY, DELIV_PER"]
+    for i in range(n):
+        pc = rng.uniform(10, 5000)
+        o, c = pc * rng.uniform(0.97, 1.03), pc * rng.uniform(0.95, 1.05)
+        h, l = max(o, c) * 1.01, min(o, c) * 0.99
+        q = int(rng.integers(100, 10**7))
+        eq = i % 5 != 0
+        dq = f" {int(q * 0.4)}" if eq else " -"
+        dp = f" {rng.uniform(10, 90):.2f}" if eq else " -"
+        lines.append(f"SYM{i}, {'EQ' if eq else 'BE'}, {date}, {pc:.2f}, {o:.2f}, {h:.2f}, {l:.2f}, "
+                     f"{c:.2f}, {c:.2f}, {c:.2f}, {q}, {q * c / 1e5:.2f}, {q // 50},{dq},{dp}")
+    return "\n".join(lines) + "\n"
+
+def _legacy_bhav_pipeline(text):
+    """The pre-typed-parser path: read as text, strip commas per column, then compute."""
+    df = pd.read_csv(io.StringIO(text))
+    df.columns = df.columns.str.strip()
+    df.drop(columns=["DATE1", "LAST_PRICE", "AVG_PRICE"], inplace=True)
+    for col in ["PREV_CLOSE", "OPEN_PRICE", "HIGH_PRICE", "LOW_PRICE", "CLOSE_PRICE",
+                "TTL_TRD_QNTY", "TURNOVER_LACS", "NO_OF_TRADES", "DELIV_QTY", "DELIV_PER"]:
+        df[col] = df[col].astype(str).str.replace(",", "", regex=False).str.strip()
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    df = df[df["TURNOVER_LACS"] > 1000]
+    df["change"] = df["CLOSE_PRICE"] - df["PREV_CLOSE"]
+    df["perchange"] = (df["change"] / df["PREV_CLOSE"].replace(0, 1)) * 100
+    df["pergap"] = ((df["OPEN_PRICE"] - df["PREV_CLOSE"]) / df["PREV_CLOSE"].replace(0, 1)) * 100
+    return df
+
+def _typed_bhav_pipeline(text):
+    from bhavcopy_store import parse_bhavcopy
+    from bhavcopy_html import bhav_metrics
+    df = parse_bhavcopy(io.StringIO(text))
+    df.drop(columns=["DATE1", "LAST_PRICE", "AVG_PRICE"], inplace=True)
+    return bhav_metrics(df)
+
+def bench_bhavcopy(n=2500, repeat=20):
+    text = synthetic_bhavcopy_csv(n)
+    old, new = _legacy_bhav_pipeline(text), _typed_bhav_pipeline(text)
+    assert np.allclose(old["perchange"].to_numpy(), new["perchange"].to_numpy())
+    report(f"bhavcopy parse + compute ({n} rows)", [
+        ("legacy string cleanup", timeit(lambda: _legacy_bhav_pipeline(text), repeat)),
+        ("typed parser + array pipeline", timeit(lambda: _typed_bhav_pipeline(text), repeat)),
+    ])
+
+# ================================================================
+#                         COLORED TABLE
+# ================================================================
+
+def synthetic_constituents(n=500, seed=0):
+    """nse_index_live constituents lookalike: symbol + numeric metric columns."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "symbol": [f"SYM{i}" for i in range(n)],
+        "open": rng.uniform(10, 5000, n), "dayHigh": rng.uniform(10, 5000, n),
+        "dayLow": rng.uniform(10, 5000, n), "lastPrice": rng.uniform(10, 5000, n),
+        "change": rng.normal(0, 20, n), "pChange": rng.normal(0, 2, n),
+        "totalTradedVolume": rng.integers(1000, 10**7, n), "totalTradedValue": rng.uniform(1e5, 1e9, n),
+        "nearWKH": rng.uniform(0, 50, n), "nearWKL": rng.uniform(-50, 0, n),
+        "perChange365d": rng.normal(10, 30, n), "perChange30d": rng.normal(1, 8, n),
+    })
+
+def _legacy_df_to_html_color(df, metric_col=None):
+    """The per-cell iterrows renderer formerly in index_live_html / preopen_html."""
+    df_html = df.copy()
+    top3_up, top3_down = [], []
+    if metric_col and metric_col in df_html.columns and pd.api.types.is_numeric_dtype(df_html[metric_col]):
+        col_numeric = df_html[metric_col].dropna()
+        top3_up = col_numeric.nlargest(3).index.tolist()
+        top3_down = col_numeric.nsmallest(3).index.tolist()
+    df_html = df_html.astype(object)
+    for idx, row in df_html.iterrows():
+        for col in df_html.columns:
+            val = row[col]
+            style = ""
+            if isinstance(val, (int, float, np.number)):
+                val_fmt = f"{val:.2f}"
+                if val > 0:
+                    style = "numeric-positive"
+                elif val < 0:
+                    style = "numeric-negative"
+                if metric_col == col:
+                    if idx in top3_up:
+                        style += " top-up"
+                    elif idx in top3_down:
+                        style += " top-down"
+                df_html.at[idx, col] = f'<span class="{style.strip()}">{val_fmt}</span>'
+            else:
+                df_html.at[idx, col] = str(val)
+    return df_html.to_html(index=False, escape=False, classes="compact-table")
+
+def bench_color_table(n=500, repeat=10):
+    from common import color_table
+    df = synthetic_constituents(n)
+    metrics = ["pChange", "totalTradedValue", "nearWKH", "nearWKL", "perChange365d", "perChange30d"]
+
+    def legacy():
+        _legacy_df_to_html_color(df)
+        for m in metrics:
+            _legacy_df_to_html_color(df[["symbol", m]], metric_col=m)
+
+    def vectorised():
+        color_table(df)
+        for m in metrics:
+            color_table(df[["symbol", m]], metric_col=m)
+
+    report(f"colored constituent tables ({n} rows, full + {len(metrics)} metric tables)", [
+        ("iterrows + df.at per cell", timeit(legacy, repeat)),
+        ("column-wise NumPy + single join", timeit(vectorised, repeat)),
+    ])
+
+# ================================================================
+#                         BLACK-SCHOLES
+# ================================================================
+
+def synthetic_chain(expiries=6, strikes=250, spot=52000.0, seed=0):
+    """BANKNIFTY-like chain as flat arrays: every strike x expiry, calls and puts."""
+    from black_scholes import price
+    rng = np.random.default_rng(seed)
+    K = np.arange(strikes) * 100.0 + spot - strikes * 50
+    T = (np.arange(1, expiries + 1) * 7 - 3) / 365
+    K, T = np.meshgrid(K, T)
+    K, T = np.concatenate([K.ravel()] * 2), np.concatenate([T.ravel()] * 2)
+    call = np.arange(len(K)) < len(K) // 2
+    sigma = 0.13 + 0.6 * (K / spot - 1) ** 2 + rng.normal(0, 0.005, len(K))
+    premium = np.round(price(spot, K, T, 0.065, sigma, call) / 0.05) * 0.05     # tick size
+    return premium, spot, K, T, call
+
+def _scalar_iv_and_greeks(premium, spot, K, T, call, r=0.065):
+    """Strike-by-strike Newton with math.erf: the per-contract Python loop."""
+    import math
+    cdf = lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2)))
+    pdf = lambda x: math.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
+    out = []
+    for p, k, t, c in zip(premium.tolist(), K.tolist(), T.tolist(), call.tolist()):
+        sig, ok = 0.3, False
+        for _ in range(50):
+            d1 = (math.log(spot / k) + (r + 0.5 * sig * sig) * t) / (sig * math.sqrt(t))
+            d2 = d1 - sig * math.sqrt(t)
+            model = spot * cdf(d1) - k * math.exp(-r * t) * cdf(d2) if c else \
+                k * math.exp(-r * t) * cdf(-d2) - spot * cdf(-d1)
+            v = spot * pdf(d1) * math.sqrt(t)
+            if abs(model - p) < 1e-6 * p:
+                ok = True
+                break
+            if v < 1e-12:
+                break
+            sig = min(max(sig - (model - p) / v, 1e-4), 5.0)
+        if not ok:
+            out.append((float("nan"),) * 5)
+            continue
+        delta = cdf(d1) if c else cdf(d1) - 1
+        gamma = pdf(d1) / (spot * sig * math.sqrt(t))
+        theta = (-spot * pdf(d1) * sig / (2 * math.sqrt(t))
+                 - (r * k * math.exp(-r * t) * cdf(d2) if c else -r * k * math.exp(-r * t) * cdf(-d2))) / 365
+        out.append((sig, delta, gamma, theta, spot * pdf(d1) * math.sqrt(t) / 100))
+    return out
+
+def bench_black_scholes(expiries=6, strikes=250, repeat=5):
+    from black_scholes import iv_and_greeks
+    premium, spot, K, T, call = synthetic_chain(expiries, strikes)
+    n = len(K)
+    g = iv_and_greeks(premium, spot, K, T, 0.065, call)
+    scalar = np.array([x[0] for x in _scalar_iv_and_greeks(premium, spot, K, T, call)])
+    # compare where IV is well defined: >= 10 ticks of premium per vol point
+    both = np.isfinite(scalar) & g["converged"] & (g["vega"] > 0.5)
+    assert np.allclose(scalar[both], g["iv"][both], atol=1e-3)
+
+    loop_ms = timeit(lambda: _scalar_iv_and_greeks(premium, spot, K, T, call), repeat)
+    vec_ms = timeit(lambda: iv_and_greeks(premium, spot, K, T, 0.065, call), repeat)
+    report(f"IV + Greeks, full chain ({expiries} expiries x {strikes} strikes x CE/PE = {n} contracts)", [
+        ("per-contract Python Newton loop", loop_ms),
+        ("batched NumPy safeguarded Newton", vec_ms),
+    ])
+    print(f"  {'throughput (loop)':<40s} {n / loop_ms * 1e3:10.0f} contracts/s")
+    print(f"  {'throughput (batched)':<40s} {n / vec_ms * 1e3:10.0f} contracts/s")
+    # the loop's count includes deep-ITM contracts it accepts at the 0.3 start
+    # (premium-relative tolerance, no time value); the batched solver returns NaN there
+    print(f"  {'solved (loop / batched)':<40s} {np.isfinite(scalar).mean():9.1%} / {g['converged'].mean():.1%}")
+
+    big = [np.tile(a, 40) for a in (premium, K, T, call)]
+    big_ms = timeit(lambda: iv_and_greeks(big[0], spot, big[1], big[2], 0.065, big[3]), 3)
+    print(f"  {'throughput (batched, %d contracts)' % len(big[0]):<40s} {len(big[0]) / big_ms * 1e3:10.0f} contracts/s")
+
+
+BENCHMARKS = {
+    "bhavcopy": bench_bhavcopy,
+    "color_table": bench_color_table,
+    "black_scholes": bench_black_scholes,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
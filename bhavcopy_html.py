@@ -1,6 +1,44 @@
 import pandas as pd
+import numpy as np
 import datetime
 from nsepython import *
+from bhavcopy_store import load_bhavcopy, NUMERIC_COLS
+from bhavcopy_panel import load_panel
+from common import table_html
+from assets import stylesheet
+from render_cache import cached_render, persistent_render, is_past
+
+BHAV_CSS = stylesheet("bhavcopy")
+
+def bhav_metrics(df, min_turnover=1000):
+    """
+    Keep rows with TURNOVER_LACS > min_turnover and add change / perchange / pergap.
+    Works on contiguous float64 arrays pulled from the typed store columns.
+    """
+    numeric_cols = [col for col in NUMERIC_COLS if col in df.columns]
+    arrays = {col: np.nan_to_num(df[col].to_numpy(dtype="float64", na_value=np.nan)) for col in numeric_cols}
+
+    keep = arrays["TURNOVER_LACS"] > min_turnover
+    out = df.loc[keep].copy()
+    for col in numeric_cols:
+        arrays[col] = arrays[col][keep]
+        out[col] = arrays[col]
+
+    prev = arrays["PREV_CLOSE"]
+    base = np.where(prev == 0, 1.0, prev)
+    change = arrays["CLOSE_PRICE"] - prev
+    out["change"] = change
+    out["perchange"] = change / base * 100
+    out["pergap"] = (arrays["OPEN_PRICE"] - prev) / base * 100
+    return out
+
+def _bhavcopy_page(date_str):
+    try:
+        df = load_bhavcopy(date_str)   # local store, downloads once if missing
+    except Exception:
+        raise LookupError(date_str)
+    return render_bhavcopy_html(df, date_str)
+
 
 def build_bhavcopy_html(date_str):
     # -------------------------------------------------------
@@ -12,66 +50,33 @@ def build_bhavcopy_html(date_str):
         return "<h3>Invalid date format. Use DD-MM-YYYY.</h3>"
 
     # -------------------------------------------------------
-    # 2) Fetch Bhavcopy
+    # 2) Past days never change: rendered once, kept on disk
     # -------------------------------------------------------
     try:
-        df = nse_bhavcopy(date_str)   # <-- your custom loader
-        df.columns = df.columns.str.strip()
+        if is_past(date_str):
+            return persistent_render("bhavcopy", (date_str,), _bhavcopy_page)
+        df = load_bhavcopy(date_str)
     except:
         return f"<h3>No Bhavcopy found for {date_str}.</h3>"
+    return cached_render("bhavcopy", (date_str,), df, render_bhavcopy_html)
+
 
+def render_bhavcopy_html(df, date_str=""):
     # -------------------------------------------------------
     # 3) Drop unwanted columns safely
     # -------------------------------------------------------
     remove = ["DATE1", "LAST_PRICE", "AVG_PRICE"]
-    df.drop(columns=[col for col in remove if col in df.columns], inplace=True)
-
-    # -------------------------------------------------------
-    # 4) Convert numeric columns properly
-    # -------------------------------------------------------
-    numeric_cols = [
-        "PREV_CLOSE",
-        "OPEN_PRICE",
-        "HIGH_PRICE",
-        "LOW_PRICE",
-        "CLOSE_PRICE",
-        "TTL_TRD_QNTY",
-        "TURNOVER_LACS",
-        "NO_OF_TRADES",
-        "DELIV_QTY",
-        "DELIV_PER"
-    ]
-
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.replace(",", "", regex=False)
-                .str.strip()
-            )
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-    # -------------------------------------------------------
-    # 5) Filter by turnover
-    # -------------------------------------------------------
-    df = df[df["TURNOVER_LACS"] > 1000]
+    df = df.drop(columns=[col for col in remove if col in df.columns])
 
     # -------------------------------------------------------
-    # 6) Add computed columns
+    # 4-6) Turnover filter + computed columns (typed, vectorised)
     # -------------------------------------------------------
-    df["change"] = df["CLOSE_PRICE"] - df["PREV_CLOSE"]
-    df["perchange"] = (df["change"] / df["PREV_CLOSE"].replace(0, 1)) * 100
-    df["pergap"] = ((df["OPEN_PRICE"] - df["PREV_CLOSE"]) / df["PREV_CLOSE"].replace(0, 1)) * 100
+    df = bhav_metrics(df)
 
     # -------------------------------------------------------
     # 7) MAIN TABLE (vertical scroll)
     # -------------------------------------------------------
-    main_html = f"""
-    <div class="main-table-container">
-        {df.to_html(index=False, escape=False)}
-    </div>
-    """
+    main_html = table_html(df, escape=False, container="main-table-container")
 
     # -------------------------------------------------------
     # 8) GRID TABLE (SYMBOL vs metric)
@@ -86,7 +91,7 @@ def build_bhavcopy_html(date_str):
             f"""
             <div class="col">
                 <h4>{metric}</h4>
-                {temp_df.to_html(index=False, escape=False)}
+                {table_html(temp_df, escape=False)}
             </div>
             """
         )
@@ -100,53 +105,7 @@ def build_bhavcopy_html(date_str):
     # -------------------------------------------------------
     # 9) CSS (improved header style)
     # -------------------------------------------------------
-    css = """
-    <style>
-        .grid {
-            display: grid;
-            grid-template-columns: repeat(5, 1fr);
-            gap: 10px;
-            margin-top: 20px;
-        }
-        .col {
-            max-height: 480px;
-            overflow-y: scroll;
-            border: 1px solid #ccc;
-            padding: 4px;
-            background: #fafafa;
-        }
-        .main-table-container {
-            max-height: 480px;
-            overflow-y: scroll;
-            border: 1px solid #ccc;
-            padding: 4px;
-            background: #fff;
-            margin-bottom: 20px;
-        }
-        table {
-            font-size: 12px;
-            border-collapse: collapse;
-            width: 100%;
-        }
-        th, td {
-            padding: 4px 8px;
-            border: 1px solid #ddd;
-        }
-        th {
-            background: linear-gradient(to bottom, #4CAF50, #2E7D32);
-            color: white;
-            font-weight: bold;
-            text-align: center;
-            position: sticky;
-            top: 0;
-            z-index: 3;
-            box-shadow: 0 2px 2px -1px rgba(0,0,0,0.4);
-        }
-        td {
-            text-align: right;
-        }
-    </style>
-    """
+    css = BHAV_CSS
 
     # -------------------------------------------------------
     # 10) Final Output
@@ -158,3 +117,45 @@ def build_bhavcopy_html(date_str):
         "<h2>Matrix/Grid Table</h2>" +
         grid_html
     )
+
+
+def build_bhav_range_html(start_str, end_str, top=50):
+    """Multi-day view over the symbol x date bhavcopy panel for [start, end]."""
+    try:
+        start = datetime.datetime.strptime(start_str, "%d-%m-%Y").date()
+        end = datetime.datetime.strptime(end_str, "%d-%m-%Y").date()
+    except:
+        return "<h3>Invalid date format. Use DD-MM-YYYY.</h3>"
+    if end < start:
+        return "<h3>End date must not be before start date.</h3>"
+
+    panel = load_panel(start_str, end_str)
+    lo, hi = panel.span(start, end)
+    days = hi - lo
+    if days == 0:
+        return f"<h3>No Bhavcopy found between {start_str} and {end_str}.</h3>"
+
+    def fmt_dates(df):
+        df = df.copy()
+        df.columns = [c.strftime("%d-%m") if isinstance(c, datetime.date) else c for c in df.columns]
+        return df
+
+    deliv = fmt_dates(panel.delivery_trend(days, end=end, top=top)).round(2)
+    gaps_up = panel.top_gaps(days, n=top, end=end, direction="up").round(2)
+    gaps_down = panel.top_gaps(days, n=top, end=end, direction="down").round(2)
+    ranks = panel.turnover_rank_change(days, end=end, top=top).round(2)
+
+    def section(title, df, index=False):
+        return f"""
+        <h2>{title}</h2>
+        {table_html(df, escape=False, index=index, container="main-table-container")}
+        """
+
+    return (
+        BHAV_CSS +
+        f"<h3>{days} sessions: {panel.dates[lo]:%d-%m-%Y} to {panel.dates[hi - 1]:%d-%m-%Y}</h3>" +
+        section("Delivery % Trend (top slopes)", deliv, index=True) +
+        section("Top Gap-Ups", gaps_up) +
+        section("Top Gap-Downs", gaps_down) +
+        section("Turnover Rank Changes", ranks, index=True)
+    )
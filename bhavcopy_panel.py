@@ -0,0 +1,230 @@
+# bhavcopy_panel.py — multi-day bhavcopy as a symbol x date panel
+#
+# Each field (CLOSE_PRICE, DELIV_PER, ...) is one float64 2-D array:
+#   rows = symbols, columns = trading dates (sorted), NaN where a symbol did not trade.
+# Days are added incrementally from the local bhavcopy store, so extending a
+# range only loads the new files. Queries are whole-array NumPy operations.
+# Days with no bhavcopy (holidays, not yet published) are remembered so they are
+# not downloaded again; the panel keeps at most PANEL_MAX_DAYS sessions.
+
+import os
+import time
+import datetime
+import threading
+import numpy as np
+import pandas as pd
+
+from bhavcopy_store import load_bhavcopy, parse_date
+
+PANEL_MAX_DAYS = int(os.environ.get("PANEL_MAX_DAYS", 300))
+# how long a day that failed to load is skipped: recent days may still be published
+MISSING_TTL_RECENT = 15 * 60
+MISSING_TTL_OLD = 7 * 24 * 3600
+RECENT_DAYS = 5
+
+PANEL_FIELDS = [
+    "PREV_CLOSE", "OPEN_PRICE", "HIGH_PRICE", "LOW_PRICE", "CLOSE_PRICE",
+    "TTL_TRD_QNTY", "TURNOVER_LACS", "NO_OF_TRADES", "DELIV_QTY", "DELIV_PER"
+]
+
+
+class BhavPanel:
+    def __init__(self, fields=PANEL_FIELDS, series=("EQ",), max_days=PANEL_MAX_DAYS):
+        self.fields = list(fields)
+        self.max_days = max_days
+        self._missing = {}           # date -> monotonic time until which it is not retried
+        self.series = set(series) if series else None
+        self.symbols = []
+        self.dates = []
+        self._row = {}
+        self._arrays = {f: np.full((0, 0), np.nan) for f in self.fields}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------
+    #                       BUILDING
+    # ------------------------------------------------------------
+
+    def _reserve(self, n_rows, n_cols):
+        """Grow the backing arrays geometrically so appends are amortised O(1)."""
+        rows_cap, cols_cap = self._arrays[self.fields[0]].shape
+        if n_rows <= rows_cap and n_cols <= cols_cap:
+            return
+        new_shape = (max(n_rows, rows_cap * 2, 64), max(n_cols, cols_cap * 2, 8))
+        for f, arr in self._arrays.items():
+            grown = np.full(new_shape, np.nan)
+            grown[:arr.shape[0], :arr.shape[1]] = arr
+            self._arrays[f] = grown
+
+    def add_day(self, date, df):
+        """Add one day's bhavcopy (typed store frame). Re-adding a date overwrites it."""
+        if self.series is not None and "SERIES" in df.columns:
+            df = df[df["SERIES"].isin(self.series)]
+        df = df.drop_duplicates("SYMBOL")
+
+        with self._lock:
+            syms = df["SYMBOL"].tolist()
+            for s in syms:
+                if s not in self._row:
+                    self._row[s] = len(self.symbols)
+                    self.symbols.append(s)
+            rows = np.fromiter((self._row[s] for s in syms), dtype=np.intp, count=len(syms))
+
+            n = len(self.dates)
+            pos = int(np.searchsorted(np.array(self.dates, dtype="datetime64[D]"), np.datetime64(date, "D")))
+            existing = pos < n and self.dates[pos] == date
+            self._reserve(len(self.symbols), n if existing else n + 1)
+
+            for f, arr in self._arrays.items():
+                if not existing and pos < n:
+                    arr[:, pos + 1:n + 1] = arr[:, pos:n]
+                arr[:, pos] = np.nan
+                if f in df.columns:
+                    arr[rows, pos] = df[f].to_numpy(dtype="float64")
+            if not existing:
+                self.dates.insert(pos, date)
+
+    def ensure_range(self, start_str, end_str, fetch=True):
+        """
+        Load every weekday in [start, end] not yet in the panel; returns dates
+        that could not be loaded. A day that failed to download is skipped for
+        MISSING_TTL_RECENT (last RECENT_DAYS days) or MISSING_TTL_OLD (older).
+        """
+        start, end = parse_date(start_str), parse_date(end_str)
+        today = datetime.date.today()
+        now = time.monotonic()
+        have = set(self.dates)
+        missing = []
+        for d in pd.bdate_range(start, end).date:
+            if d in have:
+                continue
+            if d > today or self._missing.get(d, 0) > now:
+                missing.append(d)
+                continue
+            try:
+                self.add_day(d, load_bhavcopy(d.strftime("%d-%m-%Y"), fetch=fetch))
+                self._missing.pop(d, None)
+            except Exception:
+                missing.append(d)
+                if fetch:          # only a failed download proves the day is absent
+                    recent = (today - d).days <= RECENT_DAYS
+                    self._missing[d] = now + (MISSING_TTL_RECENT if recent else MISSING_TTL_OLD)
+        self._trim(start, end)
+        return missing
+
+    def _trim(self, keep_start, keep_end):
+        """Drop the sessions furthest from [keep_start, keep_end] once over max_days."""
+        with self._lock:
+            n = len(self.dates)
+            if n <= self.max_days:
+                return
+            dist = [(keep_start - d).days if d < keep_start else (d - keep_end).days if d > keep_end else 0
+                    for d in self.dates]
+            order = np.argsort(dist, kind="stable")
+            keep = np.sort(order[:max(self.max_days, int(np.count_nonzero(np.array(dist) == 0)))])
+            if len(keep) == n:
+                return
+            for f, arr in self._arrays.items():
+                arr[:, :len(keep)] = arr[:, keep]
+                arr[:, len(keep):n] = np.nan
+            self.dates = [self.dates[i] for i in keep]
+
+    # ------------------------------------------------------------
+    #                       ACCESS
+    # ------------------------------------------------------------
+
+    def field(self, name, start=None, end=None):
+        """View (no copy) of one field: symbols x dates, optionally limited to [start, end]."""
+        lo, hi = self.span(start, end)
+        return self._arrays[name][:len(self.symbols), lo:hi]
+
+    def span(self, start=None, end=None):
+        dates = np.array(self.dates, dtype="datetime64[D]")
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, "D"), "left"))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(end, "D"), "right"))
+        return lo, hi
+
+    def frame(self, name, start=None, end=None):
+        lo, hi = self.span(start, end)
+        return pd.DataFrame(self.field(name, start, end), index=self.symbols, columns=self.dates[lo:hi])
+
+    # ------------------------------------------------------------
+    #                       QUERIES
+    # ------------------------------------------------------------
+
+    def delivery_trend(self, days=10, end=None, top=None):
+        """
+        Delivery % over the last `days` sessions with a least-squares slope per symbol
+        (NaN-aware, so symbols that missed a session still get a slope).
+        """
+        lo, hi = self.span(None, end)
+        lo = max(lo, hi - days)
+        y = self._arrays["DELIV_PER"][:len(self.symbols), lo:hi]
+        x = np.broadcast_to(np.arange(y.shape[1], dtype="float64"), y.shape)
+        ok = ~np.isnan(y)
+        cnt = ok.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            xm = np.where(ok, x, 0).sum(axis=1) / cnt
+            ym = np.where(ok, y, 0).sum(axis=1) / cnt
+            dx = np.where(ok, x - xm[:, None], 0)
+            dy = np.where(ok, y - ym[:, None], 0)
+            slope = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+        slope[cnt < 2] = np.nan
+
+        out = pd.DataFrame(y, index=self.symbols, columns=self.dates[lo:hi])
+        out.insert(0, "slope", slope)
+        out.insert(1, "avg", ym)
+        out = out[cnt > 0].sort_values("slope", ascending=False)
+        return out.head(top) if top else out
+
+    def top_gaps(self, days=21, n=20, end=None, direction="up"):
+        """Largest opening gaps (OPEN vs PREV_CLOSE, %) across every symbol and day in the window."""
+        lo, hi = self.span(None, end)
+        lo = max(lo, hi - days)
+        prev = self._arrays["PREV_CLOSE"][:len(self.symbols), lo:hi]
+        opn = self._arrays["OPEN_PRICE"][:len(self.symbols), lo:hi]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            gap = (opn - prev) / np.where(prev == 0, np.nan, prev) * 100
+        flat = gap.ravel()
+        score = np.where(np.isnan(flat), -np.inf, flat if direction == "up" else -flat)
+        k = min(n, int(np.isfinite(score).sum()))
+        if k == 0:
+            return pd.DataFrame(columns=["SYMBOL", "DATE", "pergap"])
+        idx = np.argpartition(score, -k)[-k:]
+        idx = idx[np.argsort(score[idx])[::-1]]
+        r, c = np.unravel_index(idx, gap.shape)
+        return pd.DataFrame({
+            "SYMBOL": np.asarray(self.symbols, dtype=object)[r],
+            "DATE": np.asarray(self.dates[lo:hi], dtype=object)[c],
+            "pergap": flat[idx],
+        })
+
+    def turnover_rank_change(self, days=10, end=None, top=None):
+        """Turnover rank (1 = highest) at the start vs end of the window, and the places gained."""
+        lo, hi = self.span(None, end)
+        lo = max(lo, hi - days)
+        if hi - lo < 1:
+            return pd.DataFrame(columns=["rank_start", "rank_end", "rank_change"])
+        t = self._arrays["TURNOVER_LACS"][:len(self.symbols), lo:hi]
+
+        def rank(col):
+            order = np.argsort(np.where(np.isnan(col), -np.inf, col))[::-1]
+            r = np.empty(len(col), dtype="float64")
+            r[order] = np.arange(1, len(col) + 1)
+            r[np.isnan(col)] = np.nan
+            return r
+
+        first, last = rank(t[:, 0]), rank(t[:, -1])
+        out = pd.DataFrame({
+            "TURNOVER_START": t[:, 0], "TURNOVER_END": t[:, -1],
+            "rank_start": first, "rank_end": last, "rank_change": first - last,
+        }, index=self.symbols).dropna(subset=["rank_change"])
+        out = out.sort_values("rank_change", ascending=False)
+        return out.head(top) if top else out
+
+
+# Process-wide panel shared by every request; grows as new ranges are asked for.
+bhav_panel = BhavPanel()
+
+def load_panel(start_str, end_str, fetch=True):
+    bhav_panel.ensure_range(start_str, end_str, fetch=fetch)
+    return bhav_panel
@@ -0,0 +1,159 @@
+# bhavcopy_store.py — local date-partitioned bhavcopy warehouse
+#
+# One immutable Arrow IPC (Feather v2, uncompressed) file per trading day:
+#   data/bhavcopy/<YYYY>/bhav_<YYYYMMDD>.arrow
+# Numeric columns are stored typed (float64), so readers never strip commas again,
+# and uncompressed IPC files can be memory-mapped straight into Arrow buffers.
+#
+# Backfill from the command line:
+#   python bhavcopy_store.py 01-11-2025 14-11-2025
+
+import os
+import sys
+import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from nsepython import bhavcopy_url
+
+BHAV_DIR = os.environ.get(
+    "BHAV_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "bhavcopy")
+)
+
+STRING_COLS = ["SYMBOL", "SERIES"]
+NUMERIC_COLS = [
+    "PREV_CLOSE", "OPEN_PRICE", "HIGH_PRICE", "LOW_PRICE", "LAST_PRICE",
+    "CLOSE_PRICE", "AVG_PRICE", "TTL_TRD_QNTY", "TURNOVER_LACS",
+    "NO_OF_TRADES", "DELIV_QTY", "DELIV_PER"
+]
+
+# ================================================================
+#                         PATHS / DATES
+# ================================================================
+
+def parse_date(date_str):
+    """DD-MM-YYYY -> datetime.date (raises ValueError on bad input)."""
+    return datetime.datetime.strptime(date_str.strip(), "%d-%m-%Y").date()
+
+def bhav_path(d):
+    return os.path.join(BHAV_DIR, d.strftime("%Y"), f"bhav_{d:%Y%m%d}.arrow")
+
+def has_bhavcopy(date_str):
+    return os.path.exists(bhav_path(parse_date(date_str)))
+
+def stored_dates():
+    """All dates present in the store, oldest first."""
+    out = []
+    if not os.path.isdir(BHAV_DIR):
+        return out
+    for year in os.listdir(BHAV_DIR):
+        ydir = os.path.join(BHAV_DIR, year)
+        if not os.path.isdir(ydir):
+            continue
+        for f in os.listdir(ydir):
+            if f.startswith("bhav_") and f.endswith(".arrow"):
+                out.append(datetime.datetime.strptime(f[5:13], "%Y%m%d").date())
+    return sorted(out)
+
+# ================================================================
+#                         TYPED PARSER
+# ================================================================
+
+BHAV_DTYPES = {**{c: "string" for c in STRING_COLS}, **{c: "float64" for c in NUMERIC_COLS}}
+
+def parse_bhavcopy(src):
+    """
+    Read a sec_bhavdata_full CSV (path, URL or buffer) in one pass with explicit
+    dtypes: padded fields are skipped by the tokenizer, "," is the thousands
+    separator and "-" (no delivery data) becomes NaN.
+    """
+    try:
+        df = pd.read_csv(src, skipinitialspace=True, thousands=",",
+                         na_values=["-"], dtype=BHAV_DTYPES)
+    except ValueError:
+        # an unexpected token in a numeric column: fall back to text + coerce
+        if hasattr(src, "seek"):
+            src.seek(0)
+        df = pd.read_csv(src, skipinitialspace=True, dtype=str)
+        for col in NUMERIC_COLS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col].str.replace(",", "", regex=False).str.strip(),
+                                        errors="coerce").astype("float64")
+    df.columns = df.columns.str.strip()
+    if "DATE1" in df.columns:
+        df["DATE1"] = pd.to_datetime(df["DATE1"], format="%d-%b-%Y", errors="coerce")
+    return df
+
+# ================================================================
+#                         INGEST / LOAD
+# ================================================================
+
+def ingest_bhavcopy(date_str, overwrite=False):
+    """
+    Download one day's bhavcopy and store it. Existing files are left alone
+    (a published bhavcopy never changes) unless overwrite=True.
+    Returns the file path.
+    """
+    d = parse_date(date_str)
+    path = bhav_path(d)
+    if os.path.exists(path) and not overwrite:
+        return path
+
+    df = parse_bhavcopy(bhavcopy_url(d.strftime("%d-%m-%Y")))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+    return path
+
+def load_bhavcopy_table(date_str, fetch=True):
+    """Memory-mapped Arrow table for one day; downloads and stores it first if missing."""
+    d = parse_date(date_str)
+    path = bhav_path(d)
+    if not os.path.exists(path):
+        if not fetch:
+            raise FileNotFoundError(f"No stored bhavcopy for {date_str}")
+        ingest_bhavcopy(date_str)
+    return feather.read_table(path, memory_map=True)
+
+def load_bhavcopy(date_str, fetch=True):
+    """Typed bhavcopy DataFrame for one day (see load_bhavcopy_table)."""
+    return load_bhavcopy_table(date_str, fetch=fetch).to_pandas()
+
+def backfill(start_str, end_str, overwrite=False, verbose=False):
+    """
+    Ingest every weekday in [start, end]. Holidays simply have no file on
+    NSE's archive and are reported under "missing".
+    """
+    start, end = parse_date(start_str), parse_date(end_str)
+    report = {"stored": [], "existing": [], "missing": []}
+    d = start
+    while d <= end:
+        if d.weekday() < 5:
+            ds = d.strftime("%d-%m-%Y")
+            if os.path.exists(bhav_path(d)) and not overwrite:
+                report["existing"].append(ds)
+            else:
+                try:
+                    ingest_bhavcopy(ds, overwrite=overwrite)
+                    report["stored"].append(ds)
+                    if verbose:
+                        print(f"{ds}: stored")
+                except Exception as e:
+                    report["missing"].append(ds)
+                    if verbose:
+                        print(f"{ds}: missing ({e})")
+        d += datetime.timedelta(days=1)
+    return report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("usage: python bhavcopy_store.py DD-MM-YYYY [DD-MM-YYYY]")
+        sys.exit(1)
+    r = backfill(sys.argv[1], sys.argv[-1], verbose=True)
+    print(f"stored={len(r['stored'])} existing={len(r['existing'])} missing={len(r['missing'])}")
@@ -0,0 +1,179 @@
+# black_scholes.py — batched Black-Scholes pricing, implied volatility and Greeks
+#
+# Everything takes NumPy arrays (or scalars) that broadcast together, so a
+# whole option chain — every strike of every expiry, calls and puts — is
+# priced or inverted in one call instead of a Python loop per strike.
+# T is in years, r / q / sigma are annual decimals (0.065, not 6.5).
+#
+#   iv = implied_vol(premium, spot, strikes, T, 0.065, call=is_call)
+#   g = iv_and_greeks(premium, spot, strikes, T, 0.065, call=is_call)
+#   g["iv"], g["delta"], g["gamma"], g["theta"], g["vega"], g["converged"]
+#
+# Throughput: python benchmarks.py black_scholes
+
+import numpy as np
+
+# ================================================================
+#                         NORMAL DISTRIBUTION
+# ================================================================
+
+_SQRT2 = np.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+
+def _erfc(x):
+    """Complementary error function (Chebyshev fit, fractional error < 1.2e-7)."""
+    z = np.abs(x)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = -z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+            -0.82215223 + t * 0.17087277))))))))
+    r = t * np.exp(poly)
+    return np.where(x >= 0, r, 2.0 - r)
+
+
+def norm_cdf(x):
+    return 0.5 * _erfc(-np.asarray(x, dtype="float64") / _SQRT2)
+
+
+def norm_pdf(x):
+    x = np.asarray(x, dtype="float64")
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+# ================================================================
+#                         PRICING
+# ================================================================
+
+def _d1_d2(S, K, T, r, sigma, q):
+    vol = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol
+    return d1, d1 - vol
+
+
+def price(S, K, T, r, sigma, call=True, q=0.0):
+    """Black-Scholes(-Merton) premium; call may be a boolean array."""
+    S, K, T, sigma = (np.asarray(a, dtype="float64") for a in (S, K, T, sigma))
+    d1, d2 = _d1_d2(S, K, T, r, sigma, q)
+    df_r, df_q = np.exp(-r * T), np.exp(-q * T)
+    c = S * df_q * norm_cdf(d1) - K * df_r * norm_cdf(d2)
+    p = K * df_r * norm_cdf(-d2) - S * df_q * norm_cdf(-d1)
+    return np.where(call, c, p)
+
+
+def vega(S, K, T, r, sigma, q=0.0):
+    """dPrice/dsigma (per 1.00 of volatility), same for calls and puts."""
+    S, K, T, sigma = (np.asarray(a, dtype="float64") for a in (S, K, T, sigma))
+    d1, _ = _d1_d2(S, K, T, r, sigma, q)
+    return S * np.exp(-q * T) * norm_pdf(d1) * np.sqrt(T)
+
+# ================================================================
+#                         GREEKS
+# ================================================================
+
+def greeks(S, K, T, r, sigma, call=True, q=0.0):
+    """
+    Price and Greeks as a dict of arrays. theta is per calendar day and vega
+    per 1 volatility point (sigma 0.20 -> 0.21), the way NSE quotes them.
+    """
+    S, K, T, sigma = (np.asarray(a, dtype="float64") for a in (S, K, T, sigma))
+    call = np.asarray(call, dtype=bool)
+    d1, d2 = _d1_d2(S, K, T, r, sigma, q)
+    df_r, df_q = np.exp(-r * T), np.exp(-q * T)
+    pdf1, sqrt_t = norm_pdf(d1), np.sqrt(T)
+    n1, n2 = norm_cdf(d1), norm_cdf(d2)
+
+    decay = -S * df_q * pdf1 * sigma / (2 * sqrt_t)
+    theta_call = decay - r * K * df_r * n2 + q * S * df_q * n1
+    theta_put = decay + r * K * df_r * (1 - n2) - q * S * df_q * (1 - n1)
+    return {
+        "price": np.where(call, S * df_q * n1 - K * df_r * n2, K * df_r * (1 - n2) - S * df_q * (1 - n1)),
+        "delta": np.where(call, df_q * n1, df_q * (n1 - 1)),
+        "gamma": df_q * pdf1 / (S * sigma * sqrt_t),
+        "theta": np.where(call, theta_call, theta_put) / 365,
+        "vega": S * df_q * pdf1 * sqrt_t / 100,
+    }
+
+# ================================================================
+#                         IMPLIED VOLATILITY
+# ================================================================
+
+SIGMA_LO, SIGMA_HI = 1e-4, 5.0          # search bracket (0.01% .. 500%)
+
+
+def implied_vol(premium, S, K, T, r, call=True, q=0.0, tol=1e-6, max_iter=50, full_output=False):
+    """
+    Volatility that reproduces `premium`, solved for every element at once.
+
+    Safeguarded Newton: each element keeps a bracket [lo, hi] that the
+    price error narrows every iteration; a Newton step that leaves the bracket
+    (or has no vega to divide by) is replaced by bisection, so deep ITM/OTM
+    contracts converge instead of diverging. Each iteration only touches the
+    elements still unconverged (the `active` mask).
+
+    Premiums outside the no-arbitrage bounds, whose IV lies outside
+    [SIGMA_LO, SIGMA_HI], or not converged after max_iter, are NaN. full_output=True returns (iv, converged, iterations).
+    """
+    premium, S, K, T, call = np.broadcast_arrays(
+        *(np.asarray(a, dtype="float64") for a in (premium, S, K, T)), np.asarray(call, dtype=bool))
+    shape = premium.shape
+    premium, S, K, T, call = (a.ravel() for a in (premium, S, K, T, call))
+
+    fwd_s, fwd_k = S * np.exp(-q * T), K * np.exp(-r * T)
+    lower = np.where(call, np.maximum(fwd_s - fwd_k, 0), np.maximum(fwd_k - fwd_s, 0))
+    upper = np.where(call, fwd_s, fwd_k)
+    valid = np.isfinite(premium) & (premium > lower) & (premium < upper) & (T > 0) & (S > 0) & (K > 0)
+
+    # Manaster-Koehler start: the sigma at which d1 is maximally sensitive
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = np.sqrt(2.0 * np.abs(np.log(S / K) + (r - q) * T) / np.where(T > 0, T, 1.0))
+    sigma = np.clip(np.where(np.isfinite(sigma), sigma, 0.3), 0.05, 3.0)
+    lo, hi = np.full(sigma.shape, SIGMA_LO), np.full(sigma.shape, SIGMA_HI)
+    # converged when the error is small against the time value (premium - bound)
+    target = tol * (premium - lower)
+
+    out = np.full(premium.shape, np.nan)
+    converged = np.zeros(premium.shape, dtype=bool)
+    iterations = np.zeros(premium.shape, dtype=np.int32)
+    active = np.flatnonzero(valid)
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        s, k, t, c, sig = S[active], K[active], T[active], call[active], sigma[active]
+        d1, d2 = _d1_d2(s, k, t, r, sig, q)
+        df_q, df_r = np.exp(-q * t), np.exp(-r * t)
+        model = np.where(c, s * df_q * norm_cdf(d1) - k * df_r * norm_cdf(d2),
+                         k * df_r * norm_cdf(-d2) - s * df_q * norm_cdf(-d1))
+        diff = model - premium[active]
+        v = s * df_q * norm_pdf(d1) * np.sqrt(t)
+        iterations[active] += 1
+
+        # a collapsed bracket is a solution only if it also reprices: one pinned
+        # against SIGMA_LO / SIGMA_HI means the IV lies outside the search range
+        err = np.abs(diff)
+        collapsed = hi[active] - lo[active] < 1e-10
+        ok = (err < target[active]) | (collapsed & (err < np.maximum(target[active], 1e-9 * s)))
+        done = ok | collapsed
+        out[active[ok]] = sig[ok]
+        converged[active[ok]] = True
+
+        # price rises with sigma: too high -> shrink hi, too low -> raise lo
+        a_lo = np.where(diff < 0, sig, lo[active])
+        a_hi = np.where(diff > 0, sig, hi[active])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = sig - diff / v
+        inside = np.isfinite(newton) & (newton > a_lo) & (newton < a_hi)
+        lo[active], hi[active] = a_lo, a_hi
+        sigma[active] = np.where(inside, newton, 0.5 * (a_lo + a_hi))
+        active = active[~done]
+
+    out, converged, iterations = out.reshape(shape), converged.reshape(shape), iterations.reshape(shape)
+    return (out, converged, iterations) if full_output else out
+
+
+def iv_and_greeks(premium, S, K, T, r, call=True, q=0.0, tol=1e-6, max_iter=50):
+    """implied_vol + greeks at that vol in one call; unsolved elements are NaN throughout."""
+    iv, converged, iterations = implied_vol(premium, S, K, T, r, call, q, tol, max_iter, full_output=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        g = greeks(S, K, T, r, iv, call, q)
+    g.pop("price")
+    return {"iv": iv, **g, "converged": converged, "iterations": iterations}
@@ -1,13 +1,115 @@
 # chart_builder.py
+import json
+import html
+import numpy as np
 import plotly.graph_objs as go
+import plotly.utils
 from plotly.subplots import make_subplots
 import pandas as pd
+from assets import inline, API_PREFIX
 
-def build_chart(data, indicators):
+# ================================================================
+#                         DOWNSAMPLING
+# ================================================================
+#
+# A chart never needs more candles than the plot is wide (~3 px per candle) or
+# more line points than pixels. Longer series are reduced before they reach
+# Plotly: candles/volume by OHLC resampling into equal-count buckets, indicator
+# lines by LTTB. chart_slice() re-renders a zoomed [start, end] window at full
+# resolution for that window.
+
+DEFAULT_WIDTH = 1200      # px, when the caller doesn't know the viewport
+PX_PER_BAR = 3
+
+
+def target_bars(width=None):
+    return max(int((width or DEFAULT_WIDTH) // PX_PER_BAR), 10)
+
+
+def resample_ohlc(data, n_bars):
+    """Merge consecutive rows into n_bars buckets: first open, max high, min low, last close, summed volume."""
+    n = len(data)
+    if n <= n_bars:
+        return data
+    starts = (np.arange(n_bars) * n) // n_bars
+    ends = np.append(starts[1:], n) - 1
+    out = {
+        "Open": data["Open"].to_numpy(dtype="float64")[starts],
+        "High": np.fmax.reduceat(data["High"].to_numpy(dtype="float64"), starts),
+        "Low": np.fmin.reduceat(data["Low"].to_numpy(dtype="float64"), starts),
+        "Close": data["Close"].to_numpy(dtype="float64")[ends],
+    }
+    if "Volume" in data.columns:
+        out["Volume"] = np.add.reduceat(np.nan_to_num(data["Volume"].to_numpy(dtype="float64")), starts)
+    return pd.DataFrame(out, index=data.index[starts])
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points of (x, y)
+    that keep the line's visual shape. x must be numeric and increasing.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_line(series, n_points):
+    """LTTB over the non-NaN part of an indicator series (keeps its index)."""
+    s = series.dropna()
+    if len(s) <= n_points:
+        return s
+    x = s.index.asi8.astype("float64") if isinstance(s.index, pd.DatetimeIndex) else np.arange(len(s), dtype="float64")
+    return s.iloc[lttb(x, s.to_numpy(dtype="float64"), n_points)]
+
+
+def _window(obj, start, end):
+    """Rows in [start, end]; naive bounds (what Plotly reports on zoom) take the index's timezone."""
+    if start is None and end is None:
+        return obj
+    tz = getattr(obj.index, "tz", None)
+
+    def ts(t):
+        if t is None:
+            return None
+        t = pd.Timestamp(t)
+        return t.tz_localize(tz) if tz is not None and t.tz is None else t
+
+    return obj.loc[ts(start):ts(end)]
+
+# ================================================================
+#                         FIGURE
+# ================================================================
+
+def build_figure(data, indicators=None, volume=True, width=None, start=None, end=None):
     """
     data: pd.DataFrame with OHLCV
     indicators: dict of series (MACD, RSI, SMA20, etc.)
+    volume: add the volume bar subplot
+    width: viewport width in px (sets how many candles / points are sent)
+    start, end: optional zoom window
     """
+    indicators = {k: (v if isinstance(v, pd.Series) else pd.Series(v, index=data.index))
+                  for k, v in (indicators or {}).items()}
+    data = _window(data, start, end)
+    indicators = {k: _window(v, start, end) for k, v in indicators.items()}
+
+    bars = resample_ohlc(data, target_bars(width))
+    points = int(width or DEFAULT_WIDTH)
+    lines = {k: downsample_line(v, points) for k, v in indicators.items()}
+
     fig = make_subplots(
         rows=3, cols=1,
         row_heights=[0.5, 0.2, 0.3],
@@ -20,37 +122,48 @@ def build_chart(data, indicators):
 
     # --- Main candlestick ---
     fig.add_trace(go.Candlestick(
-        x=data.index,
-        open=data['Open'], high=data['High'],
-        low=data['Low'], close=data['Close'],
+        x=bars.index,
+        open=bars['Open'], high=bars['High'],
+        low=bars['Low'], close=bars['Close'],
         name='Candlestick'
     ), row=1, col=1)
 
     # --- Add MA overlays on main chart ---
     for ma_name in ['SMA20','SMA50','EMA20','EMA50']:
-        if ma_name in indicators:
+        if ma_name in lines:
             fig.add_trace(go.Scatter(
-                x=data.index, y=indicators[ma_name],
+                x=lines[ma_name].index, y=lines[ma_name],
                 mode='lines', name=ma_name,
                 visible='legendonly'  # initially hidden, toggle via legend or script
             ), row=1, col=1)
 
     # --- Volume subplot ---
-    fig.add_trace(go.Bar(
-        x=data.index, y=data['Volume'],
-        name='Volume', marker_color='blue'
-    ), row=2, col=1)
+    if volume:
+        fig.add_trace(go.Bar(
+            x=bars.index, y=bars['Volume'],
+            name='Volume', marker_color='blue'
+        ), row=2, col=1)
 
     # --- Single indicator subplot (default empty, user selects via checkbox) ---
     for ind_name in ['MACD', 'RSI', 'Stochastic']:
-        if ind_name in indicators:
+        if ind_name in lines:
             fig.add_trace(go.Scatter(
-                x=data.index, y=indicators[ind_name],
+                x=lines[ind_name].index, y=lines[ind_name],
                 mode='lines', name=ind_name,
                 visible=False  # initially hidden, toggle via script
             ), row=3, col=1)
 
     fig.update_layout(height=900, showlegend=True, margin=dict(l=20,r=20,t=40,b=20))
+    return fig
+
+
+def build_chart(data, indicators=None, volume=True, width=None, slice_key=None, live_seconds=None):
+    """
+    Chart fragment for gr.HTML. slice_key (e.g. "intraday:ITC") lets
+    static/js/charts.js fetch a full-resolution window when the user zooms;
+    with live_seconds it also polls for the newest bars (chart_tail) that often.
+    """
+    fig = build_figure(data, indicators, volume, width)
 
     # --- Inject script for checkbox toggle ---
     script = """
@@ -67,7 +180,30 @@ def build_chart(data, indicators):
     }
     </script>
     """
-    
-    # Return full HTML
-    chart_html = fig.to_html(full_html=False, include_plotlyjs=True, div_id="chart")
+
+    # Plotly itself is loaded once per page (assets.head_html); inline mode embeds it
+    chart_html = fig.to_html(full_html=False, include_plotlyjs=inline(), div_id="chart")
+    if slice_key:
+        live = f' data-live="{float(live_seconds):g}"' if live_seconds else ""
+        chart_html = (f'<div class="chart-box" data-slice="{html.escape(slice_key)}" '
+                      f'data-api="{API_PREFIX}"{live}>{chart_html}</div>')
     return chart_html + script
+
+
+def chart_slice(data, indicators=None, start=None, end=None, width=None, volume=True):
+    """Trace data (JSON) for the [start, end] window, downsampled only to `width`; None = full range."""
+    fig = build_figure(data, indicators, volume, width, start or None, end or None)
+    return json.dumps({"data": fig.to_plotly_json()["data"]}, cls=plotly.utils.PlotlyJSONEncoder)
+
+
+TAIL_FIELDS = ("x", "y", "open", "high", "low", "close")
+
+def chart_tail(data, indicators=None, volume=True):
+    """
+    The newest bars as plain per-trace arrays, in build_figure's trace order and
+    not downsampled, for a live chart to splice onto its end instead of
+    re-rendering the whole series.
+    """
+    fig = build_figure(data, indicators, volume, width=max(len(data), 1) * PX_PER_BAR)
+    traces = [{k: list(t[k]) for k in TAIL_FIELDS if k in t and t[k] is not None} for t in fig.data]
+    return json.dumps({"data": traces}, cls=plotly.utils.PlotlyJSONEncoder)
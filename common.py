@@ -2,6 +2,10 @@ import pandas as pd
 import numpy as np
 import datetime
 import traceback
+import html
+import json
+from pandas.io.formats.format import format_array
+from assets import stylesheet
 
 # ============================================================
 #                   NUMBER FORMATTING HELPERS
@@ -83,6 +87,13 @@ def clean_df(df):
     df.fillna("-", inplace=True)
     return df
 
+def to_numeric_or_keep(s):
+    """pd.to_numeric(s), or s unchanged if it isn't numeric (errors="ignore" is gone in pandas 3)."""
+    try:
+        return pd.to_numeric(s)
+    except (ValueError, TypeError):
+        return s
+
 # ============================================================
 #                   TABLE STYLING
 # ============================================================
@@ -91,36 +102,184 @@ def make_table(df):
     try:
         df = df.copy()
         df = clean_df(df)
-        html = df.to_html(classes="styled-table", escape=False, border=0)
+        table = table_html(df, classes="styled-table", escape=False, index=True)
         return f"""
-        <style>
-        .styled-table {{
-            width:100%;
-            border-collapse:collapse;
-            font-size:14px;
-        }}
-        .styled-table th {{
-            background:#0077cc;
-            color:white;
-            padding:8px;
-            text-align:left;
-        }}
-        .styled-table td {{
-            padding:8px;
-            border-bottom:1px solid #ddd;
-        }}
-        .styled-table tr:nth-child(even) {{
-            background:#f3f7ff;
-        }}
-        .styled-table tr:hover {{
-            background:#e7f1ff;
-        }}
-        </style>
-        {html}
+        {stylesheet("table")}
+        {table}
         """
     except Exception as e:
         return html_error(f"Table render failed: {e}<br><pre>{traceback.format_exc()}</pre>")
 
+# ============================================================
+#              COLORED TABLE (sign + top-N classes)
+# ============================================================
+
+def _top_mask(values, n, largest=True):
+    """Boolean mask of the n largest/smallest non-NaN values (argpartition, no full sort)."""
+    mask = np.zeros(len(values), dtype=bool)
+    ok = np.flatnonzero(~np.isnan(values))
+    k = min(n, len(ok))
+    if k == 0:
+        return mask
+    v = values[ok] if largest else -values[ok]
+    mask[ok[np.argpartition(-v, k - 1)[:k]]] = True
+    return mask
+
+
+def _numeric_cells(col):
+    """(values as float64 or None, mask of numeric cells) for one column."""
+    if pd.api.types.is_bool_dtype(col.dtype):
+        return None, np.zeros(len(col), dtype=bool)
+    if pd.api.types.is_numeric_dtype(col.dtype):
+        return col.to_numpy(dtype="float64"), np.ones(len(col), dtype=bool)
+    raw = col.to_numpy(dtype=object)
+    mask = np.fromiter((isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_))
+                        for v in raw), dtype=bool, count=len(raw))
+    if not mask.any():
+        return None, mask
+    values = np.full(len(raw), np.nan)
+    values[mask] = raw[mask].astype("float64")
+    return values, mask
+
+
+def color_table(df, metric_col=None, top_n=3, classes="compact-table", digits=2, row_key=None):
+    """
+    DataFrame -> <table> with numbers formatted to `digits` and classed per cell:
+    numeric-positive / numeric-negative, plus top-up / top-down on the top_n
+    highest / lowest values of metric_col. Decided column-wise with NumPy and
+    assembled with one join (values are not escaped, like to_html(escape=False)).
+    row_key: column whose value tags each <tr data-key=...> (live cell updates).
+    """
+    n = len(df)
+    cols = []
+    for name in df.columns:
+        values, numeric = _numeric_cells(df[name])
+        if values is None:
+            cols.append(["<td>%s</td>" % v for v in df[name].astype(str).tolist()])
+            continue
+
+        cls = np.full(n, "", dtype=object)
+        cls[numeric & (values > 0)] = "numeric-positive"
+        cls[numeric & (values < 0)] = "numeric-negative"
+        if name == metric_col and pd.api.types.is_numeric_dtype(df[name].dtype):
+            up = _top_mask(values, top_n, largest=True)
+            down = _top_mask(values, top_n, largest=False) & ~up
+            cls[up] = np.where(cls[up] == "", "top-up", cls[up] + " top-up")
+            cls[down] = np.where(cls[down] == "", "top-down", cls[down] + " top-down")
+
+        text = df[name].astype(str).to_numpy(dtype=object)
+        text[numeric] = np.char.mod(f"%.{digits}f", values[numeric])
+        cols.append([f'<td class="{c}">{t}</td>' if c else f"<td>{t}</td>"
+                     for c, t in zip(cls.tolist(), text.tolist())])
+
+    head = "".join(f"<th>{c}</th>" for c in df.columns)
+    if row_key in df.columns:
+        opens = [f'<tr data-key="{html.escape(str(k))}">' for k in df[row_key].tolist()]
+    else:
+        opens = ["<tr>"] * n
+    body = "".join(o + "".join(r) + "</tr>" for o, r in zip(opens, zip(*cols))) if cols else ""
+    return (f'<table class="dataframe {classes}"><thead><tr>{head}</tr></thead>'
+            f"<tbody>{body}</tbody></table>")
+
+# ============================================================
+#         STREAMING / VIRTUAL-SCROLL TABLE COMPONENT
+# ============================================================
+#
+# iter_table() yields the table in row chunks, so nothing holds the whole
+# table HTML as one big intermediate; cells read as DataFrame.to_html printed
+# them. table_html() renders small frames fully.
+# Frames over VIRTUAL_ROWS rows ship the first VIRTUAL_WINDOW rows as HTML
+# (readable even where scripts don't run) plus every row as compact JSON.
+# static/js/vtable.js then renders only the visible window as the box scrolls.
+# gr.HTML does not run inline scripts, so the app loads it once in the page
+# head (assets.head_html). A MutationObserver hydrates each .vtable as it appears.
+
+VIRTUAL_ROWS = 500
+VIRTUAL_WINDOW = 100
+
+
+
+def _column_text(s):
+    """
+    Display strings for one column, as DataFrame.to_html prints them: float
+    columns through pandas' own formatter (display precision, decimals aligned
+    over the column), floats inside object columns the same way; NaN/None -> ''.
+    """
+    missing = s.isna().to_numpy()
+    if pd.api.types.is_float_dtype(s.dtype):
+        values = s.to_numpy() if isinstance(s.dtype, np.dtype) else s.array
+        text = np.array([t.strip() for t in format_array(values, None)], dtype=object)
+    else:
+        text = s.astype(str).to_numpy(dtype=object)
+        if s.dtype == object:
+            raw = s.to_numpy(dtype=object)
+            floats = np.fromiter((isinstance(v, (float, np.floating)) for v in raw), dtype=bool, count=len(raw))
+            floats &= ~missing
+            if floats.any():
+                text[floats] = [t.strip() for t in format_array(raw[floats], None)]
+    text[missing] = ""
+    return text
+
+
+def _cell_text(df):
+    """Column-wise display strings for the whole frame (a float column's format depends on all its rows)."""
+    return [_column_text(df[name]) for name in df.columns]
+
+
+def _table_head(df, classes):
+    head = "".join(f"<th>{html.escape(str(c))}</th>" for c in df.columns)
+    return f'<table class="dataframe {classes}"><thead><tr>{head}</tr></thead><tbody>'
+
+
+def _rows_html(cols, escape, stop, chunk):
+    """<tr> strings for rows [0, stop), `chunk` rows per piece."""
+    for a in range(0, stop, chunk):
+        part = [c[a:min(a + chunk, stop)] for c in cols]
+        if escape:
+            part = [[html.escape(t) for t in c] for c in part]
+        yield "".join("<tr>" + "".join(f"<td>{v}</td>" for v in r) + "</tr>" for r in zip(*part))
+
+
+def iter_table(df, classes="", escape=True, index=False, chunk=256):
+    """Yield a <table> in pieces: open tag + header, then `chunk` rows at a time, then the close tag."""
+    if index:
+        df = df.reset_index() if df.index.name else df.rename_axis("").reset_index()
+    cols = _cell_text(df)
+    yield _table_head(df, classes)
+    yield from _rows_html(cols, escape, len(df), chunk)
+    yield "</tbody></table>"
+
+
+def _json_rows(cols):
+    """Row arrays of display strings for the client; '</' can't close the script."""
+    text = json.dumps({"rows": [list(r) for r in zip(*cols)]}, separators=(",", ":"))
+    return text.replace("</", "<\\/")
+
+
+def table_html(df, classes="", escape=True, index=False, container="",
+               virtual_rows=VIRTUAL_ROWS, window=VIRTUAL_WINDOW):
+    """
+    Full table for small frames; for frames over `virtual_rows`, the first `window`
+    rows as HTML plus the full data as JSON for static/js/vtable.js. `container` is the CSS
+    class of the scrolling box (e.g. an existing max-height wrapper).
+    """
+    if index:
+        df = df.reset_index() if df.index.name else df.rename_axis("").reset_index()
+    if len(df) <= virtual_rows:
+        body = "".join(iter_table(df, classes, escape))
+        return f'<div class="{container}">{body}</div>' if container else body
+
+    cols = _cell_text(df)
+    body = _table_head(df, classes) + "".join(_rows_html(cols, escape, window, window)) + "</tbody></table>"
+    return (
+        f'<div class="vtable {container}" style="max-height:480px;overflow:auto;">'
+        f'<p class="vtable-note">Showing the first {window} of {len(df)} rows.</p>'
+        f"{body}"
+        f'<script type="application/json" class="vtable-data" data-raw="{int(not escape)}">'
+        f"{_json_rows(cols)}</script>"
+        f"</div>"
+    )
+
 # ============================================================
 #                   UNIVERSAL PLOT WRAPPER
 # ============================================================
@@ -156,20 +315,7 @@ def format_timestamp_to_date(timestamp):
 #                   HTML WRAPPER
 # ============================================================
 
-STYLE_BLOCK = """
-<style>
-.styled-table {border-collapse: collapse; margin: 10px 0; font-size: 0.9em; font-family: sans-serif; width: 100%; box-shadow: 0 0 10px rgba(0,0,0,0.1);}
-.styled-table th, .styled-table td {padding: 8px 10px; border: 1px solid #ddd;}
-.styled-table tbody tr:nth-child(even) {background-color: #f9f9f9;}
-.card {display: block; width: 95%; margin: 10px auto; padding: 15px; border: 1px solid #ddd; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); background: #fafafa;}
-.card-category-title {font-size: 1.1em; color: #222; margin: 0 0 8px; border-bottom: 1px solid #eee; padding-bottom: 5px;}
-.card-content-grid {display: flex; flex-wrap: wrap; gap: 15px;}
-.key-value-pair {flex: 1 1 calc(20% - 15px); box-sizing: border-box; min-width: 150px; background: #fff; padding: 10px; border: 1px solid #e0e0e0; border-radius: 5px; box-shadow: 0 1px 3px rgba(0,0,0,0.05);}
-.key-value-pair h3 {font-size: 0.95em; color: #444; margin: 0 0 5px 0;}
-.key-value-pair p {font-size: 0.9em; color: #555; margin: 0; font-weight: bold;}
-.big-box {width:95%; margin:20px auto; padding:20px; border:1px solid #ccc; border-radius:8px; background:#fff; box-shadow:0 2px 8px rgba(0,0,0,0.1); font-size:0.95em; line-height:1.4em; max-height:400px; overflow-y:auto;}
-</style>
-"""
+STYLE_BLOCK = stylesheet("common")
 
 def wrap_html(content, title="Stock Data"):
     return f"""
@@ -0,0 +1,130 @@
+# dispatch.py — (mode, req_type) -> handler registry with lazy module loading
+#
+# Handler modules (stock pulls in yfinance + TA-Lib + plotly, the *_html
+# builders pull in nsepython) are imported on the first request that needs
+# them, not at app start. Every import is timed; startup_report() lists the
+# cost per module. WARMUP_MODULES="stock,indices_html" (or warmup([...]))
+# preloads chosen handlers in the background after the UI is up.
+#
+#   h = lookup("stock", "daily")
+#   html = call(h, Request("ITC", "", ""))
+
+import os
+import sys
+import time
+import threading
+import importlib
+import subprocess
+from collections import namedtuple
+
+Request = namedtuple("Request", "name date end")
+
+# module: imported lazily; call(module, request) -> html; wrap: pass through app.wrap;
+# cls: worker pool class (worker_pool.POOL_CONFIG)
+Handler = namedtuple("Handler", "module call wrap cls")
+
+HANDLERS = {}
+
+
+def register(mode, req_type, module, call, wrap=False, cls="yfinance"):
+    HANDLERS[(mode, req_type.lower())] = Handler(module, call, wrap, cls)
+
+
+def lookup(mode, req_type):
+    return HANDLERS.get((mode, (req_type or "").lower()))
+
+# ================================================================
+#                         LAZY LOADING
+# ================================================================
+
+IMPORT_TIMES = {}        # module -> seconds spent importing it (incl. deps not yet loaded)
+_import_lock = threading.Lock()
+
+
+def load(module):
+    """Import `module` once, recording how long the first import took."""
+    m = sys.modules.get(module)
+    if m is not None and module in IMPORT_TIMES:
+        return m
+    with _import_lock:
+        if module in IMPORT_TIMES:
+            return sys.modules[module]
+        t0 = time.perf_counter()
+        m = importlib.import_module(module)
+        IMPORT_TIMES[module] = time.perf_counter() - t0
+        return m
+
+
+def call(handler, request):
+    return handler.call(load(handler.module), request)
+
+
+def handler_modules():
+    return sorted({h.module for h in HANDLERS.values()})
+
+
+def warmup(modules=None, background=True):
+    """Preload handler modules (default: $WARMUP_MODULES, comma separated)."""
+    if modules is None:
+        modules = [m.strip() for m in os.environ.get("WARMUP_MODULES", "").split(",") if m.strip()]
+    if not modules:
+        return None
+
+    def _run():
+        for m in modules:
+            try:
+                load(m)
+            except Exception as e:
+                print(f"warmup: {m} failed: {e}")
+
+    if not background:
+        _run()
+        return None
+    t = threading.Thread(target=_run, name="handler-warmup", daemon=True)
+    t.start()
+    return t
+
+
+def startup_report(fresh=False):
+    """
+    Per-module import cost in ms. fresh=True measures each handler module's cold
+    import in its own interpreter (what a first request pays); otherwise reports
+    the imports this process has done so far.
+    """
+    if not fresh:
+        return {m: round(t * 1000, 1) for m, t in sorted(IMPORT_TIMES.items(), key=lambda kv: -kv[1])}
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = {}
+    for m in handler_modules():
+        code = f"import time; t=time.perf_counter(); import {m}; print((time.perf_counter()-t)*1000)"
+        r = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True)
+        out[m] = round(float(r.stdout.strip().splitlines()[-1]), 1) if r.returncode == 0 else None
+    return dict(sorted(out.items(), key=lambda kv: -(kv[1] or 0)))
+
+# ================================================================
+#                         ROUTES
+# ================================================================
+
+def _bhav(m, r):
+    if r.end:
+        return m.build_bhav_range_html(r.date, r.end)
+    return m.build_bhavcopy_html(r.date)    # no default
+
+
+register("index", "indices", "indices_html", lambda m, r: m.build_indices_html(), cls="live")
+register("index", "nse_open", "index_live_html", lambda m, r: m.build_index_live_html(), cls="live")
+register("index", "nse_preopen", "preopen_html", lambda m, r: m.build_preopen_html(), cls="live")
+register("index", "nse_fno", "fno_html", lambda m, r: m.build_fno_html(r.name), cls="live")
+register("index", "nse_future", "fno_html", lambda m, r: m.build_future_html(r.name), cls="live")
+register("index", "nse_bhav", "bhavcopy_html", _bhav, cls="bhavcopy")
+
+register("stock", "nse_eq", "eq_html", lambda m, r: m.build_eq_html(r.name), cls="live")
+register("stock", "daily", "stock", lambda m, r: m.fetch_daily(r.name), wrap=True, cls="compute")
+register("stock", "intraday", "stock", lambda m, r: m.fetch_intraday(r.name), wrap=True, cls="compute")
+for _req in ("info", "qresult", "result", "balance", "cashflow", "dividend", "split", "other"):
+    register("stock", _req, "stock", lambda m, r, f="fetch_" + _req: getattr(m, f)(r.name), wrap=True)
+
+
+if __name__ == "__main__":
+    for m, ms in startup_report(fresh=True).items():
+        print(f"{m:<20} {'failed' if ms is None else f'{ms:>9.1f} ms'}")
@@ -1,15 +1,19 @@
 from nsepython import *
+from render_cache import cached_render
+from assets import stylesheet
+from common import table_html
+
 def build_eq_html(symbol):
+    out = eq(symbol)        # <-- your existing eq(symbol)
+    return cached_render("eq", (symbol,), out, render_eq_html)
+
+
+def render_eq_html(out, symbol):
     """Build full HTML page for eq(symbol) output, similar to build_indices_html."""
 
     import json
     import pandas as pd
 
-    # -------------------------------------------------------
-    # CALL eq() function internally
-    # -------------------------------------------------------
-    out = eq(symbol)        # <-- your existing eq(symbol)
-    print(out)
     if not isinstance(out, dict):
         return "<h3>Error: EQ data not available</h3>"
 
@@ -19,7 +23,7 @@ def build_eq_html(symbol):
     def df_to_table(df):
         if df is None or len(df) == 0:
             return '<div class="empty">No data</div>'
-        return df.to_html(index=False, escape=False, border=0, classes="tbl")
+        return table_html(df, classes="tbl", escape=False)
 
     # -------------------------------------------------------
     # ORDER — metadata FIRST (date table)
@@ -72,66 +76,7 @@ def build_eq_html(symbol):
     html = f"""
     <html>
     <head>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            background: #fafafa;
-            margin: 0;
-            padding: 12px;
-        }}
-        h2 {{
-            color: #0366d6;
-            margin-bottom: 10px;
-        }}
-        .section {{
-            background: #fff;
-            border: 1px solid #ddd;
-            margin-bottom: 14px;
-            padding: 12px;
-            border-radius: 6px;
-        }}
-        .section-header {{
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 8px;
-        }}
-        .section-title {{
-            font-weight: bold;
-            color: #0b69a3;
-            font-size: 15px;
-        }}
-        .toggle-btn {{
-            background: #0b69a3;
-            color: #fff;
-            border: none;
-            padding: 6px 10px;
-            font-size: 12px;
-            border-radius: 5px;
-            cursor: pointer;
-        }}
-        .section-body {{
-            margin-top: 6px;
-        }}
-        .tbl {{
-            border-collapse: collapse;
-            width: 100%;
-            font-size: 13px;
-        }}
-        .tbl th {{
-            background: #0b69a3;
-            color: #fff;
-            padding: 6px;
-            border: 1px solid #ccc;
-        }}
-        .tbl td {{
-            padding: 6px;
-            border: 1px solid #ccc;
-        }}
-        .empty {{
-            padding: 10px;
-            color: #777;
-        }}
-    </style>
+    {stylesheet("eq")}
 
     <script>
     function toggleSection(id) {{
@@ -0,0 +1,128 @@
+from nsepython import *
+import pandas as pd
+from common import color_table
+from render_cache import cached_render
+from assets import stylesheet
+from option_chain import chain_symbol, fetch_chain, parse_chain, analyze, chain_table, futures_table
+
+def build_fno_html(symbol="NIFTY"):
+    symbol = chain_symbol(symbol) or "NIFTY"
+    p = fetch_chain(symbol)
+    return cached_render("fno", (symbol,), p, render_fno_html)
+
+
+def build_future_html(symbol="NIFTY"):
+    symbol = chain_symbol(symbol) or "NIFTY"
+    p = eq_der(symbol)
+    return cached_render("future", (symbol,), p, render_future_html)
+
+
+def _cards(items):
+    cards = "".join(f'<div class="mini-card"><div class="card-key">{k}</div>'
+                    f'<div class="card-val">{v}</div></div>' for k, v in items)
+    return f'<div class="mini-card-container">{cards}</div>'
+
+
+def _fmt(v, digits=2):
+    return "-" if v is None or pd.isna(v) else f"{v:,.{digits}f}"
+
+
+def render_fno_html(p, symbol="NIFTY"):
+    chain = parse_chain(p, symbol)
+    if not chain.shape[0]:
+        return f"<h3>No option chain data for {symbol}</h3>"
+    a = analyze(chain)
+    near = chain.expiries[0]
+
+    info_cards_html = _cards([
+        ("Underlying", _fmt(chain.spot)),
+        ("As of", chain.timestamp.strftime("%d-%b-%Y %H:%M:%S")),
+        ("Near expiry", near),
+        ("Max pain", _fmt(a["max_pain"][0], 0)),
+        ("PCR (OI)", _fmt(a["pcr_oi"][0], 3)),
+        ("PCR (all expiries)", _fmt(a["pcr_total"], 3)),
+        ("ATM strike", _fmt(chain.strikes[a["atm"]], 0)),
+        ("ATM IV %", _fmt(a["atm_iv"][0])),
+    ])
+
+    summary_html = color_table(a["summary"], metric_col="PCR (OI)")
+    buckets_html = color_table(a["buckets"], metric_col="net (PE - CE)")
+    chain_html = color_table(chain_table(chain, a), classes="compact-table chain-table", row_key="strike")
+
+    html = f"""
+<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+{stylesheet("fno")}
+</head>
+<body>
+
+<h2>Option Chain: {symbol}</h2>
+
+<div class="compact-section">
+    {info_cards_html}
+</div>
+
+<div class="compact-section">
+    <h3>Expiries</h3>
+    {summary_html}
+</div>
+
+<div class="grid">
+    <div class="small-table">
+        <div class="st-title">Change in OI by moneyness ({near})</div>
+        <div class="st-body">{buckets_html}</div>
+    </div>
+</div>
+
+<div class="compact-section">
+    <h3>Chain around ATM ({near}) — IV: Black-Scholes on mid / last price, NSE IV as published</h3>
+    {chain_html}
+</div>
+
+</body>
+</html>
+"""
+    return html
+
+
+def render_future_html(p, symbol="NIFTY"):
+    df = futures_table(p)
+    if df.empty:
+        return f"<h3>No futures data for {symbol}</h3>"
+    info = (p or {}).get("info") or {}
+    near = df.iloc[0]
+    info_cards_html = _cards([
+        ("Underlying", _fmt((p or {}).get("underlyingValue"))),
+        ("Company", info.get("companyName", symbol)),
+        ("Near expiry", near["expiry"]),
+        ("Near basis", _fmt(near["basis"])),
+        ("Near carry % p.a.", _fmt(near["carry % p.a."])),
+        ("Total OI", _fmt(pd.to_numeric(df["OI"], errors="coerce").sum(), 0)),
+    ])
+
+    html = f"""
+<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+{stylesheet("fno")}
+</head>
+<body>
+
+<h2>Futures: {symbol}</h2>
+
+<div class="compact-section">
+    {info_cards_html}
+</div>
+
+<div class="compact-section">
+    <h3>Contracts</h3>
+    {color_table(df, metric_col="chg OI", row_key="expiry")}
+</div>
+
+</body>
+</html>
+"""
+    return html
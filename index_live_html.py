@@ -1,9 +1,18 @@
 
 from nsepython import *
 import pandas as pd
+from common import color_table, to_numeric_or_keep
+from render_cache import cached_render
+from assets import stylesheet
+from snapshot_recorder import record
 
 def build_index_live_html(name=""):
     p = nse_index_live(name)
+    record("index_live", name, p)
+    return cached_render("index_live", (name,), p, render_index_live_html)
+
+
+def render_index_live_html(p, name=""):
 
     full_df = p.get("data", pd.DataFrame())
     rem_df  = p.get("rem", pd.DataFrame())
@@ -48,36 +57,6 @@ def build_index_live_html(name=""):
                 const_df['pChange'] = pd.to_numeric(const_df['pChange'], errors='coerce')
                 const_df = const_df.sort_values('pChange', ascending=False)
 
-    # ================= HELPER FUNCTION: COLOR-CODE AND FORMAT NUMERIC =================
-    def df_to_html_color(df, metric_col=None):
-        df_html = df.copy()
-        top3_up = []
-        top3_down = []
-        if metric_col and metric_col in df_html.columns and pd.api.types.is_numeric_dtype(df_html[metric_col]):
-            col_numeric = df_html[metric_col].dropna()
-            top3_up = col_numeric.nlargest(3).index.tolist()
-            top3_down = col_numeric.nsmallest(3).index.tolist()
-
-        for idx, row in df_html.iterrows():
-            for col in df_html.columns:
-                val = row[col]
-                style = ""
-                if pd.api.types.is_numeric_dtype(type(val)) or isinstance(val, (int, float)):
-                    val_fmt = f"{val:.2f}"
-                    if val > 0:
-                        style = "numeric-positive"
-                    elif val < 0:
-                        style = "numeric-negative"
-                    if metric_col and col == metric_col:
-                        if idx in top3_up:
-                            style += " top-up"
-                        elif idx in top3_down:
-                            style += " top-down"
-                    df_html.at[idx, col] = f'<span class="{style.strip()}">{val_fmt}</span>'
-                else:
-                    df_html.at[idx, col] = str(val)
-        return df_html.to_html(index=False, escape=False, classes="compact-table")
-
     # ================= MERGE INFO AND MAIN KEYS INTO MINI CARDS =================
     def merge_info_main_cards(rem_df, main_df):
         combined = pd.concat([rem_df, main_df], axis=1)
@@ -98,7 +77,7 @@ def build_index_live_html(name=""):
 
     info_cards_html = merge_info_main_cards(rem_df, main_df)
 
-    cons_html = df_to_html_color(const_df)
+    cons_html = color_table(const_df, row_key="symbol")
 
     # ================= METRIC TABLES =================
     metric_cols = [
@@ -112,9 +91,9 @@ def build_index_live_html(name=""):
             continue
 
         df_const = const_df.copy()
-        df_const[col] = pd.to_numeric(df_const[col], errors="ignore")
+        df_const[col] = to_numeric_or_keep(df_const[col])
         df_const = df_const.sort_values(col, ascending=False)
-        df_html = df_to_html_color(df_const[['symbol', col]], metric_col=col)
+        df_html = color_table(df_const[['symbol', col]], metric_col=col, row_key="symbol")
 
         metric_tables += f"""
         <div class="small-table">
@@ -130,131 +109,7 @@ def build_index_live_html(name=""):
 <head>
 <meta charset="UTF-8">
 
-<style>
-body {{
-    font-family: Arial;
-    margin: 12px;
-    background: #f5f5f5;
-    color: #222;
-    font-size: 14px;
-}}
-
-h2, h3 {{
-    margin: 12px 0 6px 0;
-    font-weight: 600;
-}}
-
-table {{
-    border-collapse: collapse;
-    width: 100%;
-    table-layout: auto;
-}}
-
-th, td {{
-    border: 1px solid #bbb;
-    padding: 5px 8px;
-    text-align: left;
-    font-size: 13px;
-}}
-
-th {{
-    background: #333;
-    color: white;
-    font-weight: 600;
-}}
-
-.compact-table td.numeric-positive {{
-    color: green;
-    font-weight: bold;
-}}
-.compact-table td.numeric-negative {{
-    color: red;
-    font-weight: bold;
-}}
-
-/* Highlight top 3 gainers / losers */
-.compact-table td.top-up {{
-    background: #a8f0a5; /* light green */
-}}
-.compact-table td.top-down {{
-    background: #f0a8a8; /* light red */
-}}
-
-/* Fixed row height & clipping for Constituent Table */
-#constituents-table tr, #constituents-table td {{
-    max-height: 25px;
-    height: 25px;
-    overflow: hidden;
-    white-space: nowrap;
-    text-overflow: ellipsis;
-}}
-
-.small-table {{
-    background: white;
-    border-radius: 6px;
-    padding: 8px;
-    box-shadow: 0px 1px 4px rgba(0,0,0,0.15);
-    border: 1px solid #ddd;
-    overflow-y: auto;
-}}
-
-.st-title {{
-    font-size: 14px;
-    text-align: center;
-    margin-bottom: 6px;
-    font-weight: bold;
-    background: #222;
-    color: white;
-    padding: 5px 0;
-    border-radius: 4px;
-}}
-
-.st-body {{
-    max-height: 300px;  /* vertical scroll for metric tables */
-    overflow-y: auto;
-    font-size: 12px;
-}}
-
-.compact-section {{
-    background: white;
-    padding: 8px;
-    border-radius: 6px;
-    box-shadow: 0 1px 4px rgba(0,0,0,0.12);
-    border: 1px solid #ddd;
-    margin-bottom: 15px;
-    overflow-x: visible;
-}}
-
-.grid {{
-    display: grid;
-    grid-template-columns: repeat(5, 1fr);
-    gap: 12px;
-    margin-top: 12px;
-}}
-
-/* Mini cards for info + main */
-.mini-card-container {{
-    display: flex;
-    flex-wrap: wrap;
-    gap: 10px;
-}}
-.mini-card {{
-    background: #fff;
-    padding: 8px 10px;
-    border-radius: 6px;
-    box-shadow: 0 1px 3px rgba(0,0,0,0.12);
-    min-width: 120px;
-    font-size: 13px;
-}}
-.card-key {{
-    font-weight: bold;
-    color: #333;
-    margin-bottom: 2px;
-}}
-.card-val {{
-    color: #222;
-}}
-</style>
+{stylesheet("index_live")}
 </head>
 <body>
 
@@ -4,8 +4,18 @@ from nsepython import *
 import html
 import html
 import pandas as pd
+from render_cache import cached_render
+from assets import stylesheet
+from common import table_html
+from snapshot_recorder import record
 
 def build_indices_html():
+    p = indices()  # your existing function
+    record("indices", "", p)
+    return cached_render("indices", (), p, render_indices_html)
+
+
+def render_indices_html(p):
     """
     Generate HTML:
       - main table
@@ -15,7 +25,6 @@ def build_indices_html():
       - flexible chart layout (no grid, auto-fit)
     """
 
-    p = indices()  # your existing function
     data_df = p.get("data", pd.DataFrame())
     dates_df = p.get("dates", pd.DataFrame())
 
@@ -40,24 +49,10 @@ def build_indices_html():
                     if k not in cols:
                         cols.append(k)
 
-        header = "".join(f"<th>{html.escape(str(c))}</th>" for c in cols)
-
-        body_rows = []
-        for r in recs:
-            tds = []
-            for c in cols:
-                v = r.get(c, "")
-                if isinstance(v, (list, dict)):
-                    v = str(v)
-                tds.append(f"<td>{html.escape('' if v is None else str(v))}</td>")
-            body_rows.append("<tr>" + "".join(tds) + "</tr>")
-
-        return f"""
-        <table>
-            <thead><tr>{header}</tr></thead>
-            <tbody>{''.join(body_rows)}</tbody>
-        </table>
-        """
+        df = pd.DataFrame.from_records(recs, columns=cols)
+        for c in df.columns[df.dtypes == object]:
+            df[c] = df[c].map(lambda v: str(v) if isinstance(v, (list, dict)) else v)
+        return table_html(df, escape=True)
 
     # ----------- FLEXIBLE CHART BLOCK -----------
     def build_chart_grid_for_record(r):
@@ -151,56 +146,7 @@ def build_indices_html():
         """)
 
     # ----------- CSS -----------
-    css = """
-    <style>
-    body { font-family: Arial; padding: 16px; background: #fff; color: #111; }
-    table { border-collapse: collapse; width: 100%; margin-bottom: 14px; }
-    th, td { border: 1px solid #ccc; padding: 6px 8px; font-size: 13px; }
-    th { background: #007bff; color: white; position: sticky; top: 0; }
-
-    .scroll { max-height: 420px; overflow: auto; padding: 6px; background: #fafafa;
-              margin-bottom: 16px; border: 1px solid #ddd; }
-
-    .key-section {
-        border: 1px solid #e6eef6;
-        background: #fbfeff;
-        border-radius: 6px;
-        padding: 10px;
-        margin-bottom: 30px;
-    }
-
-    /* FLEXIBLE CHART LAYOUT */
-    .chart-flex-block {
-        border: 1px solid #ddd;
-        background: #fff;
-        padding: 8px;
-        border-radius: 6px;
-        margin-bottom: 14px;
-    }
-
-    .chart-title { margin-bottom: 6px; font-size: 14px; }
-
-    .chart-flex-container {
-        display: flex;
-        flex-wrap: wrap;
-        gap: 10px;
-    }
-
-    .chart-flex-item {
-        flex: 1 1 300px;
-        min-height: 180px;
-        border: 1px solid #ccc;
-        border-radius: 6px;
-        overflow: hidden;
-    }
-
-    .chart-flex-item iframe {
-        width: 100%;
-        height: 100%;
-        border: 0;
-    }
-    </style>
-    """
+    css = stylesheet("indices")
 
     # ----------- FINAL HTML ASSEMBLY -----------
     html_parts = [
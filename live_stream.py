@@ -0,0 +1,253 @@
+# live_stream.py — one background poller for the live index / pre-open pages
+#
+# Viewers subscribe to a feed ("index", "NIFTY 50") or ("preopen", "NIFTY").
+# A single thread polls each subscribed feed once per LIVE_INTERVAL seconds,
+# however many viewers it has, diffs the new constituents frame against the
+# previous one (snapshot_diff, keyed by symbol) and wakes the subscribers. Each viewer's
+# stream() generator then yields the page once and only the changed cells
+# after that; static/js/live.js patches those cells in place. A feed nobody
+# watches any more stops being polled. astream() is the async form the UI uses:
+# a waiting viewer awaits an event instead of blocking a server thread.
+#
+#   for page, delta in live.stream("index", "NIFTY 50"):
+#       ...
+#   async for page, delta in live.astream("index", "NIFTY 50"):
+#       ...
+
+import os
+import json
+import asyncio
+import time
+import threading
+import numpy as np
+import pandas as pd
+from snapshot_diff import SnapshotRing
+from snapshot_recorder import record
+
+LIVE_INTERVAL = float(os.environ.get("LIVE_INTERVAL", 5))
+LIVE_MAX_SECONDS = float(os.environ.get("LIVE_MAX_SECONDS", 30 * 60))
+LIVE_HISTORY = int(os.environ.get("LIVE_HISTORY", 120))     # snapshots kept per feed
+
+# ================================================================
+#                         FEEDS
+# ================================================================
+
+def _fetch(kind, key):
+    """Upstream payload for a feed (shared with Fetch clicks via the nsefetch cache)."""
+    from nsepython import nse_index_live, nsefetch
+    if kind == "index":
+        return nse_index_live(key)
+    return nsefetch(f"https://www.nseindia.com/api/market-data-pre-open?key={key}")
+
+
+def _frame(kind, payload):
+    """Constituents frame of a payload, indexed by symbol."""
+    from nsepython import df_from_data
+    df = payload.get("data", pd.DataFrame()) if kind == "index" else df_from_data(payload.get("data", []))
+    if df is None or df.empty or "symbol" not in df.columns:
+        return pd.DataFrame()
+    return df.drop_duplicates("symbol", keep="last").set_index("symbol")
+
+
+def _render(kind, key, payload):
+    from render_cache import cached_render
+    if kind == "index":
+        from index_live_html import render_index_live_html
+        return cached_render("index_live", (key,), payload, render_index_live_html)
+    from preopen_html import render_preopen_html
+    return cached_render("preopen", (key,), payload, render_preopen_html)
+
+
+class Feed:
+    def __init__(self, kind, key):
+        self.kind, self.key = kind, key
+        self.payload = None
+        self.ring = SnapshotRing(LIVE_HISTORY)
+        self.version = 0
+        self.delta = None            # snapshot_diff.Delta that produced `version`
+        self.subscribers = 0
+        self.error = None
+        self.cond = threading.Condition()
+        self._waiters = set()        # (loop, asyncio.Event) of async viewers
+
+    def refresh(self):
+        try:
+            payload = _fetch(self.kind, self.key)
+        except Exception as e:
+            self.error = str(e)
+            return
+        record("index_live" if self.kind == "index" else "preopen", self.key, payload)
+        frame = _frame(self.kind, payload)
+        with self.cond:
+            self.error = None
+            first = self.payload is None
+            delta = self.ring.append(frame)
+            if first or delta:
+                self.payload, self.delta = payload, delta
+                self.version += 1
+                self.cond.notify_all()
+                for loop, event in self._waiters:
+                    try:
+                        loop.call_soon_threadsafe(event.set)
+                    except RuntimeError:          # viewer's loop already closed
+                        pass
+
+    def moved(self, seconds=60, column="lastPrice"):
+        """Constituents whose `column` changed over the last `seconds` (see SnapshotRing.moved)."""
+        with self.cond:
+            return self.ring.moved(seconds, column)
+
+    def wait(self, version, timeout):
+        """Block until the feed moves past `version` (or timeout); returns the current version."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.version > version, timeout)
+            return self.version
+
+    async def wait_async(self, version, timeout):
+        """wait() for async viewers: awaits an event refresh() sets, holding no thread."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self.cond:
+            if self.version > version:
+                return self.version
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self.cond:
+                self._waiters.discard(waiter)
+        return self.version
+
+# ================================================================
+#                         POLLER
+# ================================================================
+
+class LivePoller:
+    def __init__(self, interval=LIVE_INTERVAL):
+        self.interval = interval
+        self._feeds = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {"polls": 0, "updates": 0}
+
+    def subscribe(self, kind, key):
+        with self._lock:
+            feed = self._feeds.get((kind, key))
+            if feed is None:
+                feed = self._feeds[(kind, key)] = Feed(kind, key)
+            feed.subscribers += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="live-poller", daemon=True)
+                self._thread.start()
+        return feed
+
+    def unsubscribe(self, feed):
+        with self._lock:
+            feed.subscribers -= 1
+            if feed.subscribers <= 0:
+                self._feeds.pop((feed.kind, feed.key), None)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                feeds = list(self._feeds.values())
+                if not feeds:
+                    self._thread = None
+                    return
+            t0 = time.monotonic()
+            for feed in feeds:
+                before = feed.version
+                feed.refresh()
+                self.stats["polls"] += 1
+                self.stats["updates"] += feed.version != before
+            time.sleep(max(self.interval - (time.monotonic() - t0), 0.1))
+
+    def info(self):
+        with self._lock:
+            return {**self.stats, "interval": self.interval,
+                    "feeds": {f"{k}:{n}": f.subscribers for (k, n), f in self._feeds.items()}}
+
+
+poller = LivePoller()
+
+def live_stats(): return poller.info()
+
+
+def moved(kind, key, seconds=60, column="lastPrice"):
+    """What moved in a polled feed over the last `seconds`; empty if nobody is watching it."""
+    with poller._lock:
+        feed = poller._feeds.get((kind, key))
+    return feed.moved(seconds, column) if feed else pd.DataFrame()
+
+# ================================================================
+#                         VIEWER STREAM
+# ================================================================
+
+def _jsonable(v):
+    if isinstance(v, (np.floating, float)):
+        return None if np.isnan(v) else float(v)
+    if isinstance(v, np.integer):
+        return int(v)
+    return v if isinstance(v, (int, str, bool)) or v is None else str(v)
+
+
+def delta_html(feed_id, version, delta):
+    """Hidden payload live.js applies to the page: changed cells keyed by symbol and column."""
+    cells = {s: {c: _jsonable(v) for c, v in cols.items()} for s, cols in delta.cells().items()}
+    body = json.dumps({"feed": feed_id, "version": version, "cells": cells},
+                      separators=(",", ":"), default=str).replace("</", "<\\/")
+    return f'<script type="application/json" class="live-delta">{body}</script>'
+
+
+def _update(feed, seen, version):
+    """(page, None) for a first view, a skipped version or a changed symbol set; else (None, delta)."""
+    with feed.cond:
+        payload, delta = feed.payload, feed.delta
+    if seen == 0 or version > seen + 1 or delta.added or delta.removed:
+        return _render(feed.kind, feed.key, payload), None
+    return None, delta_html(f"{feed.kind}:{feed.key}", version, delta)
+
+
+def stream(kind, key, max_seconds=LIVE_MAX_SECONDS):
+    """
+    Generator of (page_html or None, delta_html or None) for one viewer. The full
+    page is sent first and again whenever symbols join/leave the frame; otherwise
+    only the changed cells. Ends after max_seconds or when the consumer closes it.
+    """
+    feed = poller.subscribe(kind, key)
+    deadline = time.monotonic() + max_seconds
+    seen = 0
+    try:
+        while time.monotonic() < deadline:
+            version = feed.wait(seen, timeout=poller.interval * 2)
+            if version == seen:
+                if feed.error and seen == 0:
+                    yield f"<h3>Live feed error: {feed.error}</h3>", None
+                continue
+            yield _update(feed, seen, version)
+            seen = version
+    finally:
+        poller.unsubscribe(feed)
+
+
+async def astream(kind, key, max_seconds=LIVE_MAX_SECONDS):
+    """
+    stream() as an async generator. Waiting holds no thread, so the number of
+    viewers is not capped by the server's worker thread pool; only a full-page
+    render briefly runs on one.
+    """
+    feed = poller.subscribe(kind, key)
+    deadline = time.monotonic() + max_seconds
+    seen = 0
+    try:
+        while time.monotonic() < deadline:
+            version = await feed.wait_async(seen, timeout=poller.interval * 2)
+            if version == seen:
+                if feed.error and seen == 0:
+                    yield f"<h3>Live feed error: {feed.error}</h3>", None
+                continue
+            yield await asyncio.to_thread(_update, feed, seen, version)
+            seen = version
+    finally:
+        poller.unsubscribe(feed)
@@ -1,11 +1,13 @@
-import os, sys, requests, pandas as pd, json, random, datetime, time, logging, re, urllib.parse
-from collections import Counter
+import os, sys, requests, pandas as pd, json, random, datetime, time, logging, re, urllib.parse, threading, pickle, asyncio
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from collections import Counter, OrderedDict
 
 mode = 'local'
 
 # ------------------------- NSE FETCH -------------------------
 if mode == "vpn":
-    def nsefetch(payload):
+    def nsefetch_uncached(payload):
         def encode(url): return url if "%26" in url or "%20" in url else urllib.parse.quote(url, safe=":/?&=")
         def refresh_cookies():
             os.popen(f'curl -c cookies.txt "https://www.nseindia.com" {curl_headers}').read()
@@ -22,16 +24,253 @@ if mode == "vpn":
             try: return json.loads(raw)
             except: return {}
 
+class NSESession:
+    """
+    Long-lived, thread-safe NSE session shared by every nsefetch() call.
+    - one requests.Session with a pooled keep-alive HTTPAdapter
+    - cookies warmed up once (homepage + /option-chain) and reused
+    - warm-up repeated only when cookies expire or NSE replies 401/403/non-JSON
+    """
+    warmup_urls = ("https://www.nseindia.com", "https://www.nseindia.com/option-chain")
+
+    def __init__(self, cookie_ttl=300, pool_size=16, timeout=10):
+        self.cookie_ttl = cookie_ttl
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._session = None
+        self._cookie_time = 0.0
+        self._generation = 0
+        self.stats = {"requests": 0, "hits": 0, "refreshes": 0, "retries": 0, "failures": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _new_session(self):
+        s = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        s.headers.update(headers)
+        return s
+
+    def _expired(self):
+        if self._session is None or not len(self._session.cookies):
+            return True
+        now = time.time()
+        if now - self._cookie_time > self.cookie_ttl:
+            return True
+        return any(c.expires and c.expires <= now for c in self._session.cookies)
+
+    def session(self):
+        """Return (session, generation), warming cookies up first if needed."""
+        with self._lock:
+            if self._expired():
+                self._refresh_locked()
+            return self._session, self._generation
+
+    def refresh(self, generation=None):
+        """Force a cookie refresh unless another thread already did one since `generation`."""
+        with self._lock:
+            if generation is None or generation == self._generation:
+                self._refresh_locked()
+            return self._session, self._generation
+
+    def _refresh_locked(self):
+        if self._session is None:
+            self._session = self._new_session()
+        self._session.cookies.clear()
+        for url in self.warmup_urls:
+            self._session.get(url, timeout=self.timeout)
+        self._cookie_time = time.time()
+        self._generation += 1
+        self.stats["refreshes"] += 1
+
+    def fetch(self, url):
+        """GET url and return decoded JSON; one cookie refresh + retry on 401/403/non-JSON."""
+        self._count("requests")
+        try:
+            s, gen = self.session()
+            for attempt in range(2):
+                r = s.get(url, timeout=self.timeout)
+                if r.status_code not in (401, 403):
+                    try:
+                        data = r.json()
+                        if attempt == 0:
+                            self._count("hits")
+                        return data
+                    except ValueError:
+                        pass
+                if attempt == 0:
+                    self._count("retries")
+                    s, gen = self.refresh(gen)
+            raise ValueError(f"NSE returned status {r.status_code} / non-JSON body for {url}")
+        except Exception:
+            self._count("failures")
+            raise
+
+    def reset(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._cookie_time = 0.0
+
+nse_session = NSESession()
+
+def nse_session_stats(): return dict(nse_session.stats)
+
 if mode == 'local':
-    def nsefetch(payload):
+    def nsefetch_uncached(payload):
         try:
-            s = requests.Session()
-            s.get("https://www.nseindia.com", headers=headers, timeout=10)
-            s.get("https://www.nseindia.com/option-chain", headers=headers, timeout=10)
-            return s.get(payload, headers=headers, timeout=10).json()
+            return nse_session.fetch(payload)
         except:
             return {}
 
+# ------------------------- RESPONSE CACHE -------------------------
+# (url substring, ttl seconds) — first match wins, so keep specific patterns first
+CACHE_TTL_RULES = [
+    ("holiday-master", 6 * 3600),
+    ("EQUITY_L.csv", 6 * 3600),
+    ("sec_bhavdata_full_", 12 * 3600),
+    ("event-calendar", 3600),
+    ("corporates-financial-results", 3600),
+    ("results-comparision", 3600),
+    ("/historical/", 3600),
+    ("circular", 600),
+    ("fiidiiTradeReact", 300),
+    ("bulk.csv", 300),
+    ("block.csv", 300),
+    ("block-deal", 60),
+    ("largedeal", 60),
+    ("marketStatus", 30),
+    ("live-analysis", 10),
+    ("LiveIndicesWatch", 5),
+    ("allIndices", 5),
+    ("equity-stockIndices", 5),
+    ("market-data-pre-open", 5),
+    ("quote-equity", 5),
+    ("quote-derivative", 5),
+    ("option-chain", 5),
+]
+CACHE_DEFAULT_TTL = 5
+
+def cache_ttl(url):
+    for pattern, ttl in CACHE_TTL_RULES:
+        if pattern in url:
+            return ttl
+    return CACHE_DEFAULT_TTL
+
+class _Flight:
+    __slots__ = ("event", "blob", "error")
+    def __init__(self):
+        self.event = threading.Event()
+        self.blob = None
+        self.error = None
+
+class ResponseCache:
+    """
+    Shared TTL + LRU cache for NSE responses, keyed by URL.
+    - values are stored pickled, so every caller gets its own copy
+      (indices()/eq()/nse_preopen() pop keys off the payload)
+    - bounded by entry count and total pickled bytes, least recently used evicted first
+    - concurrent misses on one key are coalesced into a single upstream fetch
+    - empty/failed responses ({} from nsefetch, exceptions) are never stored
+    """
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()      # key -> (expires_at, blob)
+        self._inflight = {}
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "expired": 0, "evictions": 0}
+
+    def get(self, key, loader, ttl=None):
+        ttl = cache_ttl(key) if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return pickle.loads(entry[1])
+                self._drop(key)
+                self.stats["expired"] += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return pickle.loads(flight.blob)
+
+        try:
+            value = loader()
+            flight.blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            if self._cacheable(value) and ttl > 0:
+                self._store(key, flight.blob, ttl)
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    @staticmethod
+    def _cacheable(value):
+        if value is None:
+            return False
+        if isinstance(value, pd.DataFrame):
+            return not value.empty
+        if isinstance(value, (dict, list)):
+            return len(value) > 0
+        return True
+
+    def _store(self, key, blob, ttl):
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, blob)
+            self._bytes += len(blob)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def _drop(self, key):
+        _, blob = self._entries.pop(key)
+        self._bytes -= len(blob)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def info(self):
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "bytes": self._bytes}
+
+response_cache = ResponseCache()
+
+def nse_cache_stats(): return response_cache.info()
+
+def nsefetch(payload, ttl=None):
+    return response_cache.get(payload, lambda: nsefetch_uncached(payload), ttl)
+
+def cached_csv(url, ttl=None):
+    return response_cache.get(url, lambda: pd.read_csv(url), ttl)
+
 # ------------------------- HEADERS -------------------------
 headers = {
     "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
@@ -158,10 +397,24 @@ def nse_fiidii(mode="pandas"):
     except:
         return nsefetch('https://www.nseindia.com/api/fiidiiTradeReact')
 
+FNO_URL = 'https://www.nseindia.com/api/equity-stockIndices?index=SECURITIES%20IN%20F%26O'
+_fno_lock = threading.Lock()
+_fno_memo = {"expires": 0.0, "rows": {}}
+
+def fno_universe():
+    """symbol -> row of the F&O universe; rebuilt only when the cached payload expires."""
+    with _fno_lock:
+        if _fno_memo["expires"] <= time.monotonic():
+            p = nsefetch(FNO_URL)
+            rows = {x["symbol"]: x for x in p.get("data", []) if isinstance(x, dict) and "symbol" in x}
+            if rows:
+                _fno_memo["rows"] = rows
+                _fno_memo["expires"] = time.monotonic() + cache_ttl(FNO_URL)
+        return _fno_memo["rows"]
+
 def nsetools_get_quote(symbol):
-    p=nsefetch('https://www.nseindia.com/api/equity-stockIndices?index=SECURITIES%20IN%20F%26O')
-    for x in p['data']:
-        if x['symbol']==symbol.upper(): return x
+    x = fno_universe().get(symbol.upper())
+    return dict(x) if x is not None else None
 
 def nse_index():
     p=nsefetch('https://iislliveblob.niftyindices.com/jsonfiles/LiveIndicesWatch.json')
@@ -182,9 +435,10 @@ def index_total_returns(sym,sd,ed):
     p=json.loads(requests.post('https://niftyindices.com/Backpage.aspx/getTotalReturnIndexString', headers=niftyindices_headers, json=d).json()["d"])
     return pd.DataFrame.from_records(p)
 
-def nse_bhavcopy(d): return pd.read_csv("https://archives.nseindia.com/products/content/sec_bhavdata_full_"+d.replace("-","")+".csv")
-def nse_bulkdeals(): return pd.read_csv("https://archives.nseindia.com/content/equities/bulk.csv")
-def nse_blockdeals(): return pd.read_csv("https://archives.nseindia.com/content/equities/block.csv")
+def bhavcopy_url(d): return "https://archives.nseindia.com/products/content/sec_bhavdata_full_"+d.replace("-","")+".csv"
+def nse_bhavcopy(d): return cached_csv(bhavcopy_url(d))
+def nse_bulkdeals(): return cached_csv("https://archives.nseindia.com/content/equities/bulk.csv")
+def nse_blockdeals(): return cached_csv("https://archives.nseindia.com/content/equities/block.csv")
 
 def nse_preopen(key="NIFTY"):
     p=nsefetch("https://www.nseindia.com/api/market-data-pre-open?key="+key)
@@ -194,7 +448,7 @@ def nse_most_active(t="securities",s="value"):
     return pd.DataFrame(nsefetch(f"https://www.nseindia.com/api/live-analysis-most-active-{t}?index={s}")["data"])
 
 def nse_eq_symbols():
-    return pd.read_csv('https://archives.nseindia.com/content/equities/EQUITY_L.csv')['SYMBOL'].tolist()
+    return cached_csv('https://archives.nseindia.com/content/equities/EQUITY_L.csv')['SYMBOL'].tolist()
 
 def nse_price_band_hitters(b="both",v="AllSec"):
     p=nsefetch("https://www.nseindia.com/api/live-analysis-price-band-hitter")
@@ -216,3 +470,60 @@ def nse_stock_hist(f,t,symbol,series="ALL"):
 def nse_index_live(name="NIFTY 50"):
     p=nsefetch(f"https://www.nseindia.com/api/equity-stockIndices?index={name.replace(' ','%20')}")
     return {"data":df_from_data(p.pop("data")) if "data" in p else pd.DataFrame(), "rem":df_from_data([p])}
+
+# ------------------------- BATCH FETCH -------------------------
+# Worker threads for the async fan-out; all of them share nse_session's connection pool.
+_batch_pool = ThreadPoolExecutor(max_workers=nse_session.pool_size, thread_name_prefix="nse-batch")
+
+def _unique_symbols(symbols):
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+
+async def fetch_many_async(fn, items, concurrency=8, timeout=15):
+    """
+    Run fn(item) for every item with at most `concurrency` in flight and a
+    per-item timeout. Returns {"data": {item: result}, "errors": {item: message}}.
+    """
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(item):
+        async with sem:
+            return await asyncio.wait_for(loop.run_in_executor(_batch_pool, fn, item), timeout)
+
+    results = await asyncio.gather(*(one(x) for x in items), return_exceptions=True)
+    out = {"data": {}, "errors": {}}
+    for item, res in zip(items, results):
+        if isinstance(res, asyncio.TimeoutError):
+            out["errors"][item] = f"timeout after {timeout}s"
+        elif isinstance(res, Exception):
+            out["errors"][item] = f"{type(res).__name__}: {res}"
+        else:
+            out["data"][item] = res
+    return out
+
+def _run(coro):
+    """asyncio.run() that also works when the caller already sits inside an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
+
+async def eq_many_async(symbols, concurrency=8, timeout=15):
+    return await fetch_many_async(eq, _unique_symbols(symbols), concurrency, timeout)
+
+def eq_many(symbols, concurrency=8, timeout=15):
+    """eq() for many symbols concurrently; failed symbols land in "errors" instead of raising."""
+    return _run(eq_many_async(symbols, concurrency, timeout))
+
+def quotes_many(symbols):
+    """F&O quotes for many symbols from a single (cached, indexed) universe fetch."""
+    rows = fno_universe()
+    out = {"data": {}, "errors": {}}
+    for sym in _unique_symbols(symbols):
+        if sym in rows:
+            out["data"][sym] = dict(rows[sym])
+        else:
+            out["errors"][sym] = "not in F&O universe" if rows else "F&O universe unavailable"
+    return out
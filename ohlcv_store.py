@@ -0,0 +1,289 @@
+# ohlcv_store.py — incremental local store for daily OHLCV bars (SQLite)
+#
+# One clustered table keyed by (symbol, date), so a 10-year read is a single
+# range scan. sync() asks the source only for the dates from the last stored
+# bar on (re-fetching it, in case it was a partial intraday bar); sync_many() does the same for a universe with one download per chunk. Prices are stored split/dividend adjusted (yfinance auto_adjust); when
+# split()/dividend() report an event the store has not seen, the stored rows
+# before its ex-date are back-adjusted so old and new bars stay consistent.
+
+import os
+import sqlite3
+import threading
+import datetime
+import time
+import numpy as np
+import pandas as pd
+
+OHLCV_DB = os.environ.get(
+    "OHLCV_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ohlcv.sqlite")
+)
+
+# don't ask the source again within this many seconds of a successful sync
+SYNC_INTERVAL = 15 * 60
+INITIAL_PERIOD = "10y"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL, date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    symbol TEXT NOT NULL, date TEXT NOT NULL, kind TEXT NOT NULL, value REAL,
+    PRIMARY KEY (symbol, date, kind)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    symbol TEXT PRIMARY KEY, synced_at REAL
+);
+"""
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def _conn():
+    """One connection per thread (sqlite3 objects are not shareable across threads)."""
+    con = getattr(_local, "con", None)
+    if con is None or getattr(_local, "path", None) != OHLCV_DB:
+        os.makedirs(os.path.dirname(OHLCV_DB), exist_ok=True)
+        con = sqlite3.connect(OHLCV_DB, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.executescript(_SCHEMA)
+        _local.con, _local.path = con, OHLCV_DB
+    return con
+
+# ================================================================
+#                         READ
+# ================================================================
+
+def last_date(symbol):
+    row = _conn().execute("SELECT MAX(date) FROM bars WHERE symbol=?", (symbol.upper(),)).fetchone()
+    return datetime.date.fromisoformat(row[0]) if row and row[0] else None
+
+def read(symbol, start=None, end=None):
+    """Stored bars for symbol as a Date-indexed Open/High/Low/Close/Volume frame."""
+    q = "SELECT date, open, high, low, close, volume FROM bars WHERE symbol=?"
+    args = [symbol.upper()]
+    if start is not None:
+        q += " AND date >= ?"
+        args.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+    if end is not None:
+        q += " AND date <= ?"
+        args.append(pd.Timestamp(end).strftime("%Y-%m-%d"))
+    rows = _conn().execute(q + " ORDER BY date", args).fetchall()
+    if not rows:
+        return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"],
+                            index=pd.DatetimeIndex([], name="Date"))
+    dates, *cols = zip(*rows)
+    values = np.array(cols, dtype="float64").T
+    return pd.DataFrame(values, index=pd.DatetimeIndex(dates, name="Date"),
+                        columns=["Open", "High", "Low", "Close", "Volume"])
+
+# ================================================================
+#                         WRITE / ADJUST
+# ================================================================
+
+def _normalize(df):
+    """yfinance / NSE frame -> Date-indexed Open/High/Low/Close/Volume float frame."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.droplevel(1, axis=1) if df.columns.nlevels > 1 else df
+    df = df[["Open", "High", "Low", "Close", "Volume"]].dropna(subset=["Close"])
+    idx = pd.DatetimeIndex(df.index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return df.set_axis(idx.normalize(), axis=0).astype("float64")
+
+def upsert(symbol, df):
+    """Insert/replace bars; returns rows written."""
+    if df is None or df.empty:
+        return 0
+    df = _normalize(df)
+    rows = list(zip([symbol.upper()] * len(df), df.index.strftime("%Y-%m-%d"),
+                    *(df[c].tolist() for c in ["Open", "High", "Low", "Close", "Volume"])))
+    with _write_lock:
+        con = _conn()
+        con.executemany("INSERT OR REPLACE INTO bars VALUES (?,?,?,?,?,?,?)", rows)
+        con.commit()
+    return len(rows)
+
+def _known_events(symbol, kind):
+    rows = _conn().execute("SELECT date FROM events WHERE symbol=? AND kind=?", (symbol, kind)).fetchall()
+    return {r[0] for r in rows}
+
+def apply_events(symbol, splits=None, dividends=None, adjust=True, upto=None):
+    """
+    Record split/dividend events (Series indexed by ex-date) and back-adjust
+    stored bars before each *new* ex-date. Bars after `upto` (the range just
+    fetched, already adjusted by the source) are left alone. Returns the number of new events.
+    """
+    symbol = symbol.upper()
+    new = []
+    for kind, series in (("split", splits), ("dividend", dividends)):
+        if series is None or len(series) == 0:
+            continue
+        known = _known_events(symbol, kind)
+        idx = pd.DatetimeIndex(series.index)
+        if idx.tz is not None:
+            idx = idx.tz_localize(None)
+        for d, v in zip(idx.strftime("%Y-%m-%d"), series.to_numpy(dtype="float64")):
+            if d not in known and v:
+                new.append((d, kind, float(v)))
+
+    upto = pd.Timestamp(upto).strftime("%Y-%m-%d") if upto is not None else "9999-12-31"
+    with _write_lock:
+        con = _conn()
+        for d, kind, v in sorted(new):
+            if adjust:
+                if kind == "split":
+                    con.execute("UPDATE bars SET open=open/?, high=high/?, low=low/?, close=close/?, "
+                                "volume=volume*? WHERE symbol=? AND date<? AND date<=?", (v, v, v, v, v, symbol, d, upto))
+                else:
+                    prev = con.execute("SELECT close FROM bars WHERE symbol=? AND date<? ORDER BY date DESC LIMIT 1",
+                                       (symbol, d)).fetchone()
+                    if prev and prev[0]:
+                        f = 1.0 - v / prev[0]
+                        con.execute("UPDATE bars SET open=open*?, high=high*?, low=low*?, close=close*? "
+                                    "WHERE symbol=? AND date<? AND date<=?", (f, f, f, f, symbol, d, upto))
+            con.execute("INSERT OR REPLACE INTO events VALUES (?,?,?,?)", (symbol, d, kind, v))
+        con.commit()
+    return len(new)
+
+# ================================================================
+#                         SYNC
+# ================================================================
+
+def _fetch_yf(symbol, start=None):
+    import yfinance as yf
+    kw = {"start": start.strftime("%Y-%m-%d")} if start else {"period": INITIAL_PERIOD}
+    return yf.download(symbol + ".NS", interval="1d", auto_adjust=True, progress=False, **kw)
+
+def _fetch_nse(symbol, start=None):
+    """NSE securityArchives in <=1-year windows (the API's range limit)."""
+    from nsepython import nse_stock_hist
+    end = datetime.date.today()
+    start = start or end - datetime.timedelta(days=365 * 10)
+    parts = []
+    while start <= end:
+        stop = min(start + datetime.timedelta(days=364), end)
+        try:
+            parts.append(nse_stock_hist(start.strftime("%d-%m-%Y"), stop.strftime("%d-%m-%Y"), symbol, "EQ"))
+        except Exception:
+            pass
+        start = stop + datetime.timedelta(days=1)
+    df = pd.concat([p for p in parts if not p.empty]) if parts else pd.DataFrame()
+    if df.empty:
+        return df
+    out = pd.DataFrame({
+        "Open": df["CH_OPENING_PRICE"], "High": df["CH_TRADE_HIGH_PRICE"], "Low": df["CH_TRADE_LOW_PRICE"],
+        "Close": df["CH_CLOSING_PRICE"], "Volume": df["CH_TOT_TRADED_QTY"],
+    }).astype("float64")
+    out.index = pd.to_datetime(df["CH_TIMESTAMP"])
+    return out.sort_index()
+
+def sync(symbol, source="yfinance", force=False):
+    """
+    Bring the stored series up to date: only the range from the last stored
+    bar on is requested (re-fetching that bar, which may have been a partial
+    intraday one), then new split/dividend events are applied. synced_at is
+    stamped after every fetch that didn't raise, an empty one included, so a
+    delisted or mistyped symbol is asked again only after SYNC_INTERVAL.
+    Returns rows written.
+    """
+    symbol = symbol.strip().upper()
+    con = _conn()
+    if not force:
+        row = con.execute("SELECT synced_at FROM meta WHERE symbol=?", (symbol,)).fetchone()
+        if row and time.time() - row[0] < SYNC_INTERVAL:
+            return 0
+
+    last = last_date(symbol)
+    df = _fetch_nse(symbol, last) if source == "nse" else _fetch_yf(symbol, last)
+    written = upsert(symbol, df)
+    if not written:
+        _stamp([symbol])
+        return 0
+
+    if source != "nse":
+        from stock import split, dividend
+        try:
+            s, d = split(symbol)["Split"], dividend(symbol)["Dividend"]
+            # a first sync already got adjusted prices: just record the events;
+            # bars from `last` on were just re-fetched adjusted, so leave them alone
+            upto = last - datetime.timedelta(days=1) if last else None
+            apply_events(symbol, s, d, adjust=last is not None, upto=upto)
+        except Exception:
+            pass
+
+    _stamp([symbol])
+    return written
+
+def _stamp(symbols):
+    """Record a sync attempt that completed (with or without new rows)."""
+    with _write_lock:
+        con = _conn()
+        stamp = time.time()
+        con.executemany("INSERT OR REPLACE INTO meta VALUES (?,?)", [(s, stamp) for s in symbols])
+        con.commit()
+
+def _readjusted(symbol, last, df):
+    """True when the re-fetched bar at `last` no longer matches the stored one (source re-adjusted history)."""
+    fresh = _normalize(df)
+    day = pd.Timestamp(last)
+    if day not in fresh.index:
+        return False
+    stored = read(symbol, start=day, end=day)["Close"]
+    return len(stored) > 0 and abs(fresh.at[day, "Close"] / stored.iloc[0] - 1) > 1e-4
+
+def sync_many(symbols, chunk_size=100, force=False):
+    """
+    sync() for a whole universe: stale symbols are fetched with one multi-ticker
+    yfinance download per chunk instead of one request each. A symbol whose
+    re-fetched last bar disagrees with the stored one had a split/dividend, so
+    it gets a per-symbol sync(force=True) that applies the event. Returns rows written.
+    """
+    from stock import download_many
+    syms = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    con = _conn()
+    synced = {} if force else dict(con.execute("SELECT symbol, synced_at FROM meta").fetchall())
+    now = time.time()
+    stale = [s for s in syms if now - synced.get(s, 0) >= SYNC_INTERVAL]
+
+    written, resync = 0, []
+    for i in range(0, len(stale), chunk_size):
+        chunk = stale[i:i + chunk_size]
+        last = {s: last_date(s) for s in chunk}
+        new = [s for s in chunk if last[s] is None]
+        old = [s for s in chunk if last[s] is not None]
+        frames = download_many(new, period=INITIAL_PERIOD, chunk_size=chunk_size) if new else {}
+        if old:
+            got = download_many(old, start=min(last[s] for s in old), chunk_size=chunk_size)
+            for s, df in got.items():
+                if _readjusted(s, last[s], df):
+                    resync.append(s)
+                else:
+                    frames[s] = df
+
+        for s, df in frames.items():
+            written += upsert(s, df)
+        # symbols the download came back without are stamped too (negative cache)
+        _stamp([s for s in chunk if s not in resync])
+
+    for s in resync:
+        written += sync(s, force=True)
+    return written
+
+def period_start(period):
+    """First date covered by a yfinance-style period ('1y', '6M', '30d'); None for 'max'."""
+    if period == "max":
+        return None
+    n, unit = int(period[:-1]), period[-1].lower()
+    return pd.Timestamp.today().normalize() - (pd.DateOffset(years=n) if unit == "y" else
+                                               pd.DateOffset(months=n) if unit == "m" else
+                                               pd.DateOffset(days=n))
+
+def daily(symbol, period="1y", source="yfinance"):
+    """sync() then read the last `period` (pandas offset like '1y', '6M', '10y') from disk."""
+    sync(symbol, source=source)
+    return read(symbol, start=period_start(period))
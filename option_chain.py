@@ -0,0 +1,264 @@
+# option_chain.py — option chain / futures analytics on NSE derivatives payloads
+#
+# parse_chain() turns the option-chain JSON (index_chain / eq_chain) into
+# expiry x strike NumPy arrays, one per field and side (CE / PE), with NaN
+# where a contract is not listed. analyze() then computes everything in one
+# vectorised pass over those arrays:
+#   - max pain per expiry (total writer payout at every candidate settlement)
+#   - put/call ratio of open interest and of volume
+#   - change in OI bucketed by moneyness
+#   - implied volatility and Greeks of every contract (black_scholes, batched)
+#
+#   chain = parse_chain(index_chain("NIFTY"), "NIFTY")
+#   a = analyze(chain)
+#   a["summary"]          # one row per expiry
+
+import os
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from black_scholes import iv_and_greeks
+
+RISK_FREE_RATE = float(os.environ.get("RISK_FREE_RATE", 0.065))
+
+INDEX_SYMBOLS = {"NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY", "NIFTYNXT50"}
+# index display names (as on the indices page) -> option symbol
+INDEX_ALIASES = {
+    "NIFTY 50": "NIFTY", "NIFTY50": "NIFTY",
+    "NIFTY BANK": "BANKNIFTY", "BANK NIFTY": "BANKNIFTY", "NIFTYBANK": "BANKNIFTY",
+    "NIFTY FIN SERVICE": "FINNIFTY", "NIFTY FINANCIAL SERVICES": "FINNIFTY", "FIN NIFTY": "FINNIFTY",
+    "NIFTY MID SELECT": "MIDCPNIFTY", "NIFTY MIDCAP SELECT": "MIDCPNIFTY",
+    "NIFTY NEXT 50": "NIFTYNXT50",
+}
+FIELDS = ["openInterest", "changeinOpenInterest", "totalTradedVolume",
+          "impliedVolatility", "lastPrice", "bidprice", "askPrice"]
+SIDES = ("CE", "PE")
+EXPIRY_TIME = datetime.time(15, 30)          # contracts settle at the close
+MIN_T = 60 / (365 * 24 * 3600)               # floor on time to expiry (one minute), in years
+
+# moneyness buckets for OI change: strike / spot - 1, in percent
+BUCKET_EDGES = np.array([-5.0, -2.0, -0.5, 0.5, 2.0, 5.0])
+BUCKET_LABELS = ["< -5%", "-5% to -2%", "-2% to -0.5%", "ATM ±0.5%", "0.5% to 2%", "2% to 5%", "> 5%"]
+
+
+def chain_symbol(symbol):
+    """F&O symbol for a user-typed name: index display names ("NIFTY 50", "Nifty Bank") map to their option symbol."""
+    name = " ".join(symbol.upper().split())
+    if name in INDEX_ALIASES:
+        return INDEX_ALIASES[name]
+    compact = name.replace(" ", "")
+    return compact if compact in INDEX_SYMBOLS else name
+
+
+def is_index(symbol):
+    return chain_symbol(symbol) in INDEX_SYMBOLS
+
+
+def fetch_chain(symbol):
+    from nsepython import index_chain, eq_chain
+    symbol = chain_symbol(symbol)
+    return index_chain(symbol) if symbol in INDEX_SYMBOLS else eq_chain(symbol)
+
+
+def _parse_dt(s, fmt="%d-%b-%Y %H:%M:%S"):
+    try:
+        return datetime.datetime.strptime(s, fmt)
+    except (TypeError, ValueError):
+        return None
+
+
+def _num(v):
+    return float(v) if isinstance(v, (int, float)) else np.nan
+
+# ================================================================
+#                         PARSING
+# ================================================================
+
+class OptionChain:
+    """
+    strikes: (K,) sorted; expiries: E expiry strings, nearest first;
+    T: (E,) years to expiry; data[side][field]: (E, K) float arrays.
+    """
+    def __init__(self, symbol, spot, timestamp, strikes, expiries, T, data):
+        self.symbol, self.spot, self.timestamp = symbol, spot, timestamp
+        self.strikes, self.expiries, self.T, self.data = strikes, expiries, T, data
+
+    @property
+    def shape(self):
+        return len(self.expiries), len(self.strikes)
+
+    def __getitem__(self, key):
+        side, field = key
+        return self.data[side][field]
+
+
+def parse_chain(payload, symbol=""):
+    records = (payload or {}).get("records") or {}
+    rows = records.get("data") or []
+    spot = float(records.get("underlyingValue") or np.nan)
+    now = _parse_dt(records.get("timestamp")) or datetime.datetime.now()
+
+    expiries = [r.get("expiryDate") for r in rows]
+    order = sorted(set(expiries), key=lambda e: _parse_dt(e, "%d-%b-%Y") or datetime.datetime.max)
+    e_pos = {e: i for i, e in enumerate(order)}
+    ei = np.fromiter((e_pos[e] for e in expiries), dtype=np.intp, count=len(rows))
+    strikes, ki = np.unique(np.fromiter((_num(r.get("strikePrice")) for r in rows), dtype="float64",
+                                        count=len(rows)), return_inverse=True)
+
+    data = {}
+    for side in SIDES:
+        legs = [r.get(side) or {} for r in rows]
+        data[side] = {}
+        for field in FIELDS:
+            arr = np.full((len(order), len(strikes)), np.nan)
+            arr[ei, ki] = np.fromiter((_num(leg.get(field)) for leg in legs), dtype="float64", count=len(rows))
+            data[side][field] = arr
+
+    expiry_dt = [datetime.datetime.combine(_parse_dt(e, "%d-%b-%Y").date(), EXPIRY_TIME)
+                 if _parse_dt(e, "%d-%b-%Y") else now for e in order]
+    T = np.array([max((d - now).total_seconds() / (365 * 24 * 3600), MIN_T) for d in expiry_dt])
+    return OptionChain(symbol, spot, now, strikes, order, T, data)
+
+# ================================================================
+#                         ANALYTICS
+# ================================================================
+
+def premium(chain, side):
+    """Mid of a live bid/ask quote, else last traded price; NaN when neither."""
+    bid, ask, ltp = chain[side, "bidprice"], chain[side, "askPrice"], chain[side, "lastPrice"]
+    quoted = (bid > 0) & (ask > 0) & (ask >= bid)
+    p = np.where(quoted, (bid + ask) / 2, ltp)
+    return np.where(p > 0, p, np.nan)
+
+
+def max_pain(strikes, call_oi, put_oi):
+    """
+    Settlement strike that minimises the total payout to option holders, per
+    expiry. call_oi / put_oi: (E, K). payout[e, s] = sum_k OI * intrinsic(s, k).
+    """
+    intrinsic_call = np.maximum(strikes[:, None] - strikes[None, :], 0)     # [settle, strike]
+    payout = np.nan_to_num(call_oi) @ intrinsic_call.T + np.nan_to_num(put_oi) @ intrinsic_call
+    has_oi = (np.nan_to_num(call_oi).sum(axis=1) + np.nan_to_num(put_oi).sum(axis=1)) > 0
+    return np.where(has_oi, strikes[np.argmin(payout, axis=1)], np.nan), payout
+
+
+def oi_change_buckets(chain):
+    """Summed change in OI per moneyness bucket: {"CE": (E, B), "PE": (E, B)}."""
+    moneyness = (chain.strikes / chain.spot - 1) * 100
+    bucket = np.digitize(moneyness, BUCKET_EDGES)
+    out = {}
+    for side in SIDES:
+        chg = np.nan_to_num(chain[side, "changeinOpenInterest"])
+        m = np.zeros((chain.shape[0], len(BUCKET_LABELS)))
+        np.add.at(m.T, bucket, chg.T)
+        out[side] = m
+    return out
+
+
+def analyze(chain, rate=RISK_FREE_RATE):
+    E, K = chain.shape
+    if not E or not K:
+        return {"summary": pd.DataFrame(), "buckets": pd.DataFrame(), "iv": {}, "greeks": {}, "atm": None}
+
+    ce_oi, pe_oi = chain["CE", "openInterest"], chain["PE", "openInterest"]
+    pain, _ = max_pain(chain.strikes, ce_oi, pe_oi)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ce_tot, pe_tot = np.nansum(ce_oi, axis=1), np.nansum(pe_oi, axis=1)
+        ce_vol = np.nansum(chain["CE", "totalTradedVolume"], axis=1)
+        pe_vol = np.nansum(chain["PE", "totalTradedVolume"], axis=1)
+        pcr_oi = np.where(ce_tot > 0, pe_tot / ce_tot, np.nan)
+        pcr_vol = np.where(ce_vol > 0, pe_vol / ce_vol, np.nan)
+
+    # every call and put of every expiry in one solver call: (2, E, K)
+    prem = np.stack([premium(chain, "CE"), premium(chain, "PE")])
+    is_call = np.array([True, False])[:, None, None]
+    g = iv_and_greeks(prem, chain.spot, chain.strikes[None, None, :], chain.T[None, :, None], rate, call=is_call)
+    iv = {"CE": g["iv"][0] * 100, "PE": g["iv"][1] * 100}
+    greeks = {side: {k: g[k][i] for k in ("delta", "gamma", "theta", "vega")} for i, side in enumerate(SIDES)}
+
+    atm = int(np.nanargmin(np.abs(chain.strikes - chain.spot))) if np.isfinite(chain.spot) else K // 2
+    pair = np.stack([iv["CE"][:, atm], iv["PE"][:, atm]])
+    n = np.isfinite(pair).sum(axis=0)
+    atm_iv = np.where(n > 0, np.nansum(pair, axis=0) / np.maximum(n, 1), np.nan)
+
+    summary = pd.DataFrame({
+        "expiry": chain.expiries,
+        "days": np.round(chain.T * 365, 1),
+        "CE OI": ce_tot, "PE OI": pe_tot,
+        "PCR (OI)": np.round(pcr_oi, 3), "PCR (vol)": np.round(pcr_vol, 3),
+        "max pain": pain,
+        "ATM IV %": np.round(atm_iv, 2),
+    })
+
+    b = oi_change_buckets(chain)
+    buckets = pd.DataFrame({"moneyness": BUCKET_LABELS, "CE chg OI": b["CE"][0], "PE chg OI": b["PE"][0],
+                            "net (PE - CE)": b["PE"][0] - b["CE"][0]})
+    return {"summary": summary, "buckets": buckets, "bucket_arrays": b, "iv": iv, "greeks": greeks, "atm": atm,
+            "max_pain": pain, "pcr_oi": pcr_oi, "pcr_vol": pcr_vol, "atm_iv": atm_iv,
+            "pcr_total": float(np.nansum(pe_tot) / np.nansum(ce_tot)) if np.nansum(ce_tot) else np.nan}
+
+
+def chain_table(chain, analysis, expiry=0, width=15):
+    """Calls | strike | puts around the ATM strike of one expiry."""
+    atm = analysis["atm"]
+    lo, hi = max(atm - width, 0), min(atm + width + 1, len(chain.strikes))
+    s = slice(lo, hi)
+    cols = {}
+    for side in SIDES:
+        cols[side] = {
+            "OI": chain[side, "openInterest"][expiry, s],
+            "chg OI": chain[side, "changeinOpenInterest"][expiry, s],
+            "volume": chain[side, "totalTradedVolume"][expiry, s],
+            "IV": np.round(analysis["iv"][side][expiry, s], 2),
+            "NSE IV": chain[side, "impliedVolatility"][expiry, s],
+            "delta": np.round(analysis["greeks"][side]["delta"][expiry, s], 3),
+            "LTP": chain[side, "lastPrice"][expiry, s],
+        }
+    out = {f"CE {k}": v for k, v in cols["CE"].items()}
+    out["strike"] = chain.strikes[s]
+    out.update({f"PE {k}": v for k, v in reversed(list(cols["PE"].items()))})
+    return pd.DataFrame(out)
+
+# ================================================================
+#                         FUTURES
+# ================================================================
+
+def futures_table(payload):
+    """
+    Futures contracts of a quote-derivative payload (eq_der), nearest first,
+    with basis to the underlying and its annualised carry.
+    """
+    payload = payload or {}
+    spot = float(payload.get("underlyingValue") or np.nan)
+    now = _parse_dt(payload.get("fut_timestamp") or payload.get("opt_timestamp")) or datetime.datetime.now()
+    rows = []
+    for s in payload.get("stocks") or []:
+        meta = s.get("metadata") or {}
+        if "Futures" not in str(meta.get("instrumentType", "")):
+            continue
+        trade = ((s.get("marketDeptOrderBook") or {}).get("tradeInfo")) or {}
+        rows.append({
+            "expiry": meta.get("expiryDate"),
+            "lastPrice": meta.get("lastPrice"), "change": meta.get("change"), "pChange": meta.get("pChange"),
+            "open": meta.get("openPrice"), "high": meta.get("highPrice"), "low": meta.get("lowPrice"),
+            "prevClose": meta.get("prevClose"),
+            "contracts": meta.get("numberOfContractsTraded"),
+            "OI": trade.get("openInterest"), "chg OI": trade.get("changeinOpenInterest"),
+            "pchg OI": trade.get("pchangeinOpenInterest"),
+        })
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    expiry = pd.to_datetime(df["expiry"], format="%d-%b-%Y", errors="coerce") + pd.Timedelta(hours=15, minutes=30)
+    df = df.assign(_e=expiry).sort_values("_e").drop(columns="_e").reset_index(drop=True)
+    expiry = expiry.sort_values().reset_index(drop=True)
+    days = np.maximum((expiry - pd.Timestamp(now)).dt.total_seconds().to_numpy() / 86400, MIN_T * 365)
+    ltp = pd.to_numeric(df["lastPrice"], errors="coerce").to_numpy(dtype="float64")
+    df["days"] = np.round(days, 1)
+    df["basis"] = np.round(ltp - spot, 2)
+    df["basis %"] = np.round((ltp / spot - 1) * 100, 3)
+    df["carry % p.a."] = np.round((ltp / spot - 1) * 36500 / days, 2)
+    return df
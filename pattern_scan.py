@@ -0,0 +1,169 @@
+# pattern_scan.py — universe-wide TA-Lib candlestick pattern scan
+#
+# Input is a symbol x date OHLC panel (the bhavcopy panel, or cached daily bars
+# via panel_from_frames). Symbols are sharded across a process pool; each worker
+# runs every CDL function over its rows. Results land in one int8 cube
+#   patterns x symbols x dates   with +1 bullish, -1 bearish, 0 none
+# so "who printed a bullish engulfing today" is a single slice + mask.
+
+import os
+import numpy as np
+import pandas as pd
+import talib
+from concurrent.futures import ProcessPoolExecutor
+
+from ta_indi_pat import PATTERNS
+
+# ================================================================
+#                         WORKER
+# ================================================================
+
+def _scan_chunk(o, h, l, c, patterns):
+    """(symbols x dates) OHLC arrays -> int8 (patterns x symbols x dates)."""
+    out = np.zeros((len(patterns), o.shape[0], o.shape[1]), dtype=np.int8)
+    for s in range(o.shape[0]):
+        ok = ~(np.isnan(o[s]) | np.isnan(h[s]) | np.isnan(l[s]) | np.isnan(c[s]))
+        if ok.sum() < 2:
+            continue
+        # TA-Lib needs gap-free input: scan the traded days only, scatter back
+        args = [np.ascontiguousarray(a[s][ok]) for a in (o, h, l, c)]
+        cols = np.flatnonzero(ok)
+        for p, name in enumerate(patterns):
+            out[p, s, cols] = np.sign(getattr(talib, name)(*args))
+    return out
+
+# ================================================================
+#                         RESULT
+# ================================================================
+
+class PatternMatrix:
+    def __init__(self, data, patterns, symbols, dates):
+        self.data = data
+        self.patterns = list(patterns)
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.dates = list(dates)
+        self._p = {p: i for i, p in enumerate(self.patterns)}
+
+    def _col(self, date=None):
+        """Column of `date` (date, Timestamp or DD-MM-YYYY); None = latest scanned day."""
+        if date is None:
+            return len(self.dates) - 1
+        return self.dates.index(pd.to_datetime(date, dayfirst=True).date())
+
+    def signals(self, pattern, date=None):
+        """int8 vector over symbols for one pattern on one date (default: latest)."""
+        return self.data[self._p[pattern.upper()], :, self._col(date)]
+
+    def symbols_with(self, pattern, date=None, direction="bullish"):
+        """Symbols that printed `pattern` on `date`; direction: bullish / bearish / any."""
+        sig = self.signals(pattern, date)
+        mask = sig > 0 if direction == "bullish" else sig < 0 if direction == "bearish" else sig != 0
+        return self.symbols[mask].tolist()
+
+    def on(self, date=None):
+        """symbol x pattern frame of signals for one date, only rows with at least one hit."""
+        day = self.data[:, :, self._col(date)].T
+        hit = day.any(axis=1)
+        return pd.DataFrame(day[hit], index=self.symbols[hit], columns=self.patterns)
+
+    def counts(self, date=None):
+        """Bullish / bearish hit counts per pattern on one date."""
+        day = self.data[:, :, self._col(date)]
+        return pd.DataFrame({"bullish": (day > 0).sum(axis=1), "bearish": (day < 0).sum(axis=1)},
+                            index=self.patterns)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+# ================================================================
+#                         SCAN
+# ================================================================
+
+def panel_from_frames(frames):
+    """{symbol: OHLCV frame} (e.g. cached daily bars) -> (symbols, dates, {open,high,low,close,volume})."""
+    symbols = list(frames)
+    dates = sorted(set().union(*(f.index for f in frames.values()))) if frames else []
+    pos = pd.Index(dates)
+    arrays = {k: np.full((len(symbols), len(dates)), np.nan) for k in ("open", "high", "low", "close", "volume")}
+    for i, sym in enumerate(symbols):
+        f = frames[sym]
+        if isinstance(f.columns, pd.MultiIndex):
+            f = f.droplevel(1, axis=1)
+        cols = pos.get_indexer(f.index)
+        for k in arrays:
+            if k.capitalize() in f.columns:
+                arrays[k][i, cols] = f[k.capitalize()].to_numpy(dtype="float64")
+    return symbols, [pd.Timestamp(d).date() for d in dates], arrays
+
+
+_pool = None
+_pool_workers = 0
+
+def process_pool(workers):
+    """One long-lived process pool, so repeated scans don't pay worker start-up."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def scan_patterns(panel=None, patterns=PATTERNS, days=60, workers=None, chunk=None,
+                  symbols=None, dates=None, arrays=None):
+    """
+    Run every pattern over every symbol of a BhavPanel (or pre-built symbols/dates/arrays)
+    for the last `days` sessions. workers<=1 (or a single-core host) scans in-process.
+    """
+    if panel is not None:
+        symbols, dates = list(panel.symbols), list(panel.dates)
+        arrays = {k: panel.field(f) for k, f in (("open", "OPEN_PRICE"), ("high", "HIGH_PRICE"),
+                                                  ("low", "LOW_PRICE"), ("close", "CLOSE_PRICE"))}
+    if days:
+        dates = dates[-days:]
+        arrays = {k: v[:, -days:] for k, v in arrays.items()}
+
+    patterns = [p.upper() for p in patterns]
+    n = len(symbols)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    chunk = chunk or max(50, -(-n // max(workers * 4, 1)))
+    bounds = [(i, min(i + chunk, n)) for i in range(0, n, chunk)]
+    args = [tuple(arrays[k][a:b] for k in ("open", "high", "low", "close")) + (patterns,) for a, b in bounds]
+
+    if workers > 1 and len(bounds) > 1:
+        parts = list(process_pool(workers).map(_scan_chunk, *zip(*args)))
+    else:
+        parts = [_scan_chunk(*a) for a in args]
+
+    data = np.concatenate(parts, axis=1) if parts else np.zeros((len(patterns), 0, len(dates)), np.int8)
+    return PatternMatrix(data, patterns, symbols, dates)
+
+
+# Last universe scan, so repeated questions about the same day cost one slice.
+latest_scan = None
+
+def scan_universe(start_str, end_str, patterns=PATTERNS, workers=None):
+    """Scan the bhavcopy panel over [start, end] and remember the result as latest_scan."""
+    global latest_scan
+    from bhavcopy_panel import load_panel, bhav_panel
+    from bhavcopy_store import parse_date
+    load_panel(start_str, end_str)
+    lo, hi = bhav_panel.span(parse_date(start_str), parse_date(end_str))
+    latest_scan = scan_patterns(
+        symbols=list(bhav_panel.symbols), dates=bhav_panel.dates[lo:hi],
+        arrays={k: bhav_panel.field(f)[:, lo:hi] for k, f in (("open", "OPEN_PRICE"), ("high", "HIGH_PRICE"),
+                                                             ("low", "LOW_PRICE"), ("close", "CLOSE_PRICE"))},
+        patterns=patterns, days=None, workers=workers)
+    return latest_scan
+
+def symbols_with_pattern(pattern, date=None, direction="bullish"):
+    """
+    e.g. symbols_with_pattern("CDLENGULFING") -> symbols with a bullish engulfing
+    on the last day of the latest scan_universe() result (scan_patterns() only
+    returns its matrix; it does not set latest_scan).
+    """
+    if latest_scan is None:
+        raise RuntimeError("No scan yet: call scan_universe() first")
+    return latest_scan.symbols_with(pattern, date, direction)
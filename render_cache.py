@@ -0,0 +1,175 @@
+# render_cache.py — rendered-HTML cache for the page builders
+#
+# The builders are split into fetch (NSE payload) and render (payload -> HTML).
+# cached_render() keys the HTML on (builder, args, payload fingerprint), so an
+# unchanged upstream snapshot returns the HTML already built for it instead of
+# re-rendering hundreds of KB. Entries live in a byte-bounded LRU, optionally
+# gzip-compressed (RENDER_CACHE_GZIP=1).
+#
+# Pages that can never change (bhavcopy for a past date) go through
+# persistent_render(): kept on disk under RENDER_DIR, no payload needed on a hit.
+
+import os
+import gzip
+import pickle
+import hashlib
+import datetime
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+RENDER_CACHE_BYTES = int(float(os.environ.get("RENDER_CACHE_MB", 32)) * 1024 * 1024)
+RENDER_CACHE_GZIP = os.environ.get("RENDER_CACHE_GZIP", "0") == "1"
+RENDER_DIR = os.environ.get(
+    "RENDER_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "render")
+)
+# bump when a renderer's output changes so persisted pages are rebuilt
+RENDER_VERSION = 2
+
+# ================================================================
+#                         FINGERPRINT
+# ================================================================
+
+def _feed(h, obj):
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr((obj.shape, list(obj.columns))).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        except TypeError:        # unhashable cells (dicts/lists from JSON)
+            h.update(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    elif isinstance(obj, pd.Series):
+        _feed(h, obj.to_frame())
+    elif isinstance(obj, dict):
+        for k in sorted(obj, key=str):
+            h.update(str(k).encode())
+            _feed(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[%d" % len(obj))
+        for v in obj:
+            _feed(h, v)
+    else:
+        h.update(repr(obj).encode())
+
+
+def fingerprint(payload):
+    """Stable digest of an NSE payload (dicts / lists / DataFrames / scalars)."""
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, payload)
+    return h.hexdigest()
+
+# ================================================================
+#                         MEMORY LRU
+# ================================================================
+
+class RenderCache:
+    def __init__(self, max_bytes=RENDER_CACHE_BYTES, compress=RENDER_CACHE_GZIP):
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()    # key -> bytes (utf-8 html, gzipped if compress)
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "disk_hits": 0, "disk_writes": 0}
+
+    def _encode(self, html):
+        raw = html.encode("utf-8")
+        return gzip.compress(raw, compresslevel=1) if self.compress else raw
+
+    def _decode(self, blob):
+        return (gzip.decompress(blob) if self.compress else blob).decode("utf-8")
+
+    def get(self, key):
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+        return self._decode(blob)
+
+    def put(self, key, html):
+        blob = self._encode(html)
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = blob
+            self._bytes += len(blob)
+            while self._bytes > self.max_bytes:
+                _, ev = self._entries.popitem(last=False)
+                self._bytes -= len(ev)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def info(self):
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "bytes": self._bytes,
+                    "max_bytes": self.max_bytes, "gzip": self.compress}
+
+
+render_cache = RenderCache()
+
+def render_cache_stats(): return render_cache.info()
+
+# ================================================================
+#                         ENTRY POINTS
+# ================================================================
+
+def cached_render(builder, args, payload, render):
+    """HTML for render(payload, *args), reused while (builder, args, payload) is unchanged."""
+    key = (builder, tuple(args), fingerprint(payload))
+    html = render_cache.get(key)
+    if html is None:
+        html = render(payload, *args)
+        render_cache.put(key, html)
+    return html
+
+
+def _disk_path(builder, args):
+    name = "_".join([builder, f"v{RENDER_VERSION}"] + [str(a).replace(os.sep, "-") for a in args])
+    return os.path.join(RENDER_DIR, name + ".html.gz")
+
+
+def persistent_render(builder, args, build):
+    """
+    For immutable pages: memory LRU, then disk, then build(*args). Only the
+    built HTML is needed, so a hit skips loading the payload entirely.
+    """
+    key = (builder, tuple(args), "persistent")
+    html = render_cache.get(key)
+    if html is not None:
+        return html
+
+    path = _disk_path(builder, args)
+    if os.path.exists(path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            html = f.read()
+        with render_cache._lock:
+            render_cache.stats["disk_hits"] += 1
+    else:
+        html = build(*args)
+        os.makedirs(RENDER_DIR, exist_ok=True)
+        tmp = path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+            f.write(html)
+        os.replace(tmp, path)
+        with render_cache._lock:
+            render_cache.stats["disk_writes"] += 1
+    render_cache.put(key, html)
+    return html
+
+
+def is_past(date_str):
+    """True for a DD-MM-YYYY date before today (its bhavcopy can no longer change)."""
+    try:
+        return datetime.datetime.strptime(date_str, "%d-%m-%Y").date() < datetime.date.today()
+    except (TypeError, ValueError):
+        return False
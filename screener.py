@@ -0,0 +1,247 @@
+# screener.py — market-wide screener over cached OHLCV
+#
+#   for step in screen_iter("RSI14 < 30 and close > SMA200"):
+#       step["done"], step["total"], step["results"]      # ranked matches so far
+#
+# Filter expressions use the ta_indi_pat column labels (RSI14, SMA200, EMA20,
+# MACD12_26_9_macdsignal, BBANDS20_lowerband, ...) plus open/high/low/close/
+# volume and change (last bar % change). They are parsed once into a whitelisted
+# AST, never eval()'d. Symbols are sharded across a process pool, results stream
+# back shard by shard, and the run stops at the time budget.
+
+import ast
+import re
+import time
+import os
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from ta_indi_pat import parse_indicator, run_indicator
+from pattern_scan import process_pool
+
+BASE_FIELDS = ("open", "high", "low", "close", "volume", "change")
+
+# ================================================================
+#                    FILTER EXPRESSIONS
+# ================================================================
+
+_TOKEN_RE = re.compile(r"^([A-Z][A-Z0-9]*?)((?:\d+)(?:_\d+(?:\.\d+)?)*)?(?:_([a-z]+))?$")
+
+_ALLOWED = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.Compare, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Name, ast.Load, ast.Constant,
+)
+
+
+def _indicator_for(token):
+    """'RSI14' -> ('RSI(14)', 'RSI14'); 'MACD12_26_9_macdsignal' -> ('MACD(12,26,9)', column)."""
+    m = _TOKEN_RE.match(token)
+    if not m:
+        raise ValueError(f"Unknown name in filter: {token}")
+    name, args, output = m.groups()
+    spec = f"{name}({args.replace('_', ',')})" if args else name
+    s = parse_indicator(spec)
+    if output:
+        col = f"{s.label}_{output}"
+        if col not in s.columns:
+            raise ValueError(f"{token}: {s.name} outputs are {list(s.columns)}")
+    else:
+        col = s.columns[0]      # MACD12_26_9 -> the macd line
+    return spec, col
+
+
+def compile_filter(expr):
+    """Parse a filter expression -> (ast, {name: (spec, column)}) for its indicator names."""
+    tree = ast.parse(expr.strip(), mode="eval")
+    needs = {}
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED):
+            raise ValueError(f"Not allowed in filter: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError("Only numeric constants are allowed in filters")
+        if isinstance(node, ast.Name) and node.id.lower() not in BASE_FIELDS:
+            needs[node.id] = _indicator_for(node.id)
+    return tree, needs
+
+
+_CMP = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal,
+        ast.Eq: np.equal, ast.NotEq: np.not_equal}
+_BIN = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+
+
+def _eval(node, env):
+    """Vectorised evaluation over one value per symbol (NaN compares False)."""
+    if isinstance(node, ast.Expression):
+        return _eval(node.body, env)
+    if isinstance(node, ast.BoolOp):
+        vals = [_eval(v, env).astype(bool) for v in node.values]
+        return np.logical_and.reduce(vals) if isinstance(node.op, ast.And) else np.logical_or.reduce(vals)
+    if isinstance(node, ast.UnaryOp):
+        v = _eval(node.operand, env)
+        return np.logical_not(v) if isinstance(node.op, ast.Not) else (-v if isinstance(node.op, ast.USub) else v)
+    if isinstance(node, ast.Compare):
+        left, out = _eval(node.left, env), None
+        for op, comp in zip(node.ops, node.comparators):
+            right = _eval(comp, env)
+            r = _CMP[type(op)](left, right)
+            out = r if out is None else out & r
+            left = right
+        return out
+    if isinstance(node, ast.BinOp):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _BIN[type(node.op)](_eval(node.left, env), _eval(node.right, env))
+    if isinstance(node, ast.Name):
+        return env[node.id.lower()] if node.id.lower() in BASE_FIELDS else env[node.id]
+    return np.float64(node.value)
+
+# ================================================================
+#                    WORKER (runs in the process pool)
+# ================================================================
+
+def _screen_shard(symbols, arrays, tree, needs, rank_by):
+    """
+    arrays: {open, high, low, close, volume} (symbols x dates). Returns a frame of
+    matching symbols with the last-bar values of every referenced name.
+    """
+    n = len(symbols)
+    env = {k: np.full(n, np.nan) for k in BASE_FIELDS}
+    env.update({name: np.full(n, np.nan) for name in needs})
+    specs = {spec: parse_indicator(spec) for spec, _ in needs.values()}
+
+    for i in range(n):
+        ok = ~np.isnan(arrays["close"][i])
+        if ok.sum() < 2:
+            continue
+        a = {k: np.ascontiguousarray(v[i][ok]) for k, v in arrays.items()}
+        for k in ("open", "high", "low", "close", "volume"):
+            env[k][i] = a[k][-1]
+        env["change"][i] = (a["close"][-1] / a["close"][-2] - 1) * 100 if a["close"][-2] else np.nan
+        outputs = {}
+        for spec, s in specs.items():
+            res = run_indicator(s, a)
+            res = res if isinstance(res, tuple) else (res,)
+            outputs.update({c: r[-1] for c, r in zip(s.columns, res)})
+        for name, (spec, col) in needs.items():
+            env[name][i] = outputs[col]
+
+    mask = np.asarray(_eval(tree, env), dtype=bool)
+    cols = ["close", "change"] + list(needs)
+    out = pd.DataFrame({c: env[c][mask] for c in cols}, index=np.asarray(symbols, dtype=object)[mask])
+    out.index.name = "symbol"
+    if rank_by is not None:
+        out["rank_value"] = _eval(ast.parse(rank_by, mode="eval"), env)[mask]
+    return out
+
+# ================================================================
+#                    DATA SOURCE
+# ================================================================
+
+def bhav_ohlcv(lookback_days=400, end=None, fetch=False):
+    """
+    Symbols + (symbols x dates) OHLCV arrays from the local bhavcopy panel.
+    Only days already in the store are read (fetch=False): a cold store would
+    otherwise mean hundreds of downloads inside the request, before the first
+    progress update and outside the time budget. Fill the store beforehand with
+    `python bhavcopy_store.py <start> <end>`.
+    """
+    from bhavcopy_panel import load_panel, bhav_panel
+    end = pd.Timestamp(end or pd.Timestamp.now().normalize())
+    start = end - pd.Timedelta(days=lookback_days)
+    load_panel(start.strftime("%d-%m-%Y"), end.strftime("%d-%m-%Y"), fetch=fetch)
+    lo, hi = bhav_panel.span(start.date(), end.date())
+    fields = {"open": "OPEN_PRICE", "high": "HIGH_PRICE", "low": "LOW_PRICE",
+              "close": "CLOSE_PRICE", "volume": "TTL_TRD_QNTY"}
+    return list(bhav_panel.symbols), {k: bhav_panel.field(f)[:, lo:hi] for k, f in fields.items()}
+
+# ================================================================
+#                    DRIVER
+# ================================================================
+
+_stale = set()       # shards of timed-out scans still running in the process pool
+_stale_lock = threading.Lock()
+
+def screen_iter(expr, symbols=None, arrays=None, rank_by=None, ascending=False,
+                workers=None, chunk=None, time_budget=60.0, loader=bhav_ohlcv):
+    """
+    Yield progress dicts as shards complete:
+        {"done", "total", "matches", "elapsed", "timed_out", "results" (ranked DataFrame)}
+    rank_by: expression to sort by (default: change). The last yield is the final state.
+    """
+    t0 = time.monotonic()
+    tree, needs = compile_filter(expr)
+    if rank_by is not None:
+        needs = {**needs, **compile_filter(rank_by)[1]}
+    if arrays is None:
+        symbols, arrays = loader()
+
+    n = len(symbols)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    chunk = chunk or max(25, -(-n // max(workers * 8, 1)))
+    shards = [(symbols[a:a + chunk], {k: v[a:a + chunk] for k, v in arrays.items()})
+              for a in range(0, n, chunk)]
+
+    parts, done = [], 0
+
+    def state(timed_out=False):
+        res = pd.concat(parts) if parts else pd.DataFrame(columns=["close", "change"] + list(needs))
+        key = "rank_value" if rank_by is not None else "change"
+        res = res.sort_values(key, ascending=ascending)
+        return {"done": done, "total": n, "matches": len(res), "elapsed": time.monotonic() - t0,
+                "timed_out": timed_out, "results": res}
+
+    if not shards:
+        yield state()
+        return
+    if workers <= 1 or len(shards) == 1:
+        for syms, arr in shards:
+            if time.monotonic() - t0 > time_budget:
+                yield state(timed_out=True)
+                return
+            parts.append(_screen_shard(syms, arr, tree, needs, rank_by))
+            done += len(syms)
+            yield state()
+        return
+
+    # A running shard can't be cancelled, so at most 2 * workers shards are in
+    # flight (enough to keep every process busy): on timeout the rest were never submitted, and the few still
+    # running are left in _stale. The next scan waits for those (within its
+    # own budget) before submitting, instead of queueing behind them.
+    pool = process_pool(workers)
+
+    def remaining():
+        return max(time_budget - (time.monotonic() - t0), 0)
+
+    with _stale_lock:
+        _stale.difference_update([f for f in _stale if f.done()])
+        stale = list(_stale)
+    if stale and wait(stale, timeout=remaining()).not_done:
+        yield state(timed_out=True)
+        return
+
+    pending, inflight = list(shards), {}
+    while pending or inflight:
+        while pending and len(inflight) < 2 * workers:
+            syms, arr = pending.pop(0)
+            inflight[pool.submit(_screen_shard, syms, arr, tree, needs, rank_by)] = len(syms)
+        finished, _ = wait(inflight, timeout=remaining(), return_when=FIRST_COMPLETED)
+        if not finished:
+            with _stale_lock:
+                _stale.difference_update([f for f in _stale if f.done()])
+                _stale.update(inflight)
+            yield state(timed_out=True)
+            return
+        for fut in finished:
+            parts.append(fut.result())
+            done += inflight.pop(fut)
+        yield state()
+
+
+def screen(expr, **kw):
+    """Run screen_iter to completion and return the final ranked DataFrame."""
+    last = None
+    for last in screen_iter(expr, **kw):
+        pass
+    return last["results"] if last else pd.DataFrame()
@@ -0,0 +1,189 @@
+# snapshot_diff.py — vectorised diffs of symbol-keyed constituent snapshots
+#
+# A Snapshot splits a constituents frame into a sorted symbol array, a float64
+# matrix of the numeric columns and an object matrix of the rest. Diffing two
+# snapshots aligns symbols with one np.intersect1d and compares whole matrices,
+# so a 500-symbol refresh costs a few array ops rather than a Python loop.
+# SnapshotRing keeps the last `capacity` snapshots for questions like
+# "what moved in the last 60 seconds".
+#
+#   ring = SnapshotRing()
+#   delta = ring.append(frame)          # frame indexed (or keyed) by symbol
+#   delta.cells()                        # {symbol: {column: new value}}
+#   ring.moved(60, "lastPrice")          # symbols whose lastPrice changed in 60s
+
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# ================================================================
+#                         SNAPSHOT
+# ================================================================
+
+class Snapshot:
+    __slots__ = ("ts", "symbols", "num_cols", "num", "obj_cols", "obj")
+
+    def __init__(self, frame, ts=None, key="symbol"):
+        if key in frame.columns:
+            frame = frame.set_index(key)
+        frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        self.ts = time.time() if ts is None else ts
+        self.symbols = frame.index.to_numpy(dtype=object)
+        numeric = [c for c in frame.columns
+                   if pd.api.types.is_numeric_dtype(frame[c].dtype) and not pd.api.types.is_bool_dtype(frame[c].dtype)]
+        self.num_cols = numeric
+        self.num = frame[numeric].to_numpy(dtype="float64") if numeric else np.empty((len(frame), 0))
+        self.obj_cols = [c for c in frame.columns if c not in set(numeric)]
+        self.obj = frame[self.obj_cols].astype(object).to_numpy() if self.obj_cols else np.empty((len(frame), 0), object)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @property
+    def nbytes(self):
+        return self.num.nbytes + self.obj.nbytes + self.symbols.nbytes
+
+    def column(self, name):
+        """(symbols, values) of one column."""
+        if name in self.num_cols:
+            return self.symbols, self.num[:, self.num_cols.index(name)]
+        return self.symbols, self.obj[:, self.obj_cols.index(name)]
+
+    def frame(self):
+        return pd.concat([pd.DataFrame(self.num, index=self.symbols, columns=self.num_cols),
+                          pd.DataFrame(self.obj, index=self.symbols, columns=self.obj_cols)], axis=1)
+
+# ================================================================
+#                         DIFF
+# ================================================================
+
+class Delta:
+    """Changes from `old` to `new`: changed cells of common symbols plus added/removed symbols."""
+    def __init__(self, old, new):
+        self.ts = new.ts
+        self.new = new
+        if old is None:
+            self.added, self.removed = list(new.symbols), []
+            self.rows = np.empty(0, dtype=int)
+            self.num_mask = np.zeros((0, len(new.num_cols)), bool)
+            self.obj_mask = np.zeros((0, len(new.obj_cols)), bool)
+            self.num_cols, self.obj_cols = new.num_cols, new.obj_cols
+            return
+
+        common, io, inew = np.intersect1d(old.symbols, new.symbols, assume_unique=True, return_indices=True)
+        self.added = list(np.setdiff1d(new.symbols, common, assume_unique=True))
+        self.removed = list(np.setdiff1d(old.symbols, common, assume_unique=True))
+
+        # compare only columns present in both snapshots
+        num_cols = [c for c in new.num_cols if c in old.num_cols]
+        obj_cols = [c for c in new.obj_cols if c in old.obj_cols]
+        a = old.num[np.ix_(io, [old.num_cols.index(c) for c in num_cols])]
+        b = new.num[np.ix_(inew, [new.num_cols.index(c) for c in num_cols])]
+        num_mask = (a != b) & ~(np.isnan(a) & np.isnan(b))
+
+        ao = old.obj[np.ix_(io, [old.obj_cols.index(c) for c in obj_cols])]
+        bo = new.obj[np.ix_(inew, [new.obj_cols.index(c) for c in obj_cols])]
+        obj_mask = (ao != bo) & ~(pd.isna(ao) & pd.isna(bo))
+
+        hit = num_mask.any(axis=1) | obj_mask.any(axis=1)
+        self.rows = inew[hit]                       # rows of `new` that changed
+        self.num_mask, self.obj_mask = num_mask[hit], obj_mask[hit]
+        self.num_cols, self.obj_cols = num_cols, obj_cols
+
+    def __bool__(self):
+        return bool(len(self.rows) or self.added or self.removed)
+
+    @property
+    def symbols(self):
+        return list(self.new.symbols[self.rows])
+
+    @property
+    def columns(self):
+        """Columns with at least one changed cell."""
+        return ([c for c, m in zip(self.num_cols, self.num_mask.any(axis=0)) if m] +
+                [c for c, m in zip(self.obj_cols, self.obj_mask.any(axis=0)) if m])
+
+    def cells(self):
+        """{symbol: {column: new value}} for every changed cell."""
+        out = {}
+        ni = [self.new.num_cols.index(c) for c in self.num_cols]
+        oi = [self.new.obj_cols.index(c) for c in self.obj_cols]
+        for r, row, nm, om in zip(self.rows, self.new.symbols[self.rows], self.num_mask, self.obj_mask):
+            d = {self.num_cols[j]: float(self.new.num[r, ni[j]]) for j in np.flatnonzero(nm)}
+            d.update({self.obj_cols[j]: self.new.obj[r, oi[j]] for j in np.flatnonzero(om)})
+            out[row] = d
+        return out
+
+
+def diff(old, new):
+    return Delta(old, new)
+
+# ================================================================
+#                         RING BUFFER
+# ================================================================
+
+class SnapshotRing:
+    def __init__(self, capacity=120, key="symbol"):
+        self.key = key
+        self._snaps = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self._snaps)
+
+    @property
+    def latest(self):
+        return self._snaps[-1] if self._snaps else None
+
+    def append(self, frame, ts=None):
+        """Store a new snapshot and return its Delta against the previous one."""
+        snap = frame if isinstance(frame, Snapshot) else Snapshot(frame, ts, self.key)
+        delta = Delta(self.latest, snap)
+        self._snaps.append(snap)
+        return delta
+
+    def at(self, seconds_ago, now=None):
+        """Newest snapshot at least `seconds_ago` old (else the oldest kept)."""
+        if not self._snaps:
+            return None
+        cutoff = (now or time.time()) - seconds_ago
+        for snap in reversed(self._snaps):
+            if snap.ts <= cutoff:
+                return snap
+        return self._snaps[0]
+
+    def moved(self, seconds=60, column="lastPrice", now=None):
+        """
+        Symbols whose `column` changed between `seconds` ago and the latest
+        snapshot: frame of then / now / change / pct_change, biggest moves first.
+        """
+        cols = ["then", "now", "change", "pct_change"]
+        old, new = self.at(seconds, now), self.latest
+        if old is None or old is new or column not in new.num_cols or column not in old.num_cols:
+            return pd.DataFrame(columns=cols)
+        common, io, inew = np.intersect1d(old.symbols, new.symbols, assume_unique=True, return_indices=True)
+        a = old.num[io, old.num_cols.index(column)]
+        b = new.num[inew, new.num_cols.index(column)]
+        hit = (a != b) & ~(np.isnan(a) | np.isnan(b))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = (b - a) / np.abs(a) * 100
+        out = pd.DataFrame({"then": a[hit], "now": b[hit], "change": (b - a)[hit], "pct_change": pct[hit]},
+                           index=pd.Index(common[hit], name=self.key))
+        return out.reindex(out["pct_change"].abs().sort_values(ascending=False).index)
+
+    def changed_since(self, seconds=60, now=None):
+        """Set of symbols that changed in any refresh within the last `seconds`."""
+        cutoff = (now or time.time()) - seconds
+        snaps = list(self._snaps)
+        out = set()
+        for prev, snap in zip(snaps, snaps[1:]):
+            if snap.ts > cutoff:
+                d = Delta(prev, snap)
+                out.update(d.symbols)
+                out.update(d.added)
+        return out
+
+    @property
+    def nbytes(self):
+        return sum(s.nbytes for s in self._snaps)
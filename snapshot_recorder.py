@@ -0,0 +1,405 @@
+# snapshot_recorder.py — opt-in history of the live NSE snapshots
+#
+# With RECORD_SNAPSHOTS=1 every payload the index-live, pre-open and all-indices
+# pages fetch (Fetch clicks and the live poller) is appended to a columnar
+# store, one directory per feed and day:
+#   data/snapshots/<feed>/<key>/<YYYY-MM-DD>/part-<HHMMSS>-<n>.parquet
+# Parts are written once and never modified; each holds a batch of snapshots in
+# long form (one row per table row per snapshot). Inside a part:
+#   - symbols / table names / repeated strings are dictionary-encoded,
+#   - numeric columns are scaled to integer ticks and stored as deltas against
+#     the same symbol's previous snapshot (DELTA_BINARY_PACKED), so an
+#     unchanged price costs a few bits,
+#   - identical consecutive payloads are skipped,
+#   - the schema metadata keeps each table's column layouts and dtypes, and
+#     non-string object cells (dicts, lists, mixed numbers) go in as JSON, so
+#     decode() returns the frames exactly as recorded.
+#
+# replay() reads a day back and feeds each snapshot through the page renderers
+# (render_index_live_html, render_preopen_html, render_indices_html) — for
+# backtesting the pages or load-testing the app without touching NSE.
+#
+#   python snapshot_recorder.py index_live "NIFTY 50" 2025-11-14
+
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import datetime
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+RECORD_SNAPSHOTS = os.environ.get("RECORD_SNAPSHOTS", "0") == "1"
+RECORD_DIR = os.environ.get(
+    "RECORD_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "snapshots")
+)
+RECORD_FLUSH_SECONDS = float(os.environ.get("RECORD_FLUSH_SECONDS", 300))
+RECORD_FLUSH_SNAPSHOTS = int(os.environ.get("RECORD_FLUSH_SNAPSHOTS", 120))
+
+FEEDS = ("index_live", "preopen", "indices")
+SCALES = (1, 100, 10_000)          # fixed-point scales tried for numeric columns
+TS, TABLE, ROW, KEY, LAYOUT = "__ts", "__table", "__row", "__key", "__layout"
+
+# ================================================================
+#                         PAYLOAD <-> TABLES
+# ================================================================
+
+def _tables(feed, payload):
+    """The DataFrames of a feed payload, by table name."""
+    if feed == "preopen" and not isinstance(payload.get("data"), pd.DataFrame):
+        from nsepython import df_from_data
+        p = dict(payload)
+        return {"data": df_from_data(p.pop("data", [])), "rem": df_from_data([p])}
+    return {k: v for k, v in payload.items() if isinstance(v, pd.DataFrame)}
+
+
+def _payload(feed, tables):
+    """Inverse of _tables: what the feed's renderer expects."""
+    if feed == "preopen":
+        rem = tables.get("rem", pd.DataFrame())
+        p = rem.iloc[0].to_dict() if not rem.empty else {}
+        p["data"] = tables.get("data", pd.DataFrame()).to_dict(orient="records")
+        return p
+    return tables
+
+
+def _render(feed, key, payload):
+    if feed == "index_live":
+        from index_live_html import render_index_live_html
+        return render_index_live_html(payload, key)
+    if feed == "preopen":
+        from preopen_html import render_preopen_html
+        return render_preopen_html(payload, key or "NIFTY")
+    from indices_html import render_indices_html
+    return render_indices_html(payload)
+
+# ================================================================
+#                         ENCODING
+# ================================================================
+
+def _long(snapshots):
+    """
+    [(ts, {table: df})] -> one long frame with __ts/__table/__row/__key/__layout,
+    the distinct (table, column list) layouts __layout points into, and each
+    table's column dtypes (as first seen; "object" where snapshots disagree).
+    """
+    parts, layouts, dtypes = [], [], {}
+    for ts, tables in snapshots:
+        for name, df in tables.items():
+            df = df.reset_index(drop=True).rename(columns=str)
+            layout = [name, list(df.columns)]
+            if layout not in layouts:
+                layouts.append(layout)
+            types = dtypes.setdefault(name, {})
+            for c in df.columns:
+                t = str(df[c].dtype)
+                types[c] = t if types.get(c, t) == t else "object"
+            key_col = "symbol" if "symbol" in df.columns else "index" if "index" in df.columns else None
+            key = df[key_col].astype(str) if key_col else pd.Series(df.index.astype(str))
+            dup = key.groupby(key).cumcount()
+            key = key.where(dup == 0, key + "#" + dup.astype(str))
+            meta = pd.DataFrame({TS: int(ts * 1000), TABLE: name, ROW: np.arange(len(df)), KEY: key.to_numpy(),
+                                 LAYOUT: layouts.index(layout)})
+            parts.append(pd.concat([meta, df], axis=1))
+    return pd.concat(parts, ignore_index=True), layouts, dtypes
+
+
+def _json_default(x):
+    return x.item() if isinstance(x, np.generic) else str(x)
+
+
+def _is_null(x):
+    return x is None or x is pd.NA or x is pd.NaT or (isinstance(x, float) and np.isnan(x))
+
+
+def _scale(values):
+    """Smallest fixed-point scale that round-trips every finite value, or None."""
+    finite = values[np.isfinite(values)]
+    for s in SCALES:
+        scaled = finite * s
+        if np.all(np.abs(scaled) < 2 ** 53) and np.allclose(scaled, np.round(scaled), rtol=0, atol=1e-6):
+            return s
+    return None
+
+
+def _delta(ticks, starts):
+    """Per-group first differences (first row of a group kept absolute)."""
+    d = np.diff(ticks, prepend=0)
+    d[starts] = ticks[starts]
+    return d
+
+
+def _undelta(d, groups):
+    return pd.Series(d).groupby(groups).cumsum().to_numpy()
+
+
+def encode(snapshots):
+    """Arrow table for a batch of snapshots (see module header for the layout)."""
+    df, layouts, dtypes = _long(snapshots)
+    df = df.sort_values([TABLE, KEY, TS], kind="stable", ignore_index=True)
+    groups = (df[TABLE] + "\x1f" + df[KEY]).to_numpy()
+    starts = np.r_[True, groups[1:] != groups[:-1]]
+    gid = np.cumsum(starts)
+
+    arrays, scales, dict_cols, delta_cols = {}, {}, [], []
+    arrays[TS] = pa.array(_delta(df[TS].to_numpy(dtype="int64"), starts))
+    delta_cols.append(TS)
+    arrays[TABLE] = pa.array(df[TABLE]).dictionary_encode()
+    arrays[KEY] = pa.array(df[KEY]).dictionary_encode()
+    arrays[ROW] = pa.array(df[ROW].to_numpy(dtype="int32"))
+    arrays[LAYOUT] = pa.array(df[LAYOUT].to_numpy(dtype="int32"))
+    dict_cols += [TABLE, KEY]
+
+    json_cols = []
+    for c in df.columns[5:]:
+        s = df[c]
+        if pd.api.types.is_bool_dtype(s.dtype):
+            arrays[c] = pa.array(s)
+            continue
+        if pd.api.types.is_numeric_dtype(s.dtype):
+            v = s.to_numpy(dtype="float64")
+            scale = _scale(v)
+            if scale is not None:
+                null = ~np.isfinite(v)
+                # carry the last known value over gaps so deltas stay small
+                ff = pd.Series(np.where(null, np.nan, v)).groupby(gid).ffill().fillna(0).to_numpy()
+                ticks = np.round(ff * scale).astype("int64")
+                arrays[c] = pa.array(_delta(ticks, starts), mask=null)
+                scales[c] = scale
+                delta_cols.append(c)
+            else:
+                arrays[c] = pa.array(v)
+            continue
+        # plain strings are stored as-is; anything else (dict/list cells, numbers
+        # mixed with text) as JSON so decode() gets the original values back
+        cells = s.to_numpy(dtype=object)
+        if all(isinstance(x, str) or _is_null(x) for x in cells):
+            text = [None if _is_null(x) else x for x in cells]
+        else:
+            text = [None if _is_null(x) else json.dumps(x, default=_json_default) for x in cells]
+            json_cols.append(c)
+        arrays[c] = pa.array(text, type=pa.string()).dictionary_encode()
+        dict_cols.append(c)
+
+    meta = {"scales": scales, "layouts": layouts, "dtypes": dtypes, "json": json_cols, "version": 2}
+    table = pa.table(arrays).replace_schema_metadata({"snapshot": json.dumps(meta)})
+    return table, dict_cols, delta_cols
+
+
+def decode(table):
+    """Arrow table -> [(ts_seconds, {table: df})] in time order."""
+    meta = json.loads(table.schema.metadata[b"snapshot"])
+    df = table.to_pandas()
+    groups = (df[TABLE].astype(str) + "\x1f" + df[KEY].astype(str)).to_numpy()
+    gid = np.cumsum(np.r_[True, groups[1:] != groups[:-1]])
+    df[TS] = _undelta(df[TS].to_numpy(dtype="int64"), gid)
+    for c, scale in meta["scales"].items():
+        null = df[c].isna().to_numpy()
+        v = _undelta(df[c].fillna(0).to_numpy(dtype="int64"), gid) / scale
+        v[null] = np.nan
+        df[c] = v
+    if meta.get("version", 1) < 2:
+        return _decode_v1(df, meta)
+    for c in meta["json"]:
+        df[c] = df[c].astype(object).map(lambda x: json.loads(x) if isinstance(x, str) else None)
+
+    order = list(dict.fromkeys(name for name, _ in meta["layouts"]))
+    out = []
+    for ts, snap in df.groupby(TS, sort=True):
+        tables = {}
+        for layout, rows in snap.groupby(LAYOUT, sort=True):
+            name, cols = meta["layouts"][layout]
+            frame = rows.sort_values(ROW)[cols].reset_index(drop=True)
+            types = meta["dtypes"][name]
+            for c in frame.columns:
+                frame[c] = _restore(frame[c], types.get(c, "object"))
+            tables[name] = frame
+        out.append((ts / 1000, {name: tables[name] for name in order if name in tables}))
+    return out
+
+
+def _restore(col, dtype):
+    """A decoded column back in its recorded dtype (ints/bools with gaps stay float/object)."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        col = col.astype(object)
+    if dtype.startswith(("int", "uint", "bool")):
+        return col.astype(dtype) if col.notna().all() else col
+    if dtype.startswith("float"):
+        return col.astype(dtype)
+    if dtype.startswith("datetime64"):
+        return pd.to_datetime(col)
+    if dtype in ("str", "string"):
+        return col.astype(dtype)
+    return col.astype(object).where(col.notna(), None)
+
+
+def _decode_v1(df, meta):
+    """Parts written before per-snapshot layouts and dtypes were recorded."""
+    ints = {c for c, scale in meta["scales"].items() if scale == 1}
+    out = []
+    for ts, snap in df.groupby(TS, sort=True):
+        tables = {}
+        for name, rows in snap.groupby(TABLE, sort=False, observed=True):
+            rows = rows.sort_values(ROW)
+            frame = rows[meta["columns"][name]].dropna(axis=1, how="all").reset_index(drop=True)
+            for c in frame.columns:
+                if isinstance(frame[c].dtype, pd.CategoricalDtype):
+                    frame[c] = frame[c].astype(object)
+                elif c in ints and frame[c].notna().all():
+                    frame[c] = frame[c].astype("int64")
+            tables[str(name)] = frame
+        out.append((ts / 1000, tables))
+    return out
+
+# ================================================================
+#                         RECORDER
+# ================================================================
+
+def _safe(key):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", key or "all")
+
+
+def partition_dir(feed, key, day):
+    return os.path.join(RECORD_DIR, feed, _safe(key), str(day))
+
+
+class Recorder:
+    def __init__(self, enabled=RECORD_SNAPSHOTS):
+        self.enabled = enabled
+        self._buf = {}           # (feed, key) -> [(ts, tables)]
+        self._last = {}          # (feed, key) -> fingerprint of the last recorded payload
+        self._first = {}         # (feed, key) -> time of the oldest buffered snapshot
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.stats = {"recorded": 0, "skipped": 0, "parts": 0, "bytes": 0, "errors": 0}
+
+    def record(self, feed, key, payload, ts=None):
+        """Buffer one snapshot (no-op unless enabled); flushes the feed when its batch is due."""
+        if not self.enabled or not payload:
+            return
+        from render_cache import fingerprint
+        tables = _tables(feed, payload)
+        fp = fingerprint(tables)
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            if self._last.get((feed, key)) == fp:
+                self.stats["skipped"] += 1
+                return
+            self._last[(feed, key)] = fp
+            buf = self._buf.setdefault((feed, key), [])
+            buf.append((ts, tables))
+            self._first.setdefault((feed, key), ts)
+            self.stats["recorded"] += 1
+            due = len(buf) >= RECORD_FLUSH_SNAPSHOTS or ts - self._first[(feed, key)] >= RECORD_FLUSH_SECONDS
+        if due:
+            try:
+                self.flush(feed, key)
+            except Exception as e:      # recording must never break the page being served
+                self.stats["errors"] += 1
+                self.stats["last_error"] = f"{type(e).__name__}: {e}"
+
+    def flush(self, feed=None, key=None):
+        with self._lock:
+            todo = [k for k in self._buf if feed is None or k == (feed, key)]
+            batches = [(k, self._buf.pop(k)) for k in todo]
+            for k in todo:
+                self._first.pop(k, None)
+        for (f, k), snaps in batches:
+            by_day = {}
+            for ts, tables in snaps:
+                by_day.setdefault(datetime.date.fromtimestamp(ts), []).append((ts, tables))
+            for day, day_snaps in by_day.items():
+                self._write(f, k, day, day_snaps)
+
+    def _write(self, feed, key, day, snaps):
+        table, dict_cols, delta_cols = encode(snaps)
+        d = partition_dir(feed, key, day)
+        os.makedirs(d, exist_ok=True)
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        stamp = datetime.datetime.fromtimestamp(snaps[0][0]).strftime("%H%M%S")
+        path = os.path.join(d, f"part-{stamp}-{os.getpid()}-{seq}.parquet")
+        tmp = path + ".tmp"
+        pq.write_table(table, tmp, compression="zstd", use_dictionary=dict_cols,
+                       column_encoding={c: "DELTA_BINARY_PACKED" for c in delta_cols})
+        os.replace(tmp, path)
+        self.stats["parts"] += 1
+        self.stats["bytes"] += os.path.getsize(path)
+
+    def info(self):
+        with self._lock:
+            return {**self.stats, "enabled": self.enabled,
+                    "buffered": sum(len(b) for b in self._buf.values())}
+
+
+recorder = Recorder()
+atexit.register(recorder.flush)
+
+def record(feed, key, payload):
+    recorder.record(feed, key, payload)
+
+def recorder_stats(): return recorder.info()
+
+# ================================================================
+#                         REPLAY
+# ================================================================
+
+def days(feed, key):
+    """Recorded days of a feed, oldest first."""
+    base = os.path.join(RECORD_DIR, feed, _safe(key))
+    return sorted(os.listdir(base)) if os.path.isdir(base) else []
+
+
+def snapshots(feed, key, day=None, start=None, end=None):
+    """
+    Recorded (ts, payload) pairs of one day (default: the latest), oldest first.
+    start / end: optional "HH:MM[:SS]" bounds. Payloads have the shape the feed's
+    renderer takes, as if freshly fetched.
+    """
+    day = str(day or (days(feed, key) or [""])[-1])
+    d = partition_dir(feed, key, day)
+    if not day or not os.path.isdir(d):
+        return
+    lo = datetime.datetime.fromisoformat(f"{day}T{start}").timestamp() if start else -np.inf
+    hi = datetime.datetime.fromisoformat(f"{day}T{end}").timestamp() if end else np.inf
+    decoded = []
+    for name in sorted(os.listdir(d)):
+        if name.endswith(".parquet"):
+            decoded += decode(pq.read_table(os.path.join(d, name)))
+    for ts, tables in sorted(decoded, key=lambda x: x[0]):
+        if lo <= ts <= hi:
+            yield ts, _payload(feed, tables)
+
+
+def replay(feed, key, day=None, start=None, end=None, speed=None):
+    """
+    Feed a recorded day back through the page renderer: yields (ts, html).
+    speed=None renders as fast as possible; speed=1 keeps the recorded pacing,
+    speed=10 plays it ten times faster.
+    """
+    prev = None
+    for ts, payload in snapshots(feed, key, day, start, end):
+        if speed and prev is not None:
+            time.sleep(max(ts - prev, 0) / speed)
+        prev = ts
+        yield ts, _render(feed, key, payload)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: python snapshot_recorder.py <index_live|preopen|indices> <key> [YYYY-MM-DD]")
+        sys.exit(1)
+    t0, n = time.perf_counter(), 0
+    for ts, page in replay(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None):
+        n += 1
+        print(f"{datetime.datetime.fromtimestamp(ts):%H:%M:%S}  {len(page):>8} bytes")
+    dt = time.perf_counter() - t0
+    print(f"{n} snapshots rendered in {dt:.2f}s ({n / dt if dt else 0:.1f}/s)")
@@ -0,0 +1,107 @@
+// charts.js — run the Plotly.newPlot script of chart fragments inserted into
+// the page (gr.HTML sets innerHTML, which never executes <script> tags), and
+// for charts inside a .chart-box, fetch a full-resolution window on zoom
+// through the app's chart_slice API (chart_builder.chart_slice). A .chart-box
+// with data-live polls chart_tail every data-live seconds and splices the
+// newest bars onto the end of each trace instead of re-rendering the chart.
+(function () {
+  if (window.__charts) return;
+  window.__charts = true;
+
+  function callApi(prefix, name, data) {
+    // Gradio HTTP API: POST queues the call, GET streams the result as SSE lines
+    return fetch(prefix + "/call/" + name, {
+      method: "POST",
+      headers: {"Content-Type": "application/json"},
+      body: JSON.stringify({data: data})
+    })
+      .then(function (r) { return r.json(); })
+      .then(function (j) { return fetch(prefix + "/call/" + name + "/" + j.event_id); })
+      .then(function (r) { return r.text(); })
+      .then(function (text) {
+        var lines = text.split("\n").filter(function (l) { return l.indexOf("data:") === 0; });
+        return JSON.parse(lines[lines.length - 1].slice(5))[0];
+      });
+  }
+
+  function attachZoom(box, div) {
+    var seq = 0;
+    div.on("plotly_relayout", function (ev) {
+      var start = ev["xaxis.range[0]"], end = ev["xaxis.range[1]"];
+      if (start === undefined && !ev["xaxis.autorange"]) return;
+      var mine = ++seq;
+      callApi(box.dataset.api, "chart_slice", [box.dataset.slice, start || "", end || "", div.clientWidth])
+        .then(function (payload) {
+          if (!payload || mine !== seq) return;
+          var traces = JSON.parse(payload).data;
+          traces.forEach(function (t, i) {
+            if (div.data[i]) t.visible = div.data[i].visible;   // keep legend toggles
+          });
+          Plotly.react(div, traces, div.layout);
+        })
+        .catch(function () {});
+    });
+  }
+
+  var TYPED = {f8: Float64Array, f4: Float32Array, i4: Int32Array, u4: Uint32Array,
+               i2: Int16Array, u2: Uint16Array, i1: Int8Array, u1: Uint8Array};
+
+  function plain(v) {
+    // trace arrays may arrive as Plotly's base64 typed-array specs ({dtype, bdata})
+    if (v && v.bdata !== undefined) {
+      var bin = atob(v.bdata), bytes = new Uint8Array(bin.length);
+      for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+      return Array.from(new TYPED[v.dtype](bytes.buffer));
+    }
+    return v ? Array.from(v) : [];
+  }
+
+  function splice(trace, add, since) {
+    // drop the points from `since` on (the last one may have been a forming bar), append the new ones
+    var xs = plain(trace.x), keep = xs.length;
+    while (keep > 0 && xs[keep - 1] >= since) keep--;
+    var out = Object.assign({}, trace, {x: xs.slice(0, keep).concat(add.x)});
+    ["y", "open", "high", "low", "close"].forEach(function (k) {
+      if (add[k]) out[k] = plain(trace[k]).slice(0, keep).concat(add[k]);
+    });
+    return out;
+  }
+
+  function attachLive(box, div) {
+    var timer = setInterval(function () {
+      if (!document.contains(div)) { clearInterval(timer); return; }
+      var xs = div.data[0] ? plain(div.data[0].x) : [];
+      if (!xs.length) return;
+      var since = xs[xs.length - 1];
+      callApi(box.dataset.api, "chart_tail", [box.dataset.slice, since])
+        .then(function (payload) {
+          if (!payload) return;
+          var tail = JSON.parse(payload).data;
+          var traces = div.data.map(function (t, i) {
+            return tail[i] && tail[i].x ? splice(t, tail[i], since) : t;
+          });
+          Plotly.react(div, traces, div.layout);
+        })
+        .catch(function () {});
+    }, parseFloat(box.dataset.live) * 1000);
+  }
+
+  function run() {
+    if (!window.Plotly) return;
+    document.querySelectorAll(".plotly-graph-div").forEach(function (div) {
+      var wrap = div.parentElement;
+      if (!wrap || wrap.dataset.plotted) return;
+      wrap.dataset.plotted = "1";
+      wrap.querySelectorAll("script").forEach(function (s) {
+        if (!s.src && s.type !== "application/json") new Function(s.textContent)();
+      });
+      var box = div.closest(".chart-box");
+      if (box && div.on) attachZoom(box, div);
+      if (box && box.dataset.live) attachLive(box, div);
+    });
+  }
+
+  new MutationObserver(run).observe(document.documentElement, {childList: true, subtree: true});
+  if (document.readyState !== "loading") run();
+  else document.addEventListener("DOMContentLoaded", run);
+})();
@@ -0,0 +1,51 @@
+// live.js — apply live_stream deltas: patch changed cells of the tables on the
+// page in place (rows tagged <tr data-key=symbol>, columns matched by header).
+(function () {
+  if (window.__live) return;
+  window.__live = true;
+  var applied = {};
+
+  function fmt(v) {
+    if (v === null || v === undefined) return "";
+    return typeof v === "number" ? v.toFixed(2) : String(v);
+  }
+
+  function patch(delta) {
+    document.querySelectorAll("table").forEach(function (table) {
+      var heads = Array.prototype.map.call(table.querySelectorAll("thead th"),
+                                           function (th) { return th.textContent; });
+      table.querySelectorAll("tbody tr[data-key]").forEach(function (tr) {
+        var cells = delta.cells[tr.dataset.key];
+        if (!cells) return;
+        Object.keys(cells).forEach(function (col) {
+          var i = heads.indexOf(col);
+          if (i < 0 || !tr.cells[i]) return;
+          var td = tr.cells[i], v = cells[col];
+          td.textContent = fmt(v);
+          if (typeof v === "number") {
+            td.classList.toggle("numeric-positive", v > 0);
+            td.classList.toggle("numeric-negative", v < 0);
+          }
+          td.classList.remove("live-flash");
+          void td.offsetWidth;           // restart the flash animation
+          td.classList.add("live-flash");
+        });
+      });
+    });
+  }
+
+  function scan() {
+    document.querySelectorAll("script.live-delta").forEach(function (s) {
+      if (s.dataset.done) return;
+      s.dataset.done = "1";
+      var d = JSON.parse(s.textContent);
+      if ((applied[d.feed] || 0) >= d.version) return;
+      applied[d.feed] = d.version;
+      patch(d);
+    });
+  }
+
+  new MutationObserver(scan).observe(document.documentElement, {childList: true, subtree: true});
+  if (document.readyState !== "loading") scan();
+  else document.addEventListener("DOMContentLoaded", scan);
+})();
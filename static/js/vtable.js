@@ -0,0 +1,49 @@
+// vtable.js — client side of common.table_html: renders only the visible rows
+(function () {
+  if (window.__vtable) return;
+  window.__vtable = true;
+  function hydrate(box) {
+    if (box.dataset.ready) return;
+    var src = box.querySelector("script.vtable-data");
+    var tbody = box.querySelector("tbody");
+    if (!src || !tbody) return;
+    box.dataset.ready = "1";
+    var rows = JSON.parse(src.textContent).rows, raw = src.dataset.raw === "1";
+    var h = (tbody.rows[0] && tbody.rows[0].getBoundingClientRect().height) || 24;
+    var note = box.querySelector(".vtable-note");
+    if (note) note.remove();
+    var top = document.createElement("tr"), bot = document.createElement("tr");
+    function draw() {
+      var n = Math.ceil((box.clientHeight || 480) / h) + 20;
+      var start = Math.max(0, Math.floor(box.scrollTop / h) - 10);
+      var end = Math.min(rows.length, start + n);
+      var frag = document.createDocumentFragment();
+      top.style.height = start * h + "px";
+      frag.appendChild(top);
+      for (var i = start; i < end; i++) {
+        var tr = document.createElement("tr");
+        for (var j = 0; j < rows[i].length; j++) {
+          var td = document.createElement("td"), v = rows[i][j];
+          v = v === null ? "" : String(v);
+          if (raw) td.innerHTML = v; else td.textContent = v;
+          tr.appendChild(td);
+        }
+        frag.appendChild(tr);
+      }
+      bot.style.height = (rows.length - end) * h + "px";
+      frag.appendChild(bot);
+      tbody.replaceChildren(frag);
+    }
+    var queued = false;
+    box.addEventListener("scroll", function () {
+      if (queued) return;
+      queued = true;
+      requestAnimationFrame(function () { queued = false; draw(); });
+    });
+    draw();
+  }
+  function scan() { document.querySelectorAll(".vtable").forEach(hydrate); }
+  new MutationObserver(scan).observe(document.documentElement, {childList: true, subtree: true});
+  if (document.readyState !== "loading") scan();
+  else document.addEventListener("DOMContentLoaded", scan);
+})();
@@ -2,38 +2,200 @@
 
 import yfinance as yf
 import pandas as pd
+import ohlcv_store
+import os
 import traceback
+import threading
+import time
+from collections import OrderedDict
+
+# ================================================================
+#              TICKER REGISTRY (shared yf.Ticker per symbol)
+# ================================================================
+
+# seconds each dataset stays fresh: statements change quarterly, info intraday
+DATASET_TTL = {
+    "info": 300,
+    "quarterly_financials": 24 * 3600,
+    "financials": 24 * 3600,
+    "balance_sheet": 24 * 3600,
+    "cashflow": 24 * 3600,
+    "earnings": 24 * 3600,
+    "dividends": 6 * 3600,
+    "splits": 6 * 3600,
+}
+
+def _is_empty(value):
+    if value is None:
+        return True
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.empty
+    return isinstance(value, (dict, list, tuple)) and not value
+
+class TickerRegistry:
+    """
+    Bounded LRU of yf.Ticker objects keyed by symbol, so every tab for one
+    company shares one cookie/crumb session, plus a per-dataset TTL cache of
+    what was read off each Ticker. Evicting a Ticker drops its datasets too.
+    """
+    def __init__(self, max_tickers=128):
+        self.max_tickers = max_tickers
+        self._lock = threading.Lock()
+        self._tickers = OrderedDict()     # symbol -> yf.Ticker
+        self._data = {}                   # symbol -> {dataset: (expires_at, value)}
+        self.stats = {"ticker_hits": 0, "ticker_misses": 0, "data_hits": 0,
+                      "data_misses": 0, "evictions": 0}
+
+    def ticker(self, symbol):
+        symbol = symbol.strip().upper()
+        with self._lock:
+            t = self._tickers.get(symbol)
+            if t is not None:
+                self._tickers.move_to_end(symbol)
+                self.stats["ticker_hits"] += 1
+                return t
+            self.stats["ticker_misses"] += 1
+            t = self._tickers[symbol] = yf.Ticker(symbol + ".NS")
+            while len(self._tickers) > self.max_tickers:
+                old, _ = self._tickers.popitem(last=False)
+                self._data.pop(old, None)
+                self.stats["evictions"] += 1
+            return t
+
+    def get(self, symbol, dataset):
+        """Attribute `dataset` of the symbol's Ticker, cached for DATASET_TTL[dataset] seconds."""
+        symbol = symbol.strip().upper()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(symbol, {}).get(dataset)
+            if entry is not None and entry[0] > now:
+                self.stats["data_hits"] += 1
+                return entry[1]
+            self.stats["data_misses"] += 1
+
+        value = getattr(self.ticker(symbol), dataset)
+        if _is_empty(value):
+            # throttled / failed calls come back empty: don't pin that for the dataset's TTL
+            return value
+        with self._lock:
+            if symbol in self._tickers:
+                self._data.setdefault(symbol, {})[dataset] = (now + DATASET_TTL.get(dataset, 300), value)
+        return value
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._tickers.clear()
+                self._data.clear()
+            else:
+                self._tickers.pop(symbol.upper(), None)
+                self._data.pop(symbol.upper(), None)
+
+    def info(self):
+        with self._lock:
+            return {**self.stats, "tickers": len(self._tickers),
+                    "datasets": sum(len(d) for d in self._data.values())}
+
+tickers = TickerRegistry()
+
+def ticker_cache_stats(): return tickers.info()
 
 # ================================================================
 #                    BASIC YFINANCE FETCHERS
 # ================================================================
 
 def yfinfo(symbol):
-    return yf.Ticker(symbol + ".NS").info
+    return tickers.get(symbol, "info")
 
 def qresult(symbol):
-    return yf.Ticker(symbol + ".NS").quarterly_financials
+    return tickers.get(symbol, "quarterly_financials")
 
 def result(symbol):
-    return yf.Ticker(symbol + ".NS").financials
+    return tickers.get(symbol, "financials")
 
 def balance(symbol):
-    return yf.Ticker(symbol + ".NS").balance_sheet
+    return tickers.get(symbol, "balance_sheet")
 
 def cashflow(symbol):
-    return yf.Ticker(symbol + ".NS").cashflow
+    return tickers.get(symbol, "cashflow")
 
 def dividend(symbol):
-    return yf.Ticker(symbol + ".NS").dividends.to_frame("Dividend")
+    return tickers.get(symbol, "dividends").to_frame("Dividend")
 
 def split(symbol):
-    return yf.Ticker(symbol + ".NS").splits.to_frame("Split")
+    return tickers.get(symbol, "splits").to_frame("Split")
 
 def intraday(symbol):
     return yf.download(symbol + ".NS", period="1d", interval="5m").round(2)
 
-def daily(symbol):
-    return yf.download(symbol + ".NS", period="1y", interval="1d").round(2)
+def daily(symbol, source="yfinance"):
+    # local store: only the bars after the last stored date go over the network
+    return ohlcv_store.daily(symbol, period="1y", source=source).round(2)
+
+
+# ================================================================
+#              BULK (MULTI-TICKER) DOWNLOADS
+# ================================================================
+
+def download_many(symbols, period="1y", interval="1d", chunk_size=100, start=None):
+    """
+    {symbol: OHLCV frame} from one threaded multi-ticker yf.download per chunk
+    of `chunk_size` symbols (from `start` when given, else the last `period`).
+    Each frame is the symbol's column block of the wide result, with the
+    leading rows before its first bar trimmed.
+    """
+    syms = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    span = {"start": pd.Timestamp(start).strftime("%Y-%m-%d")} if start is not None else {"period": period}
+    out = {}
+    for i in range(0, len(syms), chunk_size):
+        chunk = syms[i:i + chunk_size]
+        wide = yf.download([s + ".NS" for s in chunk], interval=interval,
+                           group_by="ticker", threads=True, progress=False, **span)
+        if wide is None or wide.empty:
+            continue
+        top = set(wide.columns.get_level_values(0)) if isinstance(wide.columns, pd.MultiIndex) else None
+        for sym in chunk:
+            t = sym + ".NS"
+            if top is None:
+                # single-level columns: only unambiguous for a one-symbol chunk
+                if len(chunk) != 1:
+                    break
+                df = wide
+            elif t in top:
+                df = wide[t]
+            else:
+                continue
+            first = df["Close"].first_valid_index()
+            if first is not None:
+                out[sym] = df.loc[first:]
+    return out
+
+def daily_many(symbols, period="1y", interval="1d", chunk_size=100):
+    """
+    {symbol: daily OHLCV frame} read from ohlcv_store after syncing the stale
+    symbols chunk by chunk, so repeat screens hit disk instead of yfinance.
+    Non-daily intervals are not stored and go straight to download_many.
+    """
+    if interval != "1d":
+        return download_many(symbols, period=period, interval=interval, chunk_size=chunk_size)
+    syms = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    ohlcv_store.sync_many(syms, chunk_size=chunk_size)
+    start = ohlcv_store.period_start(period)
+    out = {}
+    for sym in syms:
+        df = ohlcv_store.read(sym, start=start)
+        if not df.empty:
+            out[sym] = df
+    return out
+
+def intraday_many(symbols, period="1d", interval="5m", chunk_size=100):
+    return download_many(symbols, period=period, interval=interval, chunk_size=chunk_size)
+
+def daily_panel(symbols, period="1y", chunk_size=100):
+    """(symbols, {open,high,low,close,volume} symbols x dates arrays) — a screener/pattern-scan loader."""
+    from pattern_scan import panel_from_frames
+    syms, _, arrays = panel_from_frames(daily_many(symbols, period=period, chunk_size=chunk_size))
+    return syms, arrays
 
 
 # ================================================================
@@ -52,8 +214,84 @@ from common import (
     wrap_html
 )
 
-from chart_builder import build_chart
+from chart_builder import build_chart, chart_slice, chart_tail
 from ta_indi_pat import talib_df
+from ta_stream import StreamingIndicators
+
+
+# ================================================================
+#              STREAMING INTRADAY STATE (per symbol)
+# ================================================================
+
+INTRADAY_BAR_SECONDS = 5 * 60       # no new 5m candle can exist sooner than this
+MAX_INTRADAY_STREAMS = int(os.environ.get("MAX_INTRADAY_STREAMS", 64))
+INTRADAY_STREAM_IDLE = 30 * 60      # drop a symbol's state after this long unused
+
+_intraday_streams = OrderedDict()   # symbol -> StreamingIndicators, least recently used first
+_stream_synced = {}                 # symbol -> monotonic time of the last download
+_stream_used = {}                   # symbol -> monotonic time of the last access
+_stream_lock = threading.Lock()
+
+def _flatten(df):
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    return df
+
+def _evict_streams(now):
+    """Bound the per-symbol state: LRU beyond MAX_INTRADAY_STREAMS, or idle past INTRADAY_STREAM_IDLE."""
+    while _intraday_streams:
+        old = next(iter(_intraday_streams))
+        if len(_intraday_streams) <= MAX_INTRADAY_STREAMS and now - _stream_used[old] < INTRADAY_STREAM_IDLE:
+            break
+        del _intraday_streams[old]
+        _stream_synced.pop(old, None)
+        _stream_used.pop(old, None)
+
+def intraday_stream(symbol):
+    """
+    Streaming indicator state for today's 5m bars. The first call of a session
+    downloads the day and warms the state up; later calls only download from
+    the last stored bar on and apply the new/revised candles, at most once per
+    INTRADAY_BAR_SECONDS.
+    """
+    symbol = symbol.strip().upper()
+    with _stream_lock:
+        st = _intraday_streams.get(symbol)
+        now = pd.Timestamp.now(tz=st.last_ts.tz) if st is not None and st.last_ts is not None else None
+        if st is None or st.last_ts is None or now.date() != st.last_ts.date():
+            st = StreamingIndicators()
+            bars = intraday(symbol)
+            if bars is None or bars.empty:
+                # bad symbol / failed download: don't keep the empty state
+                _intraday_streams.pop(symbol, None)
+                return st
+            st.warmup(_flatten(bars))
+            _intraday_streams[symbol] = st
+        elif time.monotonic() - _stream_synced.get(symbol, 0) >= INTRADAY_BAR_SECONDS:
+            new = yf.download(symbol + ".NS", start=st.last_ts, interval="5m", progress=False).round(2)
+            st.extend(_flatten(new))
+        else:
+            _intraday_streams.move_to_end(symbol)
+            _stream_used[symbol] = time.monotonic()
+            return st
+        _intraday_streams.move_to_end(symbol)
+        _stream_synced[symbol] = _stream_used[symbol] = time.monotonic()
+        _evict_streams(_stream_used[symbol])
+        return st
+
+def intraday_latest(symbol, since=None):
+    """
+    The bars (with indicator values) from `since` on — what a live chart
+    splices onto its end. `since` is the chart's last candle, which is
+    included because it may still have been forming when it was drawn.
+    """
+    df = intraday_stream(symbol).frame()
+    return df if since is None else df[df.index >= pd.Timestamp(since)]
+
+def intraday_tail(symbol, since):
+    """intraday_latest as chart_builder.chart_tail JSON, for static/js/charts.js."""
+    df = intraday_latest(symbol, since)
+    return chart_tail(df, _intraday_indicators(df)) if not df.empty else ""
 
 
 # -------------------------- INFO ------------------------------
@@ -122,16 +360,31 @@ def fetch_info(symbol):
 
 # -------------------------- INTRADAY ------------------------------
 
+def _intraday_indicators(df):
+    return {"EMA20": df["EMA20"], "RSI": df["RSI14"], "MACD": df["MACD12_26_9_macd"]}
+
+def intraday_slice(symbol, start=None, end=None, width=None):
+    """
+    Chart traces (JSON) for a zoomed window of the intraday chart, see
+    chart_builder.chart_slice. Zooming reads the state the page was built
+    from; only a symbol with no state yet is downloaded.
+    """
+    st = _intraday_streams.get(symbol.strip().upper())
+    df = (st if st is not None else intraday_stream(symbol)).frame()
+    return chart_slice(df, _intraday_indicators(df), start, end, width)
+
 def fetch_intraday(symbol, indicators=None):
     try:
-        df = intraday(symbol)
+        df = intraday_stream(symbol).frame()
         if df.empty:
             return wrap_html(f"<h1>No intraday data for {symbol}</h1>")
 
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
+        if indicators is None:
+            indicators = _intraday_indicators(df)
 
-        chart_html = build_chart(df, indicators=indicators, volume=True)
+        chart_html = build_chart(df, indicators=indicators, volume=True,
+                                 slice_key=f"intraday:{symbol.strip().upper()}",
+                                 live_seconds=INTRADAY_BAR_SECONDS)
         table_html = make_table(df.tail(50))
 
         return wrap_html(f"{chart_html}<h2>Last 50 Rows</h2>{table_html}",
@@ -145,10 +398,10 @@ def fetch_intraday(symbol, indicators=None):
 
 def fetch_daily(symbol, source="yfinance", max_rows=200):
     try:
-        df = daily(symbol)
-        df_disp = df.head(max_rows)
+        df = daily(symbol, source)
 
-        combined_df = talib_df(df_disp)
+        # indicators need the full history for their look-back; display is trimmed after
+        combined_df = talib_df(df).head(max_rows)
         table_html = combined_df.to_html(
             classes="table table-striped table-bordered",
             index=False
@@ -302,8 +555,7 @@ def fetch_split(symbol):
 
 def fetch_other(symbol):
     try:
-        ticker = yf.Ticker(symbol + ".NS")
-        df = ticker.earnings
+        df = tickers.get(symbol, "earnings")
 
         if df.empty:
             return wrap_html(f"<h1>No earnings data for {symbol}</h1>")
@@ -1,65 +1,159 @@
+import re
+import functools
+from collections import namedtuple
+
 import pandas as pd
 import talib
 import numpy as np
+from talib import abstract
+
+# ================================================================
+#                    DECLARATIVE INDICATOR ENGINE
+# ================================================================
+#
+# Callers ask for a named set, e.g. ["RSI(14)", "MACD(12,26,9)", "BBANDS(20)"].
+# Each spec is resolved once against TA-Lib's function metadata, so every
+# function gets the OHLCV inputs it actually needs (ATR -> high/low/close,
+# OBV -> close/volume, ...) and its parameters by name. All outputs are
+# written into one preallocated float array and wrapped in a single DataFrame.
+#
+# Column labels: name + args, e.g. RSI14, SMA200, MACD12_26_9_macdsignal,
+# BBANDS20_upperband. A spec without arguments uses TA-Lib's defaults: RSI, OBV.
+
+DEFAULT_INDICATORS = [
+    "SMA(20)", "SMA(50)", "SMA(200)", "EMA(20)", "EMA(50)",
+    "RSI(14)", "MACD(12,26,9)", "BBANDS(20)", "STOCH", "ADX(14)",
+    "ATR(14)", "CCI(20)", "WILLR(14)", "MFI(14)", "OBV",
+]
+
+PATTERNS = talib.get_function_groups()["Pattern Recognition"]
+
+IndicatorSpec = namedtuple("IndicatorSpec", "label name inputs params columns")
+
+_SPEC_RE = re.compile(r"^\s*([A-Za-z0-9_]+)\s*(?:\((.*)\))?\s*$")
+
+
+def _literal(text):
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+@functools.lru_cache(maxsize=None)
+def parse_indicator(spec):
+    """'MACD(12,26,9)' / 'BBANDS(timeperiod=20, nbdevup=2)' -> IndicatorSpec."""
+    m = _SPEC_RE.match(spec)
+    if not m:
+        raise ValueError(f"Bad indicator spec: {spec!r}")
+    name, argtext = m.group(1).upper(), (m.group(2) or "").strip()
+    try:
+        info = abstract.Function(name).info
+    except Exception:
+        raise ValueError(f"Unknown TA-Lib function: {name}")
+
+    inputs = []
+    for v in info["input_names"].values():
+        inputs.extend(v if isinstance(v, list) else [v])
+    if any(i not in ("open", "high", "low", "close", "volume") for i in inputs):
+        raise ValueError(f"{name} needs non-OHLCV inputs {inputs}")
+
+    param_names = list(info["parameters"])
+    params, positional = {}, []
+    for part in filter(None, (p.strip() for p in argtext.split(","))):
+        if "=" in part:
+            k, v = part.split("=", 1)
+            if k.strip() not in param_names:
+                raise ValueError(f"{name} has no parameter {k.strip()!r}")
+            params[k.strip()] = _literal(v)
+        else:
+            positional.append(_literal(part))
+    if len(positional) > len(param_names):
+        raise ValueError(f"{name} takes at most {len(param_names)} parameters")
+    params.update(zip(param_names, positional))
+
+    label = name + "_".join(str(params[k]) for k in param_names if k in params)
+    outputs = info["output_names"]
+    columns = [label] if len(outputs) == 1 else [f"{label}_{o}" for o in outputs]
+    return IndicatorSpec(label, name, tuple(inputs), tuple(params.items()), tuple(columns))
 
-def talib_df(df):
+
+def ohlcv_arrays(df):
+    """Contiguous float64 open/high/low/close/volume arrays from any OHLCV frame
+    (case-insensitive, yfinance MultiIndex columns flattened)."""
+    cols = df.columns.get_level_values(0) if isinstance(df.columns, pd.MultiIndex) else df.columns
+    lookup = {str(c).lower(): i for i, c in enumerate(cols)}
+    out = {}
+    for k in ("open", "high", "low", "close", "volume"):
+        if k in lookup:
+            out[k] = np.ascontiguousarray(df.iloc[:, lookup[k]].to_numpy(dtype="float64"))
+    return out
+
+
+def run_indicator(spec, arrays):
+    """Call the TA-Lib function for one IndicatorSpec on a dict of OHLCV arrays."""
+    missing = [i for i in spec.inputs if i not in arrays]
+    if missing:
+        raise ValueError(f"{spec.label}: missing column(s) {missing}")
+    return getattr(talib, spec.name)(*(arrays[i] for i in spec.inputs), **dict(spec.params))
+
+
+def compute_indicators(df, indicators=DEFAULT_INDICATORS, arrays=None):
+    """Compute the requested indicator set into one preallocated array -> DataFrame."""
+    specs = [parse_indicator(s) for s in indicators]
+    arrays = arrays if arrays is not None else ohlcv_arrays(df)
+    n = len(df)
+    columns = [c for s in specs for c in s.columns]
+    out = np.full((n, len(columns)), np.nan)
+
+    j = 0
+    for s in specs:
+        res = run_indicator(s, arrays)
+        if isinstance(res, tuple):
+            for r in res:
+                out[:, j] = r
+                j += 1
+        else:
+            out[:, j] = res
+            j += 1
+
+    return pd.DataFrame(out, index=df.index, columns=columns)
+
+
+def compute_patterns(df, patterns=PATTERNS, arrays=None):
+    """All requested CDL patterns as 0/1 flags, filled into one int8 array."""
+    arrays = arrays if arrays is not None else ohlcv_arrays(df)
+    o, h, l, c = (arrays[k] for k in ("open", "high", "low", "close"))
+    out = np.zeros((len(df), len(patterns)), dtype=np.int8)
+    for j, p in enumerate(patterns):
+        out[:, j] = getattr(talib, p)(o, h, l, c) != 0
+    return pd.DataFrame(out, index=df.index, columns=list(patterns))
+
+
+def talib_df(df, indicators=DEFAULT_INDICATORS, patterns=True):
     """
     Return a single DataFrame containing:
     - Original Date + OHLCV columns
-    - All numeric TA-Lib indicators
-    - All CDL patterns (0/1)
+    - The requested TA-Lib indicators (DEFAULT_INDICATORS by default)
+    - All CDL patterns (0/1) unless patterns=False
     """
     df = df.copy()
-    
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    if "Date" not in df.columns:
+        df = df.rename_axis("Date").reset_index()
+
     # Ensure OHLCV columns exist
     for col in ['Open','High','Low','Close','Volume']:
         if col not in df.columns:
             raise ValueError(f"Missing column: {col}")
 
     # Base DF with Date + OHLCV
-    result_df = df[['Date','Close','High','Low','Open','Volume']].copy()
-
-    # --- Indicators ---
-    df_std = df.copy()
-    df_std.columns = [c.lower() for c in df_std.columns]
-    ohlcv = {k: df_std.get(k) for k in ['open','high','low','close','volume']}
-    
-    indicator_list = [
-        f for f in dir(talib)
-        if not f.startswith("CDL") and not f.startswith("_")
-        and f not in ["wraps", "wrapped_func"]
-    ]
-    
-    indicator_dfs = []
-    for name in indicator_list:
-        func = getattr(talib, name)
-        try:
-            if ohlcv['close'] is None:
-                continue
-            res = func(ohlcv['close'].values.astype(float))
-            if isinstance(res, tuple):
-                for i, arr in enumerate(res):
-                    indicator_dfs.append(pd.DataFrame(arr, index=df.index, columns=[f"{name}_{i}"]))
-            else:
-                indicator_dfs.append(pd.DataFrame(res, index=df.index, columns=[name]))
-        except:
-            continue
-    if indicator_dfs:
-        result_df = pd.concat([result_df] + indicator_dfs, axis=1)
-
-    # --- CDL Patterns ---
-    pattern_list = [f for f in dir(talib) if f.startswith("CDL")]
-    for p in pattern_list:
-        func = getattr(talib, p)
-        try:
-            res = func(
-                df['Open'].values.astype(float),
-                df['High'].values.astype(float),
-                df['Low'].values.astype(float),
-                df['Close'].values.astype(float)
-            )
-            result_df[p] = (res != 0).astype(int)
-        except:
-            continue
-
-    return result_df
+    result_df = df[['Date','Close','High','Low','Open','Volume']]
+    arrays = ohlcv_arrays(df)
+
+    parts = [result_df, compute_indicators(df, indicators, arrays)]
+    if patterns:
+        parts.append(compute_patterns(df, PATTERNS, arrays))
+    return pd.concat(parts, axis=1)
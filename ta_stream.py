@@ -0,0 +1,262 @@
+# ta_stream.py — incremental indicator state for live intraday bars
+#
+# Same spec strings and column labels as ta_indi_pat (EMA20, RSI14,
+# MACD12_26_9_macd, ATR14, BBANDS20_upperband, ...) plus VWAP, but each
+# indicator keeps its rolling state so a new bar costs O(1) instead of a
+# full recompute. Outputs (including the NaN warm-up rows) line up with TA-Lib.
+#
+# A bar with the same timestamp as the previous one is treated as a revision
+# of the still-forming candle: state is rolled back one bar and re-applied.
+
+import copy
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from ta_indi_pat import parse_indicator, ohlcv_arrays
+
+STREAM_INDICATORS = ["EMA(20)", "RSI(14)", "MACD(12,26,9)", "ATR(14)", "BBANDS(20)", "VWAP"]
+
+NAN = float("nan")
+
+# ================================================================
+#                    SINGLE INDICATOR STATES
+# ================================================================
+
+class _EMA:
+    """EMA seeded with the SMA of the first `period` values (TA-Lib default)."""
+    def __init__(self, period):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.n = 0
+        self.seed = 0.0
+        self.value = NAN
+
+    def update(self, x):
+        self.n += 1
+        if self.n < self.period:
+            self.seed += x
+        elif self.n == self.period:
+            self.value = (self.seed + x) / self.period
+        else:
+            self.value += self.k * (x - self.value)
+        return self.value
+
+
+class _RSI:
+    """Wilder RSI; first value after `period` price changes."""
+    def __init__(self, period=14):
+        self.period = period
+        self.prev = None
+        self.n = 0
+        self.gain = 0.0
+        self.loss = 0.0
+
+    def update(self, close):
+        if self.prev is None:
+            self.prev = close
+            return NAN
+        d = close - self.prev
+        self.prev = close
+        g, l = max(d, 0.0), max(-d, 0.0)
+        self.n += 1
+        if self.n <= self.period:
+            self.gain += g
+            self.loss += l
+            if self.n < self.period:
+                return NAN
+            self.gain /= self.period
+            self.loss /= self.period
+        else:
+            self.gain = (self.gain * (self.period - 1) + g) / self.period
+            self.loss = (self.loss * (self.period - 1) + l) / self.period
+        total = self.gain + self.loss
+        return 100.0 * self.gain / total if total else 0.0
+
+
+class _MACD:
+    """TA-Lib alignment: the fast EMA is seeded over the same window the slow one ends on."""
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast, self.slow, self.signal = _EMA(fast), _EMA(slow), _EMA(signal)
+        self.skip = max(slow - fast, 0)
+
+    def update(self, close):
+        if self.skip:
+            self.skip -= 1
+            self.slow.update(close)
+            return NAN, NAN, NAN
+        f, s = self.fast.update(close), self.slow.update(close)
+        if math.isnan(s):
+            return NAN, NAN, NAN
+        macd = f - s
+        sig = self.signal.update(macd)
+        if math.isnan(sig):
+            return NAN, NAN, NAN
+        return macd, sig, macd - sig
+
+    def __copy__(self):
+        new = _MACD.__new__(_MACD)
+        new.fast, new.slow, new.signal = copy.copy(self.fast), copy.copy(self.slow), copy.copy(self.signal)
+        new.skip = self.skip
+        return new
+
+
+class _ATR:
+    """Wilder ATR; first value = mean of the first `period` true ranges."""
+    def __init__(self, period=14):
+        self.period = period
+        self.prev_close = None
+        self.n = 0
+        self.value = 0.0
+
+    def update(self, high, low, close):
+        if self.prev_close is None:
+            self.prev_close = close
+            return NAN
+        tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.n += 1
+        if self.n < self.period:
+            self.value += tr
+            return NAN
+        if self.n == self.period:
+            self.value = (self.value + tr) / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + tr) / self.period
+        return self.value
+
+
+class _BBANDS:
+    """Rolling mean +/- k * population std from running sums over a fixed window."""
+    def __init__(self, period=20, nbdevup=2.0, nbdevdn=2.0):
+        self.period, self.up, self.dn = period, nbdevup, nbdevdn
+        self.window = deque()
+        self.s = 0.0
+        self.ss = 0.0
+
+    def update(self, x):
+        self.window.append(x)
+        self.s += x
+        self.ss += x * x
+        if len(self.window) > self.period:
+            old = self.window.popleft()
+            self.s -= old
+            self.ss -= old * old
+        if len(self.window) < self.period:
+            return NAN, NAN, NAN
+        mean = self.s / self.period
+        sd = math.sqrt(max(self.ss / self.period - mean * mean, 0.0))
+        return mean + self.up * sd, mean, mean - self.dn * sd
+
+    def __copy__(self):
+        obj = _BBANDS.__new__(_BBANDS)
+        obj.__dict__.update(self.__dict__)
+        obj.window = deque(self.window)
+        return obj
+
+
+class _VWAP:
+    """Session VWAP on typical price; resets when the bar's date changes."""
+    def __init__(self):
+        self.day = None
+        self.pv = 0.0
+        self.v = 0.0
+
+    def update(self, ts, high, low, close, volume):
+        day = pd.Timestamp(ts).date()
+        if day != self.day:
+            self.day, self.pv, self.v = day, 0.0, 0.0
+        self.pv += (high + low + close) / 3.0 * volume
+        self.v += volume
+        return self.pv / self.v if self.v else NAN
+
+
+def _make_state(spec):
+    """spec string -> (columns, state, feed) where feed(state, bar) returns output value(s)."""
+    if spec.strip().upper() == "VWAP":
+        return ("VWAP",), _VWAP(), lambda st, b: st.update(b[0], b[2], b[3], b[4], b[5])
+
+    s = parse_indicator(spec)
+    p = dict(s.params)
+    if s.name == "EMA":
+        return s.columns, _EMA(p.get("timeperiod", 30)), lambda st, b: st.update(b[4])
+    if s.name == "RSI":
+        return s.columns, _RSI(p.get("timeperiod", 14)), lambda st, b: st.update(b[4])
+    if s.name == "MACD":
+        st = _MACD(p.get("fastperiod", 12), p.get("slowperiod", 26), p.get("signalperiod", 9))
+        return s.columns, st, lambda st, b: st.update(b[4])
+    if s.name == "ATR":
+        return s.columns, _ATR(p.get("timeperiod", 14)), lambda st, b: st.update(b[2], b[3], b[4])
+    if s.name == "BBANDS":
+        st = _BBANDS(p.get("timeperiod", 5), p.get("nbdevup", 2.0), p.get("nbdevdn", 2.0))
+        return s.columns, st, lambda st, b: st.update(b[4])
+    raise ValueError(f"No streaming implementation for {spec}")
+
+# ================================================================
+#                    STREAMING INDICATOR SET
+# ================================================================
+
+class StreamingIndicators:
+    """
+    Rolling state for a set of indicators over one bar series.
+
+        si = StreamingIndicators(["EMA(20)", "RSI(14)", "VWAP"])
+        si.warmup(df)                          # full history once
+        row = si.update(ts, o, h, l, c, v)     # then one bar at a time
+    """
+    def __init__(self, indicators=STREAM_INDICATORS):
+        self.indicators = list(indicators)
+        self._states = [_make_state(s) for s in self.indicators]
+        self.columns = [c for cols, _, _ in self._states for c in cols]
+        self.bars = []       # (ts, open, high, low, close, volume)
+        self.values = []     # one tuple of indicator outputs per bar
+        self._checkpoint = None
+
+    @property
+    def last_ts(self):
+        return self.bars[-1][0] if self.bars else None
+
+    def update(self, ts, open_, high, low, close, volume):
+        """Apply one bar and return {column: value}. Same ts as last bar = revise that bar."""
+        bar = (ts, float(open_), float(high), float(low), float(close), float(volume))
+        if self.bars and ts == self.bars[-1][0]:
+            self._states = self._checkpoint
+            self.bars.pop()
+            self.values.pop()
+        elif self.bars and ts < self.bars[-1][0]:
+            raise ValueError(f"Out-of-order bar {ts} < {self.bars[-1][0]}")
+
+        self._checkpoint = [(cols, copy.copy(st), feed) for cols, st, feed in self._states]
+        out = []
+        for cols, st, feed in self._states:
+            v = feed(st, bar)
+            out.extend(v if isinstance(v, tuple) else (v,))
+        self.bars.append(bar)
+        self.values.append(tuple(out))
+        return dict(zip(self.columns, out))
+
+    def warmup(self, df):
+        """Feed every bar of an OHLCV frame (DatetimeIndex); returns the number of bars applied."""
+        a = ohlcv_arrays(df)
+        for ts, o, h, l, c, v in zip(df.index, a["open"], a["high"], a["low"], a["close"], a["volume"]):
+            self.update(ts, o, h, l, c, v)
+        return len(df)
+
+    def extend(self, df):
+        """Apply only the bars of df at or after the last seen timestamp; returns rows applied."""
+        if self.last_ts is not None:
+            df = df[df.index >= self.last_ts]
+        return self.warmup(df)
+
+    def frame(self, tail=None):
+        """OHLCV + indicator values as a DataFrame (optionally only the last `tail` rows)."""
+        bars = self.bars[-tail:] if tail else self.bars
+        vals = self.values[-tail:] if tail else self.values
+        idx = pd.DatetimeIndex([b[0] for b in bars], name="Datetime")
+        out = pd.DataFrame(np.array([b[1:] for b in bars]).reshape(len(bars), 5),
+                           index=idx, columns=["Open", "High", "Low", "Close", "Volume"])
+        ind = pd.DataFrame(np.array(vals, dtype="float64").reshape(len(vals), len(self.columns)),
+                           index=idx, columns=self.columns)
+        return pd.concat([out, ind], axis=1)
@@ -0,0 +1,88 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bhavcopy_panel
+from bhavcopy_panel import BhavPanel
+
+D = datetime.date
+
+
+def _day(d, symbols=("INFY", "TCS", "ITC")):
+    base = d.toordinal() % 100
+    n = len(symbols)
+    return pd.DataFrame({
+        "SYMBOL": list(symbols), "SERIES": ["EQ"] * n,
+        "PREV_CLOSE": np.full(n, 100.0 + base), "OPEN_PRICE": np.full(n, 101.0 + base),
+        "CLOSE_PRICE": np.arange(n, dtype=float) + base, "DELIV_PER": np.full(n, 50.0),
+    })
+
+
+@pytest.fixture
+def fake_store(monkeypatch):
+    calls, absent = [], set()
+
+    def load(date_str, fetch=True):
+        d = datetime.datetime.strptime(date_str, "%d-%m-%Y").date()
+        calls.append(d)
+        if d in absent:
+            raise FileNotFoundError(date_str)
+        return _day(d)
+
+    monkeypatch.setattr(bhavcopy_panel, "load_bhavcopy", load)
+    return calls, absent
+
+
+def test_days_added_out_of_order_stay_sorted():
+    p = BhavPanel()
+    for d in (D(2025, 11, 12), D(2025, 11, 10), D(2025, 11, 11)):
+        p.add_day(d, _day(d))
+    assert p.dates == [D(2025, 11, 10), D(2025, 11, 11), D(2025, 11, 12)]
+    close = p.frame("CLOSE_PRICE")
+    for d in p.dates:
+        assert close.loc["INFY", d] == d.toordinal() % 100
+
+
+def test_new_symbol_is_nan_on_earlier_days():
+    p = BhavPanel()
+    p.add_day(D(2025, 11, 10), _day(D(2025, 11, 10)))
+    p.add_day(D(2025, 11, 11), _day(D(2025, 11, 11), ("INFY", "TCS", "ITC", "NEWCO")))
+    row = p.frame("CLOSE_PRICE").loc["NEWCO"]
+    assert np.isnan(row.iloc[0]) and not np.isnan(row.iloc[1])
+
+
+def test_missing_days_are_not_refetched(fake_store):
+    calls, absent = fake_store
+    absent.add(D(2025, 11, 5))                     # a holiday
+    p = BhavPanel()
+    assert p.ensure_range("03-11-2025", "07-11-2025") == [D(2025, 11, 5)]
+    n = len(calls)
+    assert p.ensure_range("03-11-2025", "07-11-2025") == [D(2025, 11, 5)]
+    assert len(calls) == n                          # nothing downloaded the second time
+
+
+def test_trim_keeps_the_requested_range(fake_store):
+    p = BhavPanel(max_days=10)
+    p.ensure_range("01-09-2025", "30-09-2025")
+    assert len(p.dates) == 22                       # the requested range is never cut
+    p.ensure_range("01-10-2025", "07-10-2025")
+    assert len(p.dates) == 10
+    assert p.dates[-5:] == list(pd.bdate_range("2025-10-01", "2025-10-07").date)
+    # the surviving September days are the ones closest to the new range
+    assert p.dates[:5] == [D(2025, 9, 24), D(2025, 9, 25), D(2025, 9, 26), D(2025, 9, 29), D(2025, 9, 30)]
+    close = p.frame("CLOSE_PRICE")
+    for d in p.dates:
+        assert close.loc["TCS", d] == 1 + d.toordinal() % 100
+
+
+def test_top_gaps_orders_by_gap():
+    p = BhavPanel()
+    d = D(2025, 11, 10)
+    df = _day(d)
+    df["OPEN_PRICE"] = df["PREV_CLOSE"] * np.array([1.01, 1.05, 0.97])
+    p.add_day(d, df)
+    up = p.top_gaps(n=2)
+    assert up["SYMBOL"].tolist() == ["TCS", "INFY"]
+    np.testing.assert_allclose(up["pergap"], [5.0, 1.0])
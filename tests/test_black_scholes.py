@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+
+from black_scholes import implied_vol, iv_and_greeks, price, greeks, SIGMA_HI
+
+
+def _chain():
+    spot = 24000.0
+    strikes = np.arange(21000, 27001, 250, dtype=float)
+    T = np.array([2 / 365, 30 / 365, 0.5])[:, None]
+    sigma = 0.12 + 0.4 * ((strikes / spot) - 1) ** 2
+    return spot, strikes, T, sigma
+
+
+def test_round_trip_recovers_sigma():
+    spot, strikes, T, sigma = _chain()
+    for call in (True, False):
+        prem = price(spot, strikes, T, 0.065, sigma, call=call)
+        iv, converged, _ = implied_vol(prem, spot, strikes, T, 0.065, call=call, full_output=True)
+        # contracts with (almost) no time value carry no information about sigma
+        vega = greeks(spot, strikes, T, 0.065, sigma, call=call)["vega"]
+        ok = vega > 0.05
+        assert converged[ok].all()
+        np.testing.assert_allclose(iv[ok], np.broadcast_to(sigma, iv.shape)[ok], atol=1e-4)
+
+
+def test_deep_itm_converges():
+    spot, K, T = 24000.0, np.array([15000.0, 18000.0]), 30 / 365
+    prem = price(spot, K, T, 0.065, 0.35, call=True)
+    iv, converged, _ = implied_vol(prem, spot, K, T, 0.065, call=True, full_output=True)
+    assert converged.all()
+    np.testing.assert_allclose(iv, 0.35, atol=1e-3)
+
+
+def test_sigma_above_bracket_is_not_converged():
+    spot, K, T = 100.0, 100.0, 0.5
+    prem = price(spot, K, T, 0.05, SIGMA_HI + 1.0, call=True)
+    iv, converged, _ = implied_vol(prem, spot, K, T, 0.05, call=True, full_output=True)
+    assert math.isnan(iv) and not converged
+
+
+def test_premium_outside_no_arbitrage_bounds_is_nan():
+    spot, K, T = 100.0, np.array([90.0, 110.0]), 0.25
+    # below intrinsic for the ITM call, above spot for the OTM call
+    iv = implied_vol(np.array([5.0, 150.0]), spot, K, T, 0.05, call=True)
+    assert np.isnan(iv).all()
+
+
+def test_put_call_parity_gives_same_iv():
+    spot, K, T, r = 24000.0, 24500.0, 30 / 365, 0.065
+    c = price(spot, K, T, r, 0.18, call=True)
+    p = price(spot, K, T, r, 0.18, call=False)
+    np.testing.assert_allclose(c - p, spot - K * np.exp(-r * T), atol=1e-6)
+    np.testing.assert_allclose(implied_vol(np.array([c, p]), spot, K, T, r, call=np.array([True, False])),
+                               0.18, atol=1e-6)
+
+
+def test_iv_and_greeks_nan_where_unsolved():
+    g = iv_and_greeks(np.array([5.0, 12.0]), 100.0, np.array([90.0, 100.0]), 0.25, 0.05, call=True)
+    assert np.isnan(g["iv"][0]) and np.isnan(g["delta"][0])
+    assert g["converged"][1] and 0 < g["delta"][1] < 1
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from chart_builder import lttb, downsample_line, resample_ohlc, build_figure, target_bars
+
+
+def _series(n=5000, seed=3):
+    rng = np.random.default_rng(seed)
+    y = np.sin(np.linspace(0, 20, n)) + rng.normal(0, 0.05, n)
+    y[1234] = 9.0          # a spike
+    y[3777] = -9.0         # a dip
+    return np.arange(n, dtype=float), y
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x, y = _series()
+    keep = lttb(x, y, 300)
+    assert len(keep) == 300
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert np.argmax(y) in keep and np.argmin(y) in keep
+
+
+def test_lttb_short_series_untouched():
+    x, y = np.arange(10.0), np.arange(10.0)
+    np.testing.assert_array_equal(lttb(x, y, 50), np.arange(10))
+
+
+def test_downsample_line_skips_nan_warmup():
+    idx = pd.date_range("2025-11-14 09:15", periods=2000, freq="1min")
+    s = pd.Series(np.r_[np.full(30, np.nan), np.linspace(0, 1, 1970)], index=idx)
+    out = downsample_line(s, 100)
+    assert len(out) == 100 and out.notna().all()
+    assert out.index[0] == idx[30] and out.index[-1] == idx[-1]
+
+
+def test_resample_ohlc_buckets():
+    idx = pd.date_range("2025-11-14", periods=10, freq="D")
+    df = pd.DataFrame({"Open": np.arange(10.0), "High": np.arange(10.0) + 5, "Low": np.arange(10.0) - 5,
+                       "Close": np.arange(10.0) + 1, "Volume": np.ones(10)}, index=idx)
+    out = resample_ohlc(df, 2)
+    assert list(out.index) == [idx[0], idx[5]]
+    assert out["Open"].tolist() == [0.0, 5.0]
+    assert out["High"].tolist() == [9.0, 14.0]
+    assert out["Low"].tolist() == [-5.0, 0.0]
+    assert out["Close"].tolist() == [5.0, 10.0]
+    assert out["Volume"].tolist() == [5.0, 5.0]
+
+
+def test_figure_is_bounded_by_width():
+    idx = pd.date_range("2020-01-01", periods=20000, freq="h")
+    close = np.cumsum(np.ones(20000))
+    df = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                       "Volume": np.ones(20000)}, index=idx)
+    fig = build_figure(df, {"EMA20": pd.Series(close, index=idx)}, width=900)
+    assert len(fig.data[0].x) == target_bars(900)
+    assert len(fig.data[1].x) <= 900
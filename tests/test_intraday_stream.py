@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import stock
+
+
+def _today_bars(n=30):
+    day = pd.Timestamp.now(tz="Asia/Kolkata").normalize() + pd.Timedelta(hours=9, minutes=15)
+    idx = pd.date_range(day, periods=n, freq="5min")
+    close = 100 + np.arange(n, dtype=float)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                         "Volume": np.full(n, 1000.0)}, index=idx)
+
+
+@pytest.fixture
+def fake_intraday(monkeypatch):
+    calls = []
+
+    def intraday(symbol):
+        calls.append(symbol)
+        return pd.DataFrame() if symbol == "BAD" else _today_bars()
+
+    monkeypatch.setattr(stock, "intraday", intraday)
+    monkeypatch.setattr(stock, "_intraday_streams", stock.OrderedDict())
+    monkeypatch.setattr(stock, "_stream_synced", {})
+    monkeypatch.setattr(stock, "_stream_used", {})
+    return calls
+
+
+def test_streams_are_bounded_lru(fake_intraday, monkeypatch):
+    monkeypatch.setattr(stock, "MAX_INTRADAY_STREAMS", 2)
+    for sym in ("ITC", "TCS", "ITC", "INFY"):
+        stock.intraday_stream(sym)
+    assert list(stock._intraday_streams) == ["ITC", "INFY"]
+    assert set(stock._stream_synced) == {"ITC", "INFY"}
+
+
+def test_symbol_key_is_normalised_and_reused(fake_intraday):
+    a = stock.intraday_stream(" itc ")
+    b = stock.intraday_stream("ITC")
+    assert a is b
+    assert fake_intraday == ["ITC"]
+
+
+def test_empty_download_is_not_cached(fake_intraday):
+    assert stock.intraday_stream("BAD").last_ts is None
+    assert "BAD" not in stock._intraday_streams
+
+
+def test_tail_starts_at_the_charts_last_candle(fake_intraday):
+    df = stock.intraday_stream("ITC").frame()
+    since = df.index[-2]
+    tail = json.loads(stock.intraday_tail("ITC", since.isoformat()))["data"]
+    candles = tail[0]
+    assert len(candles["x"]) == 2
+    assert candles["close"] == df["Close"].iloc[-2:].tolist()
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from snapshot_diff import Snapshot, SnapshotRing, diff
+
+
+def _frame(prices, symbols=("INFY", "TCS", "ITC"), status=None):
+    df = pd.DataFrame({"symbol": list(symbols), "lastPrice": prices,
+                       "status": status or ["open"] * len(symbols)})
+    return df
+
+
+def test_changed_cells_added_and_removed():
+    old = Snapshot(_frame([100.0, 200.0, np.nan]), ts=0)
+    new = Snapshot(_frame([100.0, 201.0, np.nan, 50.0], ("INFY", "TCS", "ITC", "WIPRO"),
+                          ["open", "open", "halted", "open"]), ts=1)
+    d = diff(old, new)
+    assert d.added == ["WIPRO"] and d.removed == []
+    assert d.cells() == {"ITC": {"status": "halted"}, "TCS": {"lastPrice": 201.0}}
+    assert set(d.columns) == {"lastPrice", "status"}
+
+
+def test_nan_to_nan_is_not_a_change():
+    a = Snapshot(_frame([np.nan, 1.0, 2.0]), ts=0)
+    b = Snapshot(_frame([np.nan, 1.0, 2.0]), ts=1)
+    assert not diff(a, b)
+
+
+def test_ring_moved_and_changed_since():
+    ring = SnapshotRing(capacity=10)
+    ring.append(_frame([100.0, 200.0, 300.0]), ts=0)
+    ring.append(_frame([100.0, 210.0, 300.0]), ts=30)
+    ring.append(_frame([90.0, 210.0, 300.0]), ts=60)
+    moved = ring.moved(60, "lastPrice", now=60)
+    assert list(moved.index) == ["INFY", "TCS"]            # -10% before +5%
+    np.testing.assert_allclose(moved["pct_change"], [-10.0, 5.0])
+    assert ring.changed_since(20, now=60) == {"INFY"}
+    assert ring.changed_since(45, now=60) == {"INFY", "TCS"}
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from snapshot_recorder import encode, decode
+
+
+def _snapshot(i):
+    data = pd.DataFrame({
+        "symbol": ["RELIANCE", "TCS", "INFY"],
+        "lastPrice": [2450.55 + i, 3890.1, np.nan],
+        "totalTradedVolume": [120000, 98000 + i, 45000],
+        "ffmc_flag": [True, False, True],
+        "meta": [{"isin": "INE002A01018"}, ["a", 1], None],
+        "change": ["-", 1.5, "x"],
+        "remarks": [None, None, None],
+    })
+    tables = {"data": data, "advance": pd.DataFrame({"advances": [str(30 + i)], "declines": ["20"]})}
+    if i == 1:
+        tables["data"] = data.drop(columns=["meta"])
+    return 1_763_100_000 + i * 5, tables
+
+
+def _assert_same(snaps, decoded):
+    assert len(snaps) == len(decoded)
+    for (ts, tables), (ts2, tables2) in zip(snaps, decoded):
+        assert abs(ts - ts2) < 1e-3
+        assert list(tables) == list(tables2)
+        for name in tables:
+            pd.testing.assert_frame_equal(tables[name], tables2[name])
+
+
+def test_round_trip_is_identity():
+    snaps = [_snapshot(i) for i in range(4)]
+    table, _, _ = encode(snaps)
+    _assert_same(snaps, decode(table))
+
+
+def test_round_trip_through_parquet(tmp_path):
+    snaps = [_snapshot(i) for i in range(3)]
+    table, dict_cols, delta_cols = encode(snaps)
+    path = tmp_path / "part.parquet"
+    pq.write_table(table, path, use_dictionary=dict_cols,
+                   column_encoding={c: "DELTA_BINARY_PACKED" for c in delta_cols})
+    _assert_same(snaps, decode(pq.read_table(path)))
+
+
+def test_dict_and_bool_cells_keep_their_type():
+    (_, tables), = decode(encode([_snapshot(0)])[0])
+    data = tables["data"]
+    assert data["meta"].tolist() == [{"isin": "INE002A01018"}, ["a", 1], None]
+    assert data["change"].tolist() == ["-", 1.5, "x"]
+    assert data["ffmc_flag"].dtype == bool
+    assert "remarks" in data.columns
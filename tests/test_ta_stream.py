@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+import talib
+
+from ta_stream import StreamingIndicators
+
+
+def _bars(n=300, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 1000 + np.cumsum(rng.normal(0, 2, n))
+    high = close + rng.uniform(0, 3, n)
+    low = close - rng.uniform(0, 3, n)
+    open_ = low + (high - low) * rng.uniform(0, 1, n)
+    idx = pd.date_range("2025-11-14 09:15", periods=n, freq="5min", tz="Asia/Kolkata")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close,
+                         "Volume": rng.integers(1_000, 50_000, n).astype(float)}, index=idx)
+
+
+def _expected(df):
+    h, l, c, v = (df[k].to_numpy() for k in ("High", "Low", "Close", "Volume"))
+    macd, signal, hist = talib.MACD(c, 12, 26, 9)
+    upper, middle, lower = talib.BBANDS(c, 20, 2.0, 2.0)
+    # session VWAP: cumulative within each calendar day
+    pv = pd.Series((h + l + c) / 3 * v, index=df.index)
+    day = df.index.date
+    vwap = (pv.groupby(day).cumsum() / df["Volume"].groupby(day).cumsum()).to_numpy()
+    return {
+        "EMA20": talib.EMA(c, 20), "RSI14": talib.RSI(c, 14),
+        "MACD12_26_9_macd": macd, "MACD12_26_9_macdsignal": signal, "MACD12_26_9_macdhist": hist,
+        "ATR14": talib.ATR(h, l, c, 14),
+        "BBANDS20_upperband": upper, "BBANDS20_middleband": middle, "BBANDS20_lowerband": lower,
+        "VWAP": vwap,
+    }
+
+
+def test_streaming_matches_talib():
+    df = _bars()
+    si = StreamingIndicators()
+    si.warmup(df)
+    out = si.frame()
+    for col, want in _expected(df).items():
+        np.testing.assert_allclose(out[col].to_numpy(), want, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=col)
+
+
+def test_one_bar_at_a_time_matches_warmup():
+    df = _bars(120)
+    si = StreamingIndicators()
+    si.warmup(df.iloc[:100])
+    for ts, row in df.iloc[100:].iterrows():
+        si.update(ts, row.Open, row.High, row.Low, row.Close, row.Volume)
+    full = StreamingIndicators()
+    full.warmup(df)
+    pd.testing.assert_frame_equal(si.frame(), full.frame())
+
+
+def test_revised_bar_replaces_the_forming_candle():
+    df = _bars(80)
+    si = StreamingIndicators()
+    si.warmup(df.iloc[:-1])
+    last = df.iloc[-1]
+    # a partial version of the last candle first, then its final values
+    si.update(df.index[-1], last.Open, last.Open + 0.5, last.Open - 0.5, last.Open, last.Volume / 3)
+    si.update(df.index[-1], last.Open, last.High, last.Low, last.Close, last.Volume)
+    full = StreamingIndicators()
+    full.warmup(df)
+    assert len(si.bars) == len(df)
+    pd.testing.assert_frame_equal(si.frame(), full.frame())
+
+
+def test_out_of_order_bar_is_rejected():
+    df = _bars(30)
+    si = StreamingIndicators()
+    si.warmup(df)
+    with pytest.raises(ValueError):
+        si.update(df.index[0], 1, 1, 1, 1, 1)
@@ -0,0 +1,45 @@
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from common import table_html, iter_table
+
+
+def _cells(html):
+    return re.findall(r"<td>(.*?)</td>", html)
+
+
+def _mixed(n=3):
+    base = pd.DataFrame({
+        "price": [1.23456789012, 2.5, np.nan],
+        "qty": [1, 2, 3],
+        "symbol": ["INFY", None, "<b>"],
+        "flag": [True, False, True],
+        "turnover": [1e7 + 0.5, 2.0, 3.0],
+        "date": pd.to_datetime(["2025-11-14", None, "2025-11-17"]),
+        "mixed": pd.Series([1.23456789012, "x", 3], dtype=object),
+    })
+    return pd.concat([base] * (n // 3), ignore_index=True)
+
+
+def test_cells_match_to_html():
+    df = _mixed(300)
+    want = [c if c not in ("NaN", "NaT", "None") else "" for c in _cells(df.to_html(index=False))]
+    assert _cells(table_html(df, virtual_rows=10_000)) == want
+
+
+def test_chunked_output_is_the_same_table():
+    df = _mixed(30)
+    assert "".join(iter_table(df, chunk=7)) == "".join(iter_table(df, chunk=1000))
+
+
+def test_virtual_table_ships_formatted_rows():
+    df = _mixed(900)
+    out = table_html(df, virtual_rows=500, window=100)
+    assert len(_cells(out)) == 100 * df.shape[1]
+    rows = json.loads(re.search(r'class="vtable-data"[^>]*>(.*?)</script>', out).group(1))["rows"]
+    assert len(rows) == len(df)
+    assert rows[0][:2] == ["1.234568", "1"]
+    assert rows[2][0] == ""
@@ -0,0 +1,148 @@
+# worker_pool.py — per-request-class worker pools with timeouts and load shedding
+#
+# Each class of request gets its own threads, so a burst of heavy bhavcopy or
+# TA work can't occupy the threads cheap live-quote lookups need:
+#
+#   live      NSE live endpoints (quotes, indices, pre-open, option chain)
+#   yfinance  yfinance statements / info
+#   bhavcopy  bhavcopy downloads, panels, range reports
+#   compute   TA-Lib over daily/intraday bars, screener
+#
+# A class admits at most workers + queue requests; beyond that submit() sheds
+# the request at once with Busy instead of letting it wait behind the others.
+# Sizes come from POOL_CONFIG, overridable per class via environment, e.g.
+#   POOL_LIVE_WORKERS=16  POOL_BHAVCOPY_QUEUE=2  POOL_COMPUTE_TIMEOUT=120
+
+import os
+import asyncio
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+POOL_CONFIG = {
+    "live":     {"workers": 8, "queue": 32, "timeout": 15},
+    "yfinance": {"workers": 4, "queue": 16, "timeout": 30},
+    "bhavcopy": {"workers": 2, "queue": 4,  "timeout": 120},
+    "compute":  {"workers": 2, "queue": 4,  "timeout": 90},
+}
+
+
+class Busy(Exception):
+    """The request class is at capacity; the request was not started."""
+
+
+class PoolTimeout(Exception):
+    """The request did not finish within its class timeout."""
+
+
+def _env(cls, key, default):
+    v = os.environ.get(f"POOL_{cls.upper()}_{key.upper()}")
+    return type(default)(v) if v else default
+
+
+class WorkerPool:
+    def __init__(self, name, workers, queue, timeout):
+        self.name = name
+        self.workers, self.queue, self.timeout = workers, queue, timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"pool-{name}")
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "completed": 0, "shed": 0, "timeouts": 0, "errors": 0, "inflight": 0}
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _release(self, _future=None):
+        self._count("inflight", -1)
+        self._slots.release()
+
+    def _admit(self):
+        if not self._slots.acquire(blocking=False):
+            self._count("shed")
+            raise Busy(f"{self.name} requests are at capacity ({self.workers} running, {self.queue} queued)")
+        self._count("submitted")
+        self._count("inflight")
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Admission only, for work that runs on the caller's thread (e.g. streaming generators)."""
+        self._admit()
+        try:
+            yield
+        finally:
+            self._count("completed")
+            self._release()
+
+    def submit(self, fn, *args, **kwargs):
+        """Future for fn(*args); raises Busy when the class is full. The slot frees when fn returns."""
+        self._admit()
+        try:
+            fut = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        fut.add_done_callback(self._release)
+        return fut
+
+    def run(self, fn, *args, timeout=None, **kwargs):
+        """Submit and wait up to the class timeout. A timed-out call keeps its slot until it returns."""
+        timeout = self.timeout if timeout is None else timeout
+        fut = self.submit(fn, *args, **kwargs)
+        try:
+            result = fut.result(timeout=timeout)
+        except FutureTimeout:
+            self._count("timeouts")
+            raise PoolTimeout(f"{self.name} request took longer than {timeout:g}s")
+        except Exception:
+            self._count("errors")
+            raise
+        self._count("completed")
+        return result
+
+    async def run_async(self, fn, *args, timeout=None, **kwargs):
+        """
+        run() for async callers: the wait is an awaited future, so a queued
+        request holds no thread. On timeout a request still queued is cancelled;
+        one already running keeps its slot until it returns.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        fut = self.submit(fn, *args, **kwargs)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(fut), timeout)
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise PoolTimeout(f"{self.name} request took longer than {timeout:g}s")
+        except Exception:
+            self._count("errors")
+            raise
+        self._count("completed")
+        return result
+
+    def info(self):
+        with self._lock:
+            return {**self.stats, "workers": self.workers, "queue": self.queue, "timeout": self.timeout}
+
+
+pools = {
+    name: WorkerPool(name, _env(name, "workers", c["workers"]), _env(name, "queue", c["queue"]),
+                     _env(name, "timeout", float(c["timeout"])))
+    for name, c in POOL_CONFIG.items()
+}
+
+
+def run_in(cls, fn, *args, **kwargs):
+    return pools[cls].run(fn, *args, **kwargs)
+
+
+async def run_in_async(cls, fn, *args, **kwargs):
+    return await pools[cls].run_async(fn, *args, **kwargs)
+
+
+def total_admission():
+    """Concurrency the UI queue should allow: every pool can hold workers + queue requests at once."""
+    return sum(p.workers + p.queue for p in pools.values())
+
+
+def pool_stats():
+    return {name: p.info() for name, p in pools.items()}